@@ -1,11 +1,32 @@
 import os
+import asyncio
+import argparse
 import pandas as pd
 from tabulate import tabulate
 from datetime import datetime
 
-from modules.tactical_scoring_engine import apply_tactical_rules
-from modules.risk_and_reporting_engine import apply_stop_logic, export_to_csv, export_to_pdf
-from modules.profit_risk_analyzer import run_profit_risk_analyzer  # FIXED
+from modules.tactical_scoring_engine import calculate_tactical_scores
+from modules.risk_and_reporting_engine import apply_stop_logic
+from modules.artifact_pipeline import render_artifacts
+from modules.profit_risk_analyzer import calculate_profit_and_risk
+from modules.csv_cache_engine import cached_frame, set_cache_enabled
+from modules.report_memo_engine import fingerprint, set_memo_enabled
+from modules.position_schema_engine import read_positions_csv
+from modules.position_stream_engine import DEFAULT_CHUNKSIZE, ingest_positions_streaming
+from modules.data_manifest_engine import get_manifest
+from modules.zacks_screen_registry import discover_screens, iter_screen_loads
+from modules.crossmatch_engine import build_screen_index, crossmatch
+from modules.incremental_engine import run_incremental
+from modules.scoring_rules_engine import get_scoring_rules
+from modules.account_batch_engine import run_account_batch
+from modules.backtest_engine import DEFAULT_HORIZONS, run_backtest
+from modules.alert_stream_engine import ReplayPriceFeed, run_alert_stream
+from modules.history_store_engine import get_history_store
+from modules.stop_state_engine import get_stop_state
+from modules.trailing_stop_manager import apply_trailing_stop
+from modules.tactical_alerts import render_alert_messages
+from modules.var_engine import DEFAULT_CONFIDENCE, compute_var_report
+from modules.what_if_engine import DEFAULT_STOP_GRID, DEFAULT_TRIM_GRID, evaluate_stop_grid
 
 DATA_PATH = "data"
 
@@ -15,43 +36,68 @@ def load_most_recent_file(keyword: str):
         print(f"⚠ Data folder not found: {DATA_PATH}")
         return None
 
-    files = [
-        f for f in os.listdir(DATA_PATH)
-        if keyword.lower() in f.lower() and f.lower().endswith(".csv")
-    ]
-    if not files:
-        return None
-
-    files.sort()
-    return os.path.join(DATA_PATH, files[-1])
+    return get_manifest(DATA_PATH).latest(keyword)
 
 
-def load_portfolio():
+def load_portfolio(stream_chunksize: int = None, keep_tickers=None):
     path = load_most_recent_file("Portfolio")
     if not path:
         print("⚠ No portfolio file found.")
         return None
 
     print(f"\n🗂 Loading Portfolio File: {os.path.basename(path)}")
+    if stream_chunksize:
+        return load_portfolio_streaming(path, stream_chunksize, keep_tickers)
     try:
-        return pd.read_csv(path)
+        return cached_frame(path, read_positions_csv, tag="positions_schema")
     except Exception as e:
         print(f"⚠ Error loading portfolio file: {e}")
         return None
 
 
+def load_portfolio_streaming(path: str, chunksize: int, keep_tickers=None):
+    """
+    Reads the export in bounded chunks. The portfolio summary comes from
+    the running totals; only rows whose Ticker is in keep_tickers are
+    kept for the later stages (every row when keep_tickers is None).
+    """
+    def report_progress(aggregator):
+        summary = aggregator.summary()
+        print(f"   … {aggregator.rows:,} rows read — running value ${summary['total_value']:,.2f}")
+
+    row_filter = None
+    if keep_tickers is not None:
+        keep = pd.Index(keep_tickers)
+        row_filter = lambda chunk: chunk["Ticker"].astype(str).str.strip().str.upper().isin(keep).to_numpy()
+
+    try:
+        df, aggregator = ingest_positions_streaming(path, chunksize=chunksize, on_chunk=report_progress,
+                                                    row_filter=row_filter)
+    except Exception as e:
+        print(f"⚠ Error streaming portfolio file: {e}")
+        return None
+
+    summary = aggregator.summary()
+    print(f"\n📊 Portfolio Summary — {aggregator.rows:,} positions in {len(aggregator.account_totals())} account(s)")
+    print(f"💰 Total Value: ${summary['total_value']:,.2f} — Total Gain/Loss: ${summary['total_gain']:,.2f}")
+    if keep_tickers is not None:
+        print(f"   {0 if df is None else len(df):,} screened position(s) kept for scoring")
+    return df
+
+
 def load_zacks_files():
-    categories = ["Growth1", "Growth 1", "Growth2", "Growth 2", "Defensive"]
     loaded = {}
+    if not os.path.isdir(DATA_PATH):
+        print(f"⚠ Data folder not found: {DATA_PATH}")
+        return loaded
 
-    for cat in categories:
-        path = load_most_recent_file(cat)
-        if path:
-            print(f"📥 Loaded Zacks File: {os.path.basename(path)}")
-            try:
-                loaded[cat] = pd.read_csv(path)
-            except Exception as e:
-                print(f"⚠ Error loading {path}: {e}")
+    sources = discover_screens(DATA_PATH)
+    for cat, df, error in iter_screen_loads(sources):
+        if error is not None:
+            print(f"⚠ Error loading {sources[cat]}: {error}")
+            continue
+        print(f"📥 Loaded Zacks File: {os.path.basename(sources[cat])}")
+        loaded[cat] = df
 
     if not loaded:
         print("\n⚠ No Zacks screening files found.")
@@ -64,7 +110,7 @@ def show_portfolio_summary(df: pd.DataFrame):
         return
 
     if {"Quantity", "Last Price"}.issubset(df.columns):
-        df["Value"] = pd.to_numeric(df["Quantity"], errors="coerce") * pd.to_numeric(df["Last Price"].replace('[\$,]', '', regex=True), errors="coerce")
+        df["Value"] = df["Quantity"] * df["Last Price"]
         total_value = df["Value"].sum()
     else:
         total_value = None
@@ -77,36 +123,63 @@ def show_portfolio_summary(df: pd.DataFrame):
         print(f"\n💰 Estimated Total Portfolio Value: ${total_value:,.2f}")
 
 
-def crossmatch_with_zacks(portfolio_df: pd.DataFrame, zacks_data: dict):
-    if portfolio_df is None or not zacks_data:
-        print("\n⚠ Missing portfolio or Zacks data.")
-        return None
+def show_account_summaries(df: pd.DataFrame, trailing_pct: float = None):
+    if df is None or df.empty:
+        return
 
-    portfolio_df = portfolio_df.copy()
-    portfolio_df["Ticker"] = portfolio_df["Ticker"].astype(str).str.upper()
+    store = get_stop_state() if trailing_pct is not None else None
+    batch = run_account_batch(df, default_stop_pct=trailing_pct, stop_store=store)
+    accounts = batch["accounts"]
+    household = batch["household"]
 
-    all_matches = []
-    for category, zdf in zacks_data.items():
-        if "Ticker" not in zdf.columns:
-            continue
-        zdf = zdf.copy()
-        zdf["Ticker"] = zdf["Ticker"].astype(str).str.upper()
+    print("\n🏦 Account Summaries")
+    print(tabulate(accounts, headers="keys", tablefmt="github", floatfmt=".2f", showindex=False))
+    print(
+        f"\n🏠 Household: {int(household['accounts'])} account(s), "
+        f"${household['total_value']:,.2f} total value, ${household['total_gain']:,.2f} total gain/loss"
+    )
 
-        if "Zacks Rank" in zdf.columns:
-            zdf["Zacks Rank"] = pd.to_numeric(zdf["Zacks Rank"], errors="coerce")
 
-        merged = pd.merge(portfolio_df, zdf, on="Ticker", how="inner")
-        if not merged.empty:
-            merged["Screen Category"] = category
-            all_matches.append(merged)
+# Stop-loss / trim thresholds handed to apply_stop_logic
+STOP_SETTINGS = {"stop_loss_pct": -15.0, "trim_gain_pct": 25.0}
 
-    if not all_matches:
-        print("\n📭 No matches found between portfolio and Zacks data.")
+SCORE_COLUMNS = ["Stop Price", "RiskScore", "ZacksScore", "GainScore", "MomentumScore", "TacticalScore", "Tactical Priority"]
+
+
+def score_matches(matches: pd.DataFrame) -> pd.DataFrame:
+    scores = calculate_tactical_scores(matches)
+    scored = matches.copy()
+    for col in SCORE_COLUMNS:
+        scored[col] = scores[col]
+    if "Action" not in scored.columns:
+        scored["Action"] = scored["Tactical Priority"]
+    return apply_stop_logic(scored, **STOP_SETTINGS)
+
+
+def scoring_fingerprint() -> str:
+    """Identifies the active rule tables and stop settings — a change invalidates incremental results."""
+    return fingerprint(get_scoring_rules().tables, STOP_SETTINGS, SCORE_COLUMNS)
+
+
+def crossmatch_with_zacks(portfolio_df: pd.DataFrame, zacks_data: dict, incremental: bool = False):
+    if portfolio_df is None or not zacks_data:
+        print("\n⚠ Missing portfolio or Zacks data.")
         return None
 
-    result = pd.concat(all_matches, ignore_index=True)
-    result = apply_tactical_rules(result)
-    result = apply_stop_logic(result)
+    unchanged = False
+    if incremental:
+        result, info = run_incremental(portfolio_df, zacks_data, score_matches, fingerprint=scoring_fingerprint())
+        if info["mode"] == "incremental":
+            print(f"\n♻ Incremental run — {len(info['affected'])} ticker(s) re-scored.")
+            unchanged = not info["affected"]
+    else:
+        result, _ = crossmatch(portfolio_df, zacks_data)
+        if not result.empty:
+            result = score_matches(result)
+
+    if result.empty:
+        print("\n📭 No matches found between portfolio and Zacks data.")
+        return None
 
     display_cols = ["Ticker", "Zacks Rank", "Screen Category", "Action", "Stop Recommendation"]
     display_cols = [c for c in display_cols if c in result.columns]
@@ -114,27 +187,168 @@ def crossmatch_with_zacks(portfolio_df: pd.DataFrame, zacks_data: dict):
     print("\n🛡 Tactical Intelligence Output — Actionable Orders")
     print(tabulate(result[display_cols], headers="keys", tablefmt="github", floatfmt=".2f"))
 
-    export_to_csv(result)
-    export_to_pdf(result)
+    if unchanged and os.path.exists("tactical_intelligence_report.csv") and os.path.exists("tactical_intelligence_report.pdf"):
+        print("\n📁 No changes since last run — existing CSV/PDF reports kept.")
+    else:
+        written = render_artifacts(result, outputs=("csv", "pdf"))
+        for name, path in written.items():
+            if path:
+                print(f"{'📁' if name == 'csv' else '📄'} {name.upper()} Exported: {path}")
+
+    return result
+
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fox Valley Intelligence Engine — Tactical Console")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the parsed CSV and report caches and re-read every file")
+    parser.add_argument(
+        "--stream", nargs="?", type=int, const=DEFAULT_CHUNKSIZE, default=None, metavar="CHUNKSIZE",
+        help="Read the positions export in bounded chunks (large multi-account files); only screened "
+             "positions are kept unless --by-account, --watch or --var needs every row",
+    )
+    parser.add_argument(
+        "--by-account", action="store_true",
+        help="Score and summarise every account plus a household roll-up",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Re-score only tickers whose positions or screen rows changed since the last run",
+    )
+    parser.add_argument(
+        "--backtest", nargs="*", type=int, default=None, metavar="HORIZON",
+        help="Replay archived snapshots and grade signals over forward horizons (in snapshots)",
+    )
+    parser.add_argument(
+        "--watch", nargs="?", const="", default=None, metavar="REPLAY_CSV",
+        help="Stream price ticks (timestamp,ticker,price CSV; default: archived snapshots) through the live alert evaluator",
+    )
+    parser.add_argument(
+        "--trailing", type=float, default=None, metavar="PCT",
+        help="Trail stops by PCT from each position's persisted high-water mark (--watch, --by-account)",
+    )
+    parser.add_argument(
+        "--var", nargs="?", type=float, const=DEFAULT_CONFIDENCE, default=None, metavar="CONFIDENCE",
+        help="Historical / parametric / Monte Carlo VaR and CVaR from the archived snapshots (default 0.95)",
+    )
+    parser.add_argument(
+        "--what-if", action="store_true",
+        help="Show how many matched positions each stop-loss × trim threshold pair would sell or trim",
+    )
+    return parser.parse_args(argv)
+
+
+def watch_alerts(portfolio_df: pd.DataFrame, replay_csv: str = "", trailing_pct: float = None):
+    if portfolio_df is None:
+        print("\n⚠ Portfolio required for live alerts.")
+        return None
+    store = None
+    if trailing_pct is not None:
+        # Seed the stream from the persisted high-water marks / stops
+        store = get_stop_state()
+        portfolio_df = apply_trailing_stop(portfolio_df.copy(), trailing_pct, store=store)
+    if replay_csv:
+        feed = ReplayPriceFeed.from_csv(replay_csv)
+    else:
+        feed = ReplayPriceFeed.from_panel(get_history_store().panel("price"))
+
+    def print_events(events):
+        triggered = events["Status"] == "TRIGGERED"
+        for message in render_alert_messages(events[triggered]):
+            print(f"🔔 {message}")
+        for ticker, rule in zip(events.loc[~triggered, "Ticker"], events.loc[~triggered, "Rule"]):
+            print(f"✅ CLEARED: {ticker} {rule}")
+
+    print("\n📡 Live Alert Stream")
+    evaluator = asyncio.run(run_alert_stream(portfolio_df, feed, on_event=print_events, trailing_pct=trailing_pct))
+    if store is not None:
+        # Persist the stream's own high-water marks and stops — never the last tick alone
+        store.update_marks(evaluator.marks())
+        store.save()
+    stats = evaluator.latency_stats()
+    if stats:
+        print(f"\n⏱ {stats['ticks']} ticks in {stats['batches']} batches — p50 {stats['p50_ms']} ms, p99 {stats['p99_ms']} ms")
+    return evaluator
+
+
+def show_var(portfolio_df: pd.DataFrame, confidence: float = DEFAULT_CONFIDENCE):
+    if portfolio_df is None or portfolio_df.empty:
+        return None
+    report = compute_var_report(portfolio_df, confidence=confidence)
+    if not report["tickers"]:
+        print("\n📭 Not enough archived snapshots for VaR.")
+        return report
+    print(f"\n📉 Value at Risk — {confidence:.0%} confidence, 1 snapshot ({report['tickers']} tickers with history)")
+    measures = report["portfolio"].drop("Current Value")
+    print(tabulate(measures.to_frame("Portfolio").T, headers="keys", tablefmt="github", floatfmt=",.2f"))
+    if len(report["accounts"]) > 1:
+        print(tabulate(report["accounts"], headers="keys", tablefmt="github", floatfmt=",.2f", showindex=False))
+    return report
+
+
+def show_what_if(result: pd.DataFrame):
+    if result is None or result.empty:
+        return None
+    # Default grid plus the thresholds in force (marked ▶)
+    stops = sorted({*DEFAULT_STOP_GRID, STOP_SETTINGS["stop_loss_pct"]}, reverse=True)
+    trims = sorted({*DEFAULT_TRIM_GRID, STOP_SETTINGS["trim_gain_pct"]})
+    grid = evaluate_stop_grid(result, stops, trims)
+    summary = grid.summary()
+    current = (summary["Stop Loss %"] == STOP_SETTINGS["stop_loss_pct"]) & (summary["Trim Gain %"] == STOP_SETTINGS["trim_gain_pct"])
+    summary.insert(0, "", pd.Series(current).map({True: "▶", False: ""}))
+    print("\n🧪 What-If — Stop Loss × Trim Thresholds")
+    print(tabulate(summary, headers="keys", tablefmt="github", floatfmt=".2f", showindex=False))
+    return grid
+
+
+def show_backtest(horizons):
+    result = run_backtest(horizons=tuple(horizons) or DEFAULT_HORIZONS)
+    if result["summary"].empty:
+        print("\n📭 Not enough snapshots to grade signals.")
+        return result
+    print("\n📼 Signal Backtest — Hit Rate & Forward Returns")
+    print(tabulate(result["summary"], headers="keys", tablefmt="github", floatfmt=".2f", showindex=False))
     return result
 
 
-def main():
+def main(argv=None):
+    args = parse_args(argv)
+    set_cache_enabled(not args.no_cache)
+    set_memo_enabled(not args.no_cache)
+
     print("\n🧭 Fox Valley Intelligence Engine — Tactical Console (CLI Edition)")
     print("==================================================================\n")
     print(f"Run Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 
-    portfolio_df = load_portfolio()
+    if args.backtest is not None:
+        show_backtest(args.backtest)
+        return
+
     zacks_files = load_zacks_files()
+    # Streamed exports keep only the screened positions unless a stage needs every row
+    keep_tickers = None
+    if args.stream and not (args.by_account or args.watch is not None or args.var is not None):
+        keep_tickers = build_screen_index(zacks_files)["Ticker"].unique()
+    portfolio_df = load_portfolio(stream_chunksize=args.stream, keep_tickers=keep_tickers)
+
+    if args.watch is not None:
+        watch_alerts(portfolio_df, args.watch, args.trailing)
+        return
 
-    show_portfolio_summary(portfolio_df)
-    crossmatch_with_zacks(portfolio_df, zacks_files)
+    if not args.stream:
+        show_portfolio_summary(portfolio_df)
+    if args.by_account:
+        show_account_summaries(portfolio_df, args.trailing)
+    if args.var is not None:
+        show_var(portfolio_df, args.var)
+    result = crossmatch_with_zacks(portfolio_df, zacks_files, incremental=args.incremental)
+    if args.what_if:
+        show_what_if(result)
 
     print("\n🚀 Engine Execution Complete — Final Assembly Online.\n")
 
     print("\n🔍 Running Profit & Risk Analyzer…")
-    run_profit_risk_analyzer()
+    if portfolio_df is not None:
+        calculate_profit_and_risk(portfolio_df.copy())
 
 
 if __name__ == "__main__":
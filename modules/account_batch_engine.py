@@ -0,0 +1,93 @@
+# =========================================================
+# 🏦 Account Batch Engine — v7.7R
+# Scores, risk-classifies and summarises every account in a
+# multi-account export — plus a household roll-up — in one
+# grouped vectorized pass instead of one pipeline per account.
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+from modules.position_schema_engine import ensure_numeric
+from modules.risk_heatmap_engine import generate_risk_heatmap
+from modules.tactical_scoring_engine import calculate_tactical_scores
+from modules.trailing_stop_manager import apply_trailing_stop
+
+ACCOUNT_COLUMN = "Account Number"
+RISK_LEVELS = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+
+
+def _summaries(df, keys):
+    """calculate_portfolio_summary figures, per group when keys are given."""
+    frame = pd.DataFrame({
+        "total_value": df["Current Value"],
+        "total_gain": df["Gain/Loss $"],
+        "avg_gain_pct": df["Gain/Loss %"],
+        "positions": 1,
+    })
+    if keys is None:
+        return frame.agg({"total_value": "sum", "total_gain": "sum", "avg_gain_pct": "mean", "positions": "sum"})
+    return frame.groupby(keys, observed=True, dropna=False).agg(
+        {"total_value": "sum", "total_gain": "sum", "avg_gain_pct": "mean", "positions": "sum"}
+    )
+
+
+def run_account_batch(portfolio_df: pd.DataFrame, account_col: str = ACCOUNT_COLUMN, default_stop_pct: float = None,
+                      stop_store=None):
+    """
+    Batch-evaluates every account in portfolio_df.
+
+    Parameters:
+        portfolio_df: Schema-typed positions (Ticker, Current Value, Gain/Loss $ / %, Current Price…).
+        account_col: Column identifying the account.
+        default_stop_pct: Applies a universal trailing stop first when no Stop Price is present.
+        stop_store: Optional stop_state_engine store — the default stop then trails
+                    each position's persisted high-water mark.
+
+    Returns dict:
+        positions — per-position scores, account-relative risk columns and Household Weight %
+        accounts  — one summary row per account (value, gain, avg gain %, positions, risk-level counts)
+        household — summary Series for the whole book
+    """
+    if portfolio_df is None or portfolio_df.empty:
+        return {"positions": pd.DataFrame(), "accounts": pd.DataFrame(), "household": pd.Series(dtype=float)}
+
+    df = portfolio_df.copy()
+    if account_col not in df.columns:
+        df[account_col] = "ALL"
+    ensure_numeric(df, ["Current Value", "Gain/Loss $", "Gain/Loss %", "Current Price", "Stop Price"])
+    if "Stop Price" not in df.columns and default_stop_pct is not None:
+        df = apply_trailing_stop(df, default_stop_pct, store=stop_store)
+
+    # Row-local scoring runs once over every account
+    scores = calculate_tactical_scores(df)
+
+    # Account-relative risk (grouped) + household-relative weight (ungrouped)
+    risk = generate_risk_heatmap(df, group_by=account_col)
+    household_weight = round(df["Current Value"] / df["Current Value"].sum() * 100, 2)
+
+    positions = scores.copy()
+    positions.insert(0, account_col, df[account_col])
+    for col in ["CapitalWeight %", "StopRisk %", "LossSeverity %", "Risk Level"]:
+        positions[col] = risk[col]
+    positions["Household Weight %"] = household_weight
+
+    keys = df[account_col]
+    accounts = _summaries(df, keys)
+    level_counts = (
+        pd.crosstab(keys, pd.Categorical(risk["Risk Level"], categories=RISK_LEVELS), dropna=False)
+        .reindex(accounts.index, fill_value=0)
+    )
+    for level in RISK_LEVELS:
+        accounts[f"{level.title()} Positions"] = level_counts[level].to_numpy() if level in level_counts else 0
+    accounts["Household Weight %"] = round(accounts["total_value"] / accounts["total_value"].sum() * 100, 2)
+    accounts.index.name = account_col
+
+    household = _summaries(df, None)
+    household["accounts"] = len(accounts)
+
+    return {
+        "positions": positions,
+        "accounts": accounts.reset_index(),
+        "household": household,
+    }
@@ -0,0 +1,352 @@
+# =========================================================
+# 🔕 Alert State Engine — v7.7R
+# Alert deduplication / suppression between runs:
+# • One state row per (account, ticker, rule) with first-seen,
+#   last-seen, last-notified metric and escalation count
+# • Each run reports only NEW, ESCALATED or RESOLVED alerts;
+#   a cooldown keeps flapping alerts from being re-announced
+# • SQLite table in archive/ (WITHOUT ROWID, WAL journal) mirrored
+#   by an in-memory dict — O(1) lookups, and only the rows that
+#   changed are upserted, so stream loops never rewrite the file
+# • One store serves every thread (Streamlit reruns each session on
+#   its own thread): the connection is shared and updates serialise
+#   on a lock
+# =========================================================
+
+import functools
+import math
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from modules.stop_state_engine import ALL_ACCOUNTS
+from modules.tactical_alerts import ALERT_RULES, ALERT_SEVERITIES
+
+ALERT_STATE_FILE = os.path.join("archive", "alert_state.db")
+CHANGE_STATUSES = ["NEW", "ESCALATED", "RESOLVED"]
+DEFAULT_COOLDOWN = 3600.0  # seconds between two notices for the same alert
+
+# Signed metric move (from the last notified value) that counts as an
+# escalation; rules without a step only escalate on severity.
+ESCALATION_STEPS = {
+    "HEAVY_LOSS": -5.0,       # another 5 points of loss
+    "CAPITAL_CLUSTER": 5.0,   # another 5 points of concentration
+    "NEAR_STOP": -1.5,        # 1.5 points closer to the stop
+}
+
+STATE_FIELDS = [
+    "severity", "metric", "notified_metric", "first_seen", "last_seen",
+    "last_notified", "occurrences", "escalations", "active", "notified",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_state (
+    account TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    severity INTEGER,
+    metric REAL,
+    notified_metric REAL,
+    first_seen REAL,
+    last_seen REAL,
+    last_notified REAL,
+    occurrences INTEGER,
+    escalations INTEGER,
+    active INTEGER,
+    notified INTEGER,
+    PRIMARY KEY (account, ticker, rule)
+) WITHOUT ROWID
+"""
+
+_UPSERT = f"""
+INSERT INTO alert_state (account, ticker, rule, {", ".join(STATE_FIELDS)})
+VALUES ({", ".join("?" * (len(STATE_FIELDS) + 3))})
+ON CONFLICT (account, ticker, rule) DO UPDATE SET
+{", ".join(f"{f} = excluded.{f}" for f in STATE_FIELDS)}
+"""
+
+
+def _epoch(when) -> float:
+    """Epoch seconds of a (naive, like the rest of the engine) timestamp."""
+    return (pd.Timestamp.now() if when is None else pd.Timestamp(when)).timestamp()
+
+
+def _alert_keys(table: pd.DataFrame):
+    """(account, ticker, rule) tuples for each row of an alert table or event frame."""
+    if "Account" in table.columns:
+        accounts = table["Account"].where(table["Account"].notna(), ALL_ACCOUNTS).astype(str).str.strip()
+    else:
+        accounts = pd.Series(ALL_ACCOUNTS, index=table.index)
+    tickers = table["Ticker"].astype(str).str.strip().str.upper()
+    return list(zip(accounts.to_numpy(dtype=object), tickers.to_numpy(dtype=object),
+                    table["Rule"].astype(str).to_numpy(dtype=object)))
+
+
+def _locked(method):
+    """Runs a store method under the store's lock (dict and connection are shared by threads)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class AlertStateStore:
+    """
+    Persistent alert state keyed by (account, ticker, rule).
+
+    state fields:
+        severity        — severity code (index into ALERT_SEVERITIES, 0 = CRITICAL)
+        metric          — metric at the most recent observation
+        notified_metric — metric when the alert was last announced
+        first_seen      — epoch seconds the current episode started
+        last_seen       — epoch seconds of the most recent observation
+        last_notified   — epoch seconds of the most recent notice (any status)
+        occurrences     — observations in the current episode
+        escalations     — ESCALATED notices in the current episode
+        active          — rule currently firing
+        notified        — the last notice said "firing" (NEW / ESCALATED)
+    """
+
+    def __init__(self, path: str = ALERT_STATE_FILE, cooldown: float = DEFAULT_COOLDOWN,
+                 escalation_steps: dict = None):
+        self.path = path
+        self.cooldown = cooldown
+        self.escalation_steps = ESCALATION_STEPS if escalation_steps is None else escalation_steps
+        self.state = {}
+        self._conn = None
+        self._lock = threading.RLock()
+        self._open()
+
+    # --------------------------- persistence -------------------------
+    def _open(self):
+        try:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(_SCHEMA)
+            rows = self._conn.execute(f"SELECT account, ticker, rule, {', '.join(STATE_FIELDS)} FROM alert_state")
+            self.state = {row[:3]: list(row[3:]) for row in rows}
+        except Exception as e:
+            print(f"⚠ Alert state unavailable, running in memory only: {e}")
+            self._conn = None
+
+    @_locked
+    def _write(self, keys):
+        """Upserts only the given keys in one transaction."""
+        if self._conn is None or not keys:
+            return
+        try:
+            with self._conn:
+                self._conn.executemany(_UPSERT, [(*key, *self.state[key]) for key in keys])
+        except Exception as e:
+            print(f"⚠ Alert state write failed: {e}")
+
+    @_locked
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ----------------------------- updates ---------------------------
+    def _cooled(self, record, now):
+        return record[5] is None or now - record[5] >= self.cooldown
+
+    def _escalated(self, rule, record, metric):
+        step = self.escalation_steps.get(rule)
+        if not step or record[2] is None or math.isnan(metric) or math.isnan(record[2]):
+            return False
+        return (metric - record[2]) / step >= 1.0
+
+    def _observe(self, key, severity, metric, now):
+        """Rule firing for key. Returns NEW / ESCALATED / None."""
+        record = self.state.get(key)
+        if record is None:
+            record = [severity, metric, None, now, now, None, 0, 0, 1, 0]
+            self.state[key] = record
+        elif not record[8]:
+            record[0], record[3], record[6], record[7], record[8] = severity, now, 0, 0, 1
+        record[1], record[4] = metric, now
+        record[6] += 1
+
+        if not record[9]:
+            record[0] = severity
+            if not self._cooled(record, now):
+                return None  # re-fired inside the cooldown — stay quiet
+            record[2], record[5], record[9] = metric, now, 1
+            return "NEW"
+
+        # Severity escalations bypass the cooldown, metric escalations respect it
+        if severity < record[0] or (self._escalated(key[2], record, metric) and self._cooled(record, now)):
+            record[0], record[2], record[5] = min(record[0], severity), metric, now
+            record[7] += 1
+            return "ESCALATED"
+        return None
+
+    def _clear(self, key, now):
+        """Rule no longer firing for key. Returns RESOLVED / None."""
+        record = self.state.get(key)
+        if record is None or not record[8]:
+            return None
+        record[8], record[4] = 0, now
+        if record[9]:
+            record[5], record[9] = now, 0
+            return "RESOLVED"
+        return None
+
+    def _changes(self, changes, rows):
+        columns = ["Account", "Ticker", "Rule", "Severity", "Status", "Metric", "Reference",
+                   "Threshold", "Scope", "First Seen", "Last Seen", "Occurrences", "Escalations"]
+        if not changes:
+            return pd.DataFrame(columns=columns)
+        keys = [k for k, _ in changes]
+        records = [self.state[k] for k in keys]
+        rule_names = list(ALERT_RULES)
+        return pd.DataFrame({
+            "Account": [k[0] for k in keys],
+            "Ticker": [k[1] for k in keys],
+            "Rule": pd.Categorical([k[2] for k in keys], categories=rule_names),
+            "Severity": pd.Categorical.from_codes(
+                np.array([r[0] for r in records], dtype=np.int8), categories=ALERT_SEVERITIES, ordered=True),
+            "Status": pd.Categorical([s for _, s in changes], categories=CHANGE_STATUSES),
+            "Metric": [r[1] for r in records],
+            "Reference": [rows.get(k, (np.nan, None))[0] for k in keys],
+            "Threshold": [ALERT_RULES[k[2]]["threshold"] if k[2] in ALERT_RULES else np.nan for k in keys],
+            "Scope": [rows.get(k, (np.nan, None))[1] for k in keys],
+            "First Seen": pd.to_datetime([r[3] for r in records], unit="s"),
+            "Last Seen": pd.to_datetime([r[4] for r in records], unit="s"),
+            "Occurrences": [r[6] for r in records],
+            "Escalations": [r[7] for r in records],
+        }, columns=columns)
+
+    @_locked
+    def reconcile(self, alert_table: pd.DataFrame, when=None, full: bool = True, rules=None) -> pd.DataFrame:
+        """
+        Applies one evaluation (a tactical_alerts.build_alert_table result)
+        and returns only the alerts whose state changed, in the alert-table
+        layout plus Status (NEW / ESCALATED / RESOLVED), First Seen,
+        Last Seen, Occurrences and Escalations.
+
+        full=True treats the table as the complete set of firing alerts:
+        active alerts missing from it are resolved (limited to `rules`
+        when given, e.g. the rule ids the evaluation covered).
+        """
+        now = _epoch(when)
+        changes, touched, rows = [], [], {}
+        if alert_table is not None and not alert_table.empty:
+            severity = pd.Categorical(alert_table["Severity"].astype(str), categories=ALERT_SEVERITIES).codes.tolist()
+            metric = pd.to_numeric(alert_table["Metric"], errors="coerce").to_numpy(dtype="float64").tolist()
+            reference = pd.to_numeric(alert_table["Reference"], errors="coerce").to_numpy(dtype="float64")
+            scope = alert_table["Scope"].to_numpy(dtype=object)
+            for i, key in enumerate(_alert_keys(alert_table)):
+                if key in rows:
+                    continue  # duplicate position rows — first one wins
+                rows[key] = (reference[i], scope[i])
+                status = self._observe(key, severity[i], metric[i], now)
+                touched.append(key)
+                if status:
+                    changes.append((key, status))
+
+        if full:
+            rules = None if rules is None else {str(r) for r in ([rules] if isinstance(rules, str) else rules)}
+            for key, record in self.state.items():
+                if record[8] and key not in rows and (rules is None or key[2] in rules):
+                    status = self._clear(key, now)
+                    touched.append(key)
+                    if status:
+                        changes.append((key, status))
+
+        self._write(touched)
+        return self._changes(changes, rows)
+
+    @_locked
+    def record_events(self, events: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applies alert_stream_engine event frames (Status TRIGGERED / RESOLVED)
+        and returns the resulting changes, as reconcile does. Alerts not in
+        the frame are left untouched.
+        """
+        if events is None or events.empty:
+            return self._changes([], {})
+        firing = (events["Status"].astype(str) == "TRIGGERED").to_numpy()
+        when = events["Timestamp"].iloc[0] if "Timestamp" in events.columns else None
+        changes = self.reconcile(events[firing], when=when, full=False)
+        now = _epoch(when)
+        touched, cleared = [], []
+        for key in _alert_keys(events[~firing]):
+            record = self.state.get(key)
+            if record is None or not record[8]:
+                continue  # never stored (e.g. seeded silently by the stream) or already clear
+            touched.append(key)
+            status = self._clear(key, now)
+            if status:
+                cleared.append((key, status))
+        self._write(touched)
+        if not cleared:
+            return changes
+        return pd.concat([changes, self._changes(cleared, {})], ignore_index=True)
+
+    @_locked
+    def reset(self, tickers=None):
+        """Forgets alert history (everything, or just these tickers)."""
+        if tickers is None:
+            keys = list(self.state)
+        else:
+            wanted = {t.strip().upper() for t in ([tickers] if isinstance(tickers, str) else tickers)}
+            keys = [k for k in self.state if k[1] in wanted]
+        for key in keys:
+            del self.state[key]
+        if self._conn is not None and keys:
+            with self._conn:
+                self._conn.executemany("DELETE FROM alert_state WHERE account = ? AND ticker = ? AND rule = ?", keys)
+
+    @_locked
+    def purge(self, older_than: float = 30 * 86400, when=None) -> int:
+        """Drops resolved alerts not seen for `older_than` seconds. Returns rows dropped."""
+        cutoff = _epoch(when) - older_than
+        keys = [k for k, r in self.state.items() if not r[8] and r[4] < cutoff]
+        for key in keys:
+            del self.state[key]
+        if self._conn is not None and keys:
+            with self._conn:
+                self._conn.execute("DELETE FROM alert_state WHERE active = 0 AND last_seen < ?", (cutoff,))
+        return len(keys)
+
+    # ----------------------------- queries ---------------------------
+    @_locked
+    def get(self, account, ticker, rule) -> dict:
+        """State of one alert (None when never seen)."""
+        key = (str(account if account is not None else ALL_ACCOUNTS).strip(), str(ticker).strip().upper(), str(rule))
+        record = self.state.get(key)
+        return dict(zip(STATE_FIELDS, record)) if record is not None else None
+
+    @_locked
+    def active(self) -> pd.DataFrame:
+        """Every currently firing alert with its history."""
+        keys = [k for k, r in self.state.items() if r[8]]
+        frame = pd.DataFrame([self.state[k] for k in keys], columns=STATE_FIELDS)
+        frame.insert(0, "rule", [k[2] for k in keys])
+        frame.insert(0, "ticker", [k[1] for k in keys])
+        frame.insert(0, "account", [k[0] for k in keys])
+        for col in ["first_seen", "last_seen", "last_notified"]:
+            frame[col] = pd.to_datetime(frame[col], unit="s")
+        return frame
+
+
+# =========================================================
+# Shared process-wide store
+# =========================================================
+_stores = {}
+
+
+def get_alert_state(path: str = ALERT_STATE_FILE, cooldown: float = DEFAULT_COOLDOWN) -> AlertStateStore:
+    store = _stores.get(path)
+    if store is None:
+        store = AlertStateStore(path, cooldown)
+        _stores[path] = store
+    return store
@@ -0,0 +1,367 @@
+# =========================================================
+# 📡 Streaming Alert Evaluator — v7.7R
+# Long-running asyncio loop that keeps the book, its stops and
+# the tactical_alerts thresholds in memory and re-evaluates the
+# price-driven rules (stop breach, near stop, heavy loss) only
+# for tickers that ticked.
+# • Pluggable price feeds: local replay (file or history store),
+#   asyncio queue, newline-delimited socket
+# • Edge-triggered events (TRIGGERED / RESOLVED) in the
+#   tactical_alerts table layout, fanned out to subscribers
+# • Optional trailing stops ratcheted per tick
+# =========================================================
+
+import asyncio
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.position_schema_engine import ensure_numeric
+from modules.tactical_alerts import ALERT_RULES, ALERT_SEVERITIES
+from modules.trailing_stop_manager import resolve_stop_pcts
+
+STREAM_RULES = ["STOP_BREACH", "NEAR_STOP", "HEAVY_LOSS"]
+EVENT_STATUSES = ["TRIGGERED", "RESOLVED"]
+
+
+# =========================================================
+# Price Feeds — async iterables of {ticker: price} batches
+# =========================================================
+class ReplayPriceFeed:
+    """
+    Replays recorded prices as tick batches, one batch per timestamp.
+    speed: None = as fast as possible, otherwise wall-clock seconds per
+    recorded second are divided by speed.
+    """
+
+    def __init__(self, ticks: pd.DataFrame, speed: float = None):
+        ticks = ticks.dropna(subset=["price"])
+        self.batches = [
+            (when, dict(zip(group["ticker"].astype(str).str.upper(), group["price"].astype(float))))
+            for when, group in ticks.groupby("timestamp", sort=True)
+        ]
+        self.speed = speed
+
+    @classmethod
+    def from_csv(cls, path: str, speed: float = None):
+        """CSV with timestamp, ticker, price columns (case-insensitive)."""
+        ticks = pd.read_csv(path)
+        ticks.columns = ticks.columns.str.strip().str.lower()
+        ticks["timestamp"] = pd.to_datetime(ticks["timestamp"])
+        return cls(ticks, speed)
+
+    @classmethod
+    def from_panel(cls, panel: pd.DataFrame, speed: float = None):
+        """Date × ticker price panel (e.g. HistoryStore.panel('price'))."""
+        ticks = panel.stack().rename("price").reset_index()
+        ticks.columns = ["timestamp", "ticker", "price"]
+        return cls(ticks, speed)
+
+    async def __aiter__(self):
+        previous = None
+        for when, batch in self.batches:
+            if self.speed and previous is not None:
+                await asyncio.sleep(max(0.0, (when - previous).total_seconds() / self.speed))
+            previous = when
+            yield batch
+            await asyncio.sleep(0)
+
+
+class QueuePriceFeed:
+    """Feed backed by an asyncio.Queue — push() batches from any producer; close() ends it."""
+
+    _CLOSED = object()
+
+    def __init__(self, maxsize: int = 0):
+        self.queue = asyncio.Queue(maxsize)
+
+    async def push(self, batch: dict):
+        await self.queue.put(batch)
+
+    async def close(self):
+        await self.queue.put(self._CLOSED)
+
+    async def __aiter__(self):
+        while True:
+            batch = await self.queue.get()
+            if batch is self._CLOSED:
+                return
+            # Coalesce everything already queued into one batch
+            while not self.queue.empty():
+                more = self.queue.get_nowait()
+                if more is self._CLOSED:
+                    yield batch
+                    return
+                batch = {**batch, **more}
+            yield batch
+
+
+class SocketPriceFeed:
+    """
+    Newline-delimited ticks over TCP: 'TICKER,PRICE' or JSON objects
+    ({"ticker": ..., "price": ...} or {ticker: price, ...}). Lines that
+    arrive together are coalesced into one batch.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+
+    @staticmethod
+    def parse_line(line: str) -> dict:
+        line = line.strip()
+        if not line:
+            return {}
+        if line.startswith("{"):
+            payload = json.loads(line)
+            if "ticker" in payload and "price" in payload:
+                return {str(payload["ticker"]).upper(): float(payload["price"])}
+            return {str(k).upper(): float(v) for k, v in payload.items()}
+        ticker, price = line.split(",", 1)
+        return {ticker.strip().upper(): float(price)}
+
+    async def __aiter__(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        pending = b""
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    return
+                *lines, pending = (pending + chunk).split(b"\n")
+                batch = {}
+                for line in lines:
+                    try:
+                        batch.update(self.parse_line(line.decode("utf-8")))
+                    except (ValueError, KeyError) as e:
+                        print(f"⚠ Price feed line skipped: {e}")
+                if batch:
+                    yield batch
+        finally:
+            writer.close()
+
+
+# =========================================================
+# Evaluator
+# =========================================================
+class StreamingAlertEvaluator:
+    """
+    In-memory alert state for one book.
+
+    Parameters:
+        portfolio_df: Positions with Ticker, Current Price and optionally
+                      Account Number, Stop Price, Gain/Loss %, Cost Basis.
+        trailing_pct: When given, stops trail each position's high-water
+                      mark (seeded from High Water Mark / Stop Price when
+                      present); otherwise Stop Price is static.
+        ticker_stops / sector_stops / account_stops: Trailing overrides
+                      resolved as in trailing_stop_manager.
+    """
+
+    def __init__(self, portfolio_df: pd.DataFrame, trailing_pct: float = None, ticker_stops=None,
+                 sector_stops=None, account_stops=None):
+        df = portfolio_df.reset_index(drop=True).copy()
+        if "Is Cash" in df.columns:
+            df = df[~df["Is Cash"].astype(bool)].reset_index(drop=True)
+        ensure_numeric(df, ["Current Price", "Stop Price", "Gain/Loss %", "Cost Basis", "High Water Mark"])
+
+        self.tickers = df["Ticker"].astype(str).str.strip().str.upper().to_numpy(dtype=object)
+        self._has_accounts = "Account Number" in df.columns
+        self.accounts = (
+            df["Account Number"].astype(str).to_numpy(dtype=object)
+            if self._has_accounts else np.full(len(df), None, dtype=object)
+        )
+        self.price = self._column(df, "Current Price")
+        self.stop = self._column(df, "Stop Price")
+
+        # Per-share cost basis: explicit, else implied by today's price and Gain/Loss %
+        cost = self._column(df, "Cost Basis")
+        implied = self.price / (1 + self._column(df, "Gain/Loss %") / 100)
+        self.cost = np.where(np.isnan(cost), implied, cost)
+
+        self.trailing = trailing_pct is not None
+        if self.trailing:
+            self.stop_pct = resolve_stop_pcts(df, ticker_stops, sector_stops, account_stops, trailing_pct).to_numpy()
+            self.high_water = np.fmax(self._column(df, "High Water Mark"), self.price)
+            self.stop = np.fmax(self.stop, np.round(self.high_water * (1 - self.stop_pct / 100), 2))
+
+        # Ticker → rows as CSR arrays, so a batch resolves with one indexer call
+        order = np.argsort(self.tickers, kind="stable")
+        self._index, starts = np.unique(self.tickers[order], return_index=True)
+        self._index = pd.Index(self._index)
+        self._offsets = np.append(starts, len(order))
+        self._row_order = order
+        self.active = np.zeros((len(df), len(STREAM_RULES)), dtype=bool)
+        self.thresholds = np.array([ALERT_RULES[r]["threshold"] for r in STREAM_RULES])
+        self._severity_codes = np.array(
+            [ALERT_SEVERITIES.index(ALERT_RULES[r]["severity"]) for r in STREAM_RULES], dtype=np.int8
+        )
+
+        self._subscribers = []
+        self.ticks = 0
+        self.batches = 0
+        self.latencies = []
+
+        # Establish the starting state silently
+        self._evaluate(np.arange(len(df)), pd.Timestamp.now(), publish=False)
+
+    @staticmethod
+    def _column(df, name):
+        if name not in df.columns:
+            return np.full(len(df), np.nan)
+        return df[name].to_numpy(dtype="float64", na_value=np.nan, copy=True)
+
+    # ------------------------- subscriptions -------------------------
+    def subscribe(self, callback=None, maxsize: int = 0):
+        """
+        Registers a subscriber. With a callback (sync or async) it is called
+        with each event frame; without one an asyncio.Queue is returned.
+        """
+        target = callback if callback is not None else asyncio.Queue(maxsize)
+        self._subscribers.append(target)
+        return target
+
+    async def _publish(self, events: pd.DataFrame):
+        for target in self._subscribers:
+            if isinstance(target, asyncio.Queue):
+                await target.put(events)
+            else:
+                result = target(events)
+                if asyncio.iscoroutine(result):
+                    await result
+
+    # --------------------------- evaluation --------------------------
+    def _rows_for(self, batch: dict):
+        keys = pd.Index(batch.keys()).astype(str).str.upper()
+        prices = np.fromiter(batch.values(), dtype="float64", count=len(batch))
+        pos = self._index.get_indexer(keys)
+        known = pos >= 0
+        pos, prices = pos[known], prices[known]
+        if len(pos) == 0:
+            return np.empty(0, dtype=int), np.empty(0)
+
+        counts = self._offsets[pos + 1] - self._offsets[pos]
+        if (counts == 1).all():
+            return self._row_order[self._offsets[pos]], prices
+        starts = np.repeat(self._offsets[pos], counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self._row_order[starts + within], np.repeat(prices, counts)
+
+    def _evaluate(self, rows, when, publish=True):
+        price = self.price[rows]
+        stop = self.stop[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stop_risk = np.round((price - stop) / price * 100, 2)
+            gain = np.round((price / self.cost[rows] - 1) * 100, 2)
+            state = np.column_stack([
+                price <= stop,
+                stop_risk <= self.thresholds[1],
+                gain <= self.thresholds[2],
+            ])
+
+        changed = state != self.active[rows]
+        self.active[rows] = state
+        if not publish or not changed.any():
+            return None
+
+        r, c = np.nonzero(changed)
+        metric = np.choose(c, [price[r], stop_risk[r], gain[r]])
+        return pd.DataFrame({
+            "Timestamp": when,
+            "Account": self.accounts[rows[r]],
+            "Ticker": self.tickers[rows[r]],
+            "Rule": pd.Categorical.from_codes(
+                np.array([list(ALERT_RULES).index(STREAM_RULES[i]) for i in c], dtype=np.int8),
+                categories=list(ALERT_RULES),
+            ),
+            "Severity": pd.Categorical.from_codes(self._severity_codes[c], categories=ALERT_SEVERITIES, ordered=True),
+            "Status": pd.Categorical.from_codes(np.where(state[r, c], 0, 1).astype(np.int8), categories=EVENT_STATUSES),
+            "Metric": metric,
+            "Reference": np.where(c == 0, stop[r], np.nan),
+            "Threshold": self.thresholds[c],
+            "Scope": None,
+        })
+
+    def apply_ticks(self, batch: dict, when=None):
+        """
+        Applies one {ticker: price} batch and returns the event frame
+        (None when no rule changed state). Only rows of ticked tickers are
+        touched.
+        """
+        rows, prices = self._rows_for(batch)
+        self.ticks += len(batch)
+        self.batches += 1
+        if len(rows) == 0:
+            return None
+
+        self.price[rows] = prices
+        if self.trailing:
+            self.high_water[rows] = np.fmax(self.high_water[rows], prices)
+            trailed = np.round(self.high_water[rows] * (1 - self.stop_pct[rows] / 100), 2)
+            self.stop[rows] = np.fmax(self.stop[rows], trailed)
+        return self._evaluate(rows, when if when is not None else pd.Timestamp.now())
+
+    async def run(self, feed, max_batches: int = None):
+        """Consumes a feed until it ends (or max_batches), publishing events."""
+        async for batch in feed:
+            started = time.perf_counter()
+            events = self.apply_ticks(batch)
+            if events is not None:
+                await self._publish(events)
+            self.latencies.append(time.perf_counter() - started)
+            if max_batches is not None and self.batches >= max_batches:
+                break
+
+    # ----------------------------- queries ---------------------------
+    def active_alerts(self) -> pd.DataFrame:
+        """Currently active stream rules, one row per (position, rule)."""
+        r, c = np.nonzero(self.active)
+        return pd.DataFrame({
+            "Account": self.accounts[r],
+            "Ticker": self.tickers[r],
+            "Rule": [STREAM_RULES[i] for i in c],
+            "Current Price": self.price[r],
+            "Stop Price": self.stop[r],
+        })
+
+    def marks(self) -> pd.DataFrame:
+        """
+        Last price, high-water mark and stop per position — the trailing
+        state to persist (StopStateStore.update_marks) after a run.
+        """
+        frame = pd.DataFrame({
+            "Ticker": self.tickers,
+            "Current Price": self.price,
+            "High Water Mark": self.high_water if self.trailing else np.nan,
+            "Stop Price": self.stop,
+            "Stop Breached": self.active[:, STREAM_RULES.index("STOP_BREACH")],
+        })
+        if self._has_accounts:
+            frame.insert(0, "Account Number", self.accounts)
+        return frame
+
+    def latency_stats(self) -> dict:
+        """Tick-to-publish latency in milliseconds."""
+        if not self.latencies:
+            return {}
+        ms = np.asarray(self.latencies) * 1000
+        return {
+            "batches": self.batches,
+            "ticks": self.ticks,
+            "mean_ms": round(float(ms.mean()), 3),
+            "p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p99_ms": round(float(np.percentile(ms, 99)), 3),
+            "max_ms": round(float(ms.max()), 3),
+        }
+
+
+async def run_alert_stream(portfolio_df: pd.DataFrame, feed, on_event=None, trailing_pct: float = None,
+                           max_batches: int = None) -> StreamingAlertEvaluator:
+    """Builds an evaluator, subscribes on_event (sync or async) and runs the feed to completion."""
+    evaluator = StreamingAlertEvaluator(portfolio_df, trailing_pct=trailing_pct)
+    if on_event is not None:
+        evaluator.subscribe(on_event)
+    await evaluator.run(feed, max_batches=max_batches)
+    return evaluator
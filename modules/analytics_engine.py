@@ -9,6 +9,8 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 import streamlit as st
 
+from modules.correlation_engine import get_rolling_correlation
+
 # ------------------------------------------------------------
 # Heatmap: Portfolio Weight Distribution
 # ------------------------------------------------------------
@@ -101,22 +103,35 @@ def render_zacks_composite_heatmap(scored_candidates):
 # ------------------------------------------------------------
 # Correlation Matrix
 # ------------------------------------------------------------
-def render_correlation_matrix(portfolio_df):
+MAX_HEATMAP_TICKERS = 25
+
+
+def render_correlation_matrix(portfolio_df, top_k=15):
     if portfolio_df is None or portfolio_df.empty:
         st.warning("Portfolio data unavailable for correlation matrix.")
         return
 
-    numeric_cols = portfolio_df.select_dtypes(include=["float", "int"]).columns
-    if len(numeric_cols) <= 1:
-        st.warning("Not enough numeric data to compute correlation matrix.")
+    if "Ticker" not in portfolio_df.columns:
+        st.warning("Missing 'Ticker' column for return correlation.")
         return
 
-    corr = portfolio_df[numeric_cols].corr()
+    # Return correlation from the position history (rolling, cached between renders)
+    engine = get_rolling_correlation()
+    tickers = portfolio_df["Ticker"].dropna().astype(str).str.strip().str.upper().unique()
+    corr = engine.correlation(tickers=tickers).dropna(how="all").dropna(axis=1, how="all")
+    if len(corr) <= 1:
+        st.warning("Not enough price history to compute return correlations.")
+        return
 
     with st.expander("🧩 Correlation Matrix Heat Map"):
-        fig, ax = plt.subplots(figsize=(11, 9))
-        sns.heatmap(corr, cmap="coolwarm", annot=True, fmt=".2f", linewidths=0.5, ax=ax)
-        st.pyplot(fig)
+        st.caption(f"Rolling {engine.window}-snapshot return correlation through {engine.last_date:%Y-%m-%d}")
+        if len(corr) <= MAX_HEATMAP_TICKERS:
+            fig, ax = plt.subplots(figsize=(11, 9))
+            sns.heatmap(corr, cmap="coolwarm", annot=True, fmt=".2f", linewidths=0.5, ax=ax, vmin=-1, vmax=1)
+            st.pyplot(fig)
+        else:
+            st.caption(f"{len(corr)} tickers — showing the most correlated pairs instead of a full heat map.")
+        st.dataframe(engine.top_pairs(top_k, tickers=corr.index, absolute=True), use_container_width=True)
 
 # ============================================================
 # Unified Analytics Display Function
@@ -0,0 +1,144 @@
+# =========================================================
+# 🏭 Artifact Pipeline — v7.7R
+# Renders every output of one finished result set concurrently:
+# • CSV / tactical PDF from the result frame
+# • Command report text file and executive briefing PDF
+# • Executive presentation slide deck PDF
+# The frame is serialised once (pickle protocol 5 spill file)
+# and loaded once per worker instead of re-pickled per task.
+# Each artifact is rendered to a temp file and moved into place
+# with os.replace — a failed renderer never leaves a partial file.
+# =========================================================
+
+import contextlib
+import io
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from modules.command_report_builder import command_report_to_textfile
+from modules.pdf_export_engine import export_report_to_pdf
+from modules.risk_and_reporting_engine import export_to_csv, export_to_pdf
+from modules.slide_pdf_export_engine import export_slides_to_pdf
+
+ARTIFACT_SPILL_DIR = os.path.join("cache", "artifacts")
+
+# Artifact name → (renderer, input, default filename)
+ARTIFACT_RENDERERS = {
+    "csv": (export_to_csv, "frame", "tactical_intelligence_report.csv"),
+    "pdf": (export_to_pdf, "frame", "tactical_intelligence_report.pdf"),
+    "report_txt": (command_report_to_textfile, "report", "command_report.txt"),
+    "report_pdf": (export_report_to_pdf, "report", "Fox_Valley_Executive_Tactical_Briefing.pdf"),
+    "slides_pdf": (export_slides_to_pdf, "slides", "Fox_Valley_Executive_Presentation.pdf"),
+}
+
+_worker_frames = {}
+
+
+def _load_frame(spill_path):
+    """Result frame for this process — read from the spill file once."""
+    if spill_path not in _worker_frames:
+        with open(spill_path, "rb") as f:
+            _worker_frames[spill_path] = pickle.load(f)
+    return _worker_frames[spill_path]
+
+
+def render_artifact(job: dict) -> str:
+    """
+    Renders one artifact to a temp file beside its target and atomically
+    moves it into place. Renderer console output is discarded.
+    job: name, path, and frame_path | report | slides.
+    """
+    renderer, kind, _ = ARTIFACT_RENDERERS[job["name"]]
+    payload = _load_frame(job["frame_path"]) if kind == "frame" else job[kind]
+
+    path = job["path"]
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            renderer(payload, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def _spill_frame(df: pd.DataFrame, spill_dir: str) -> str:
+    os.makedirs(spill_dir, exist_ok=True)
+    # Unique per call — concurrent render_artifacts runs must not share a spill file
+    fd, spill_path = tempfile.mkstemp(prefix="frame.", suffix=".pkl", dir=spill_dir)
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(df, f, protocol=5)
+    return spill_path
+
+
+def render_artifacts(result_df: pd.DataFrame = None, report_text: str = None, slides=None,
+                     outputs=None, out_dir: str = ".", filenames: dict = None,
+                     max_workers: int = None, spill_dir: str = ARTIFACT_SPILL_DIR) -> dict:
+    """
+    Renders the requested outputs (default: every artifact whose input was
+    given) across a process pool — sequentially when max_workers is 1 or
+    the pool is unavailable — and returns once all are written.
+
+    Returns {artifact name: path, or None when its renderer failed}.
+    """
+    inputs = {"frame": result_df, "report": report_text, "slides": slides}
+    if outputs is None:
+        outputs = [name for name, (_, kind, _) in ARTIFACT_RENDERERS.items() if inputs[kind] is not None]
+    filenames = filenames or {}
+
+    jobs = []
+    for name in outputs:
+        _, kind, default = ARTIFACT_RENDERERS[name]
+        if inputs[kind] is None:
+            print(f"⚠ Artifact '{name}' skipped — no {kind} input.")
+            continue
+        job = {"name": name, "path": os.path.join(out_dir, filenames.get(name, default))}
+        if kind != "frame":
+            job[kind] = inputs[kind]
+        jobs.append(job)
+    if not jobs:
+        return {}
+
+    spill_path = None
+    if any(ARTIFACT_RENDERERS[job["name"]][1] == "frame" for job in jobs):
+        spill_path = _spill_frame(result_df, spill_dir)
+        for job in jobs:
+            job["frame_path"] = spill_path
+
+    written = {}
+
+    def record(job, render):
+        try:
+            written[job["name"]] = render()
+        except Exception as e:
+            written[job["name"]] = None
+            print(f"⚠ Artifact '{job['name']}' failed: {e}")
+
+    try:
+        pending = jobs
+        workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+        if workers > 1 and len(jobs) > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = {pool.submit(render_artifact, job): job for job in jobs}
+                    for future in as_completed(futures):
+                        record(futures[future], future.result)
+                pending = []
+            except (OSError, RuntimeError) as e:
+                print(f"⚠ Process pool unavailable ({e}) — rendering sequentially.")
+                pending = [job for job in jobs if job["name"] not in written]
+
+        for job in pending:
+            record(job, lambda job=job: render_artifact(job))
+    finally:
+        if spill_path:
+            _worker_frames.pop(spill_path, None)
+            if os.path.exists(spill_path):
+                os.remove(spill_path)
+
+    return {job["name"]: written.get(job["name"]) for job in jobs}
@@ -0,0 +1,343 @@
+# =========================================================
+# 📼 Signal Backtest Engine — v7.7R
+# Replays every archived portfolio + screen snapshot through the
+# live scoring, stop and alert logic, then grades each signal
+# against forward price changes from later snapshots.
+# • One task per snapshot day, fanned out across a process pool
+# • Per-day signals cached in cache/backtest/ (keyed on file
+#   size/mtime + active scoring rules), so reruns only replay
+#   new or changed days
+# • Hit rate and average forward return per signal class
+# =========================================================
+
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from modules.csv_cache_engine import cached_frame, cached_read_csv
+from modules.crossmatch_engine import build_screen_index, crossmatch
+from modules.data_manifest_engine import DATA_PATH, get_manifest
+from modules.position_schema_engine import read_positions_csv
+from modules.risk_and_reporting_engine import apply_stop_logic
+from modules.scoring_rules_engine import load_rule_tables
+from modules.tactical_alerts import build_alert_table
+from modules.tactical_scoring_engine import calculate_tactical_scores
+from modules.trailing_stop_manager import apply_trailing_stop
+from modules.zacks_screen_registry import NON_SCREEN_CATEGORIES, match_screen
+
+BACKTEST_CACHE_DIR = os.path.join("cache", "backtest")
+BACKTEST_VERSION = "2"
+DEFAULT_HORIZONS = (1, 5)
+
+SIGNAL_COLUMNS = ["Tactical Priority", "Stop Recommendation", "Action"]
+SUMMARY_COLUMNS = ["signal_type", "signal", "Horizon", "Observations",
+                   "Hit Rate %", "Avg Fwd Return %", "Median Fwd Return %"]
+
+# +1 = expects the price to rise, -1 = expects it to fall, 0 = neutral
+# (neutral signals count as a hit when the price did not fall)
+SIGNAL_DIRECTION = {
+    "STRONG BUY": 1,
+    "ACCUMULATE/HOLD": 1,
+    "CAUTION / HOLD": 0,
+    "AT RISK / TRIM": -1,
+    "Hold": 0,
+    "Sell - Stop Loss Trigger": -1,
+    "Trim - Secure Profits": -1,
+    "Buy": 1,
+    "Sell": -1,
+    "STOP_BREACH": -1,
+    "HEAVY_LOSS": -1,
+    "CAPITAL_CLUSTER": 0,
+    "NEAR_STOP": -1,
+    "RANK1_BUY": 1,
+}
+
+
+# =========================================================
+# Replay Tasks
+# =========================================================
+def _screen_categories(manifest):
+    """(screen_name, category) for every screen category in the manifest."""
+    pairs = []
+    for category in manifest.categories():
+        if category in NON_SCREEN_CATEGORIES:
+            continue
+        pairs.append((match_screen(category) or category, category))
+    return pairs
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+        return [path, st.st_size, int(st.st_mtime_ns)]
+    except OSError:
+        return [path, None, None]
+
+
+def build_replay_tasks(data_path: str = DATA_PATH, start=None, end=None, stop_pct: float = None):
+    """
+    One task per portfolio snapshot date. Each day is paired with the most
+    recent drop of every screen on or before that date.
+    """
+    manifest = get_manifest(data_path)
+    screens = _screen_categories(manifest)
+    rules = load_rule_tables()
+
+    tasks = []
+    for as_of, path in manifest.history("Portfolio"):
+        if start is not None and pd.Timestamp(as_of) < pd.Timestamp(start):
+            continue
+        if end is not None and pd.Timestamp(as_of) > pd.Timestamp(end):
+            continue
+        day_screens = {}
+        for name, category in screens:
+            screen_path = manifest.as_of(category, as_of)
+            if screen_path and name not in day_screens:
+                day_screens[name] = screen_path
+
+        stamp = [BACKTEST_VERSION, stop_pct, rules, _file_stamp(path)] + [
+            [name, *_file_stamp(p)] for name, p in sorted(day_screens.items())
+        ]
+        key = hashlib.sha1(json.dumps(stamp, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+        tasks.append({
+            "date": as_of.isoformat(),
+            "portfolio": path,
+            "screens": day_screens,
+            "stop_pct": stop_pct,
+            "key": key,
+        })
+    return tasks
+
+
+def replay_day(task: dict) -> dict:
+    """
+    Runs one snapshot day through scoring, stop logic and alerts.
+    Returns {"signals": long frame (ticker, signal_type, signal, TacticalScore),
+             "prices": Series ticker → price}.
+    """
+    df = cached_frame(task["portfolio"], read_positions_csv, tag="positions_schema")
+    if "Is Cash" in df.columns:
+        df = df[~df["Is Cash"]]
+    df = df.reset_index(drop=True)
+    df["Ticker"] = df["Ticker"].astype(str).str.strip().str.upper()
+
+    screens = {name: cached_read_csv(p) for name, p in task["screens"].items()}
+    _, wide = crossmatch(df, screens)
+    if "Best Rank" in wide.columns:
+        df["Zacks Rank"] = wide["Best Rank"]
+    if task.get("stop_pct") is not None:
+        df = apply_trailing_stop(df, task["stop_pct"])
+    elif "Stop Price" not in df.columns:
+        df["Stop Price"] = np.nan
+
+    scored = calculate_tactical_scores(df)
+    if "Action" not in df.columns:
+        df["Action"] = ""
+    stops = apply_stop_logic(df)
+
+    frame = pd.DataFrame({
+        "ticker": df["Ticker"],
+        "TacticalScore": scored["TacticalScore"],
+        "Tactical Priority": scored["Tactical Priority"],
+        "Stop Recommendation": stops["Stop Recommendation"],
+        "Action": df["Action"].replace("", np.nan),
+    })
+    signals = frame.melt(
+        id_vars=["ticker", "TacticalScore"], value_vars=SIGNAL_COLUMNS,
+        var_name="signal_type", value_name="signal",
+    ).dropna(subset=["signal"])
+
+    # Alerts — zacks_df uses the lower-case screen layout the alert rules expect
+    index = build_screen_index(screens)
+    zacks_df = index.rename(columns={"Ticker": "ticker", "Zacks Rank": "zacks_rank"}) if not index.empty else None
+    table = build_alert_table(df, scored_df=scored, zacks_df=zacks_df)
+    alerts = pd.DataFrame({"ticker": table["Ticker"].to_numpy(), "signal": table["Rule"].astype(str).to_numpy()})
+    if not alerts.empty:
+        best_score = frame.groupby("ticker")["TacticalScore"].max()
+        alerts["signal_type"] = "Alert"
+        alerts["TacticalScore"] = alerts["ticker"].map(best_score)
+        signals = pd.concat([signals, alerts], ignore_index=True)
+
+    signals = signals.drop_duplicates(["ticker", "signal_type", "signal"]).reset_index(drop=True)
+    signals.insert(0, "date", pd.Timestamp(task["date"]))
+
+    # Held positions price first; screen Last Close fills tickers no longer held
+    prices = pd.to_numeric(df["Current Price"], errors="coerce").groupby(df["Ticker"]).mean()
+    if not index.empty and "Last Close" in index.columns:
+        closes = pd.to_numeric(index["Last Close"], errors="coerce").groupby(index["Ticker"]).mean()
+        prices = prices.combine_first(closes)
+
+    return {"signals": signals, "prices": prices.dropna()}
+
+
+# =========================================================
+# Cached Parallel Replay
+# =========================================================
+def _cache_path(task, cache_dir):
+    return os.path.join(cache_dir, f"{task['date']}_{task['key']}.pkl")
+
+
+def _load_cached(task, cache_dir):
+    try:
+        return pd.read_pickle(_cache_path(task, cache_dir))
+    except Exception:
+        return None
+
+
+def _store_cached(task, result, cache_dir):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = _cache_path(task, cache_dir)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pd.to_pickle(result, tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"⚠ Backtest cache write failed: {e}")
+
+
+def replay_snapshots(tasks, max_workers: int = None, use_cache: bool = True,
+                     cache_dir: str = BACKTEST_CACHE_DIR, verbose: bool = False) -> dict:
+    """
+    Replays every task, reusing cached days. Uncached days run across a
+    process pool (sequentially when max_workers is 1 or the pool is
+    unavailable). Returns {date: replay_day result}.
+    """
+    results, pending = {}, []
+    for task in tasks:
+        cached = _load_cached(task, cache_dir) if use_cache else None
+        if cached is not None:
+            results[task["date"]] = cached
+        else:
+            pending.append(task)
+
+    if verbose:
+        print(f"📼 Backtest: {len(results)} cached day(s), {len(pending)} to replay.")
+
+    def record(task, result):
+        results[task["date"]] = result
+        if use_cache:
+            _store_cached(task, result, cache_dir)
+
+    workers = max_workers or min(len(pending), os.cpu_count() or 1)
+    if workers > 1 and len(pending) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(replay_day, task): task for task in pending}
+                for future in as_completed(futures):
+                    task = futures[future]
+                    try:
+                        record(task, future.result())
+                    except Exception as e:
+                        print(f"⚠ Backtest day {task['date']} failed: {e}")
+            pending = []
+        except (OSError, RuntimeError) as e:
+            print(f"⚠ Process pool unavailable ({e}) — replaying sequentially.")
+            pending = [t for t in pending if t["date"] not in results]
+
+    for task in pending:
+        try:
+            record(task, replay_day(task))
+        except Exception as e:
+            print(f"⚠ Backtest day {task['date']} failed: {e}")
+
+    return results
+
+
+# =========================================================
+# Forward Returns & Grading
+# =========================================================
+def forward_returns(price_panel: pd.DataFrame, horizons=DEFAULT_HORIZONS) -> pd.DataFrame:
+    """
+    Long frame (date, ticker, Fwd <h> %) — percent change from each snapshot
+    to the snapshot h steps later.
+    """
+    frames = {}
+    for h in horizons:
+        frames[f"Fwd {h} %"] = ((price_panel.shift(-h) / price_panel - 1) * 100).stack()
+    out = pd.DataFrame(frames)
+    out.index.names = ["date", "ticker"]
+    return out.reset_index()
+
+
+def grade_signals(signals: pd.DataFrame, horizons=DEFAULT_HORIZONS) -> pd.DataFrame:
+    """
+    Hit rate and forward-return statistics per (signal_type, signal, horizon).
+    Hits are direction-adjusted via SIGNAL_DIRECTION.
+    """
+    if signals.empty or "signal" not in signals.columns:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    direction = signals["signal"].map(SIGNAL_DIRECTION).fillna(0).to_numpy()
+    rows = []
+    for h in horizons:
+        col = f"Fwd {h} %"
+        ret = signals[col].to_numpy(dtype="float64")
+        valid = ~np.isnan(ret)
+        with np.errstate(invalid="ignore"):
+            hit = np.where(direction > 0, ret > 0, np.where(direction < 0, ret < 0, ret >= 0))
+        graded = pd.DataFrame({
+            "signal_type": signals["signal_type"].to_numpy()[valid],
+            "signal": signals["signal"].to_numpy()[valid],
+            "ret": ret[valid],
+            "hit": hit[valid],
+        })
+        if graded.empty:
+            continue
+        stats = graded.groupby(["signal_type", "signal"]).agg(
+            Observations=("ret", "size"),
+            **{
+                "Hit Rate %": ("hit", lambda s: round(s.mean() * 100, 2)),
+                "Avg Fwd Return %": ("ret", lambda s: round(s.mean(), 2)),
+                "Median Fwd Return %": ("ret", lambda s: round(s.median(), 2)),
+            },
+        ).reset_index()
+        stats.insert(2, "Horizon", h)
+        rows.append(stats)
+
+    if not rows:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+    return pd.concat(rows, ignore_index=True).sort_values(["Horizon", "signal_type", "signal"], ignore_index=True)
+
+
+def run_backtest(data_path: str = DATA_PATH, horizons=DEFAULT_HORIZONS, start=None, end=None,
+                 stop_pct: float = None, max_workers: int = None, use_cache: bool = True,
+                 verbose: bool = True) -> dict:
+    """
+    Full backtest over every portfolio snapshot in data/ and data/archive/.
+
+    Parameters:
+        horizons: Forward windows, in snapshots.
+        start / end: Optional date bounds for the replayed days.
+        stop_pct: Universal trailing stop applied before scoring (None = raw exports).
+        max_workers: Process pool size (defaults to one per CPU).
+
+    Returns dict:
+        signals — one row per (date, ticker, signal) with TacticalScore and Fwd <h> % columns
+        summary — hit rate / forward return per signal class and horizon
+        prices  — date × ticker price panel used for grading
+    """
+    tasks = build_replay_tasks(data_path, start, end, stop_pct)
+    results = replay_snapshots(tasks, max_workers=max_workers, use_cache=use_cache, verbose=verbose) if tasks else {}
+    dates = sorted(results)
+    if not dates:
+        if verbose:
+            print("📭 No portfolio snapshots available for backtest.")
+        return {"signals": pd.DataFrame(), "summary": grade_signals(pd.DataFrame(), ()), "prices": pd.DataFrame()}
+
+    prices = pd.DataFrame({pd.Timestamp(d): results[d]["prices"] for d in dates}).T.sort_index()
+    prices.index.name = "date"
+    signals = pd.concat([results[d]["signals"] for d in dates], ignore_index=True)
+
+    signals = signals.merge(forward_returns(prices, horizons), on=["date", "ticker"], how="left")
+    for h in horizons:
+        if f"Fwd {h} %" not in signals.columns:
+            signals[f"Fwd {h} %"] = np.nan
+
+    summary = grade_signals(signals, horizons)
+    if verbose:
+        print(f"📼 Backtest replayed {len(dates)} snapshot(s), {len(signals)} signal(s).")
+    return {"signals": signals, "summary": summary, "prices": prices}
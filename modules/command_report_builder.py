@@ -1,4 +1,6 @@
 import pandas as pd
+from modules.tactical_alerts import render_alert_messages, sort_alerts
+from modules.report_memo_engine import memoize_report
 
 # =========================================================
 # 📑 Fox Valley Command Report Builder — v7.7R Final Build
@@ -10,8 +12,10 @@ import pandas as pd
 # • Tactical Scores
 # • Intelligence Brief
 # Returns a formatted narrative report string
+# (memoized on input content — see report_memo_engine)
 # =========================================================
 
+@memoize_report("command_report")
 def build_command_report(
     portfolio_df=None,
     risk_df=None,
@@ -55,6 +59,9 @@ def build_command_report(
 
     # ===== 3️⃣ Tactical Alerts =====
     sections.append("\n🚨 TACTICAL ALERTS")
+    if isinstance(alerts_list, pd.DataFrame):
+        # Structured alert table — most severe first, messages rendered here
+        alerts_list = render_alert_messages(sort_alerts(alerts_list))
     if alerts_list:
         for alert in alerts_list:
             sections.append(f"• {alert}")
@@ -0,0 +1,249 @@
+# =========================================================
+# 🧩 Rolling Correlation Engine — v7.7R
+# Returns-based covariance / correlation over the position
+# history, maintained with running sums:
+# • Each new snapshot adds one row and retires the row leaving
+#   the window — O(n²) per day instead of a full-window recompute
+# • Pairwise-complete statistics (tickers that enter or leave the
+#   book only count the days both were held), matching pandas .corr
+# • State persisted to cache/, latest matrix cached in memory
+# • Top-k most-correlated pairs without building a full heatmap
+# =========================================================
+
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from modules.history_store_engine import get_history_store
+
+CORRELATION_STATE = os.path.join("cache", "correlation_state.pkl")
+DEFAULT_WINDOW = 60
+MIN_PERIODS = 3
+STATE_VERSION = 1
+
+
+class RollingCorrelation:
+    """
+    Rolling pairwise covariance / correlation of daily returns.
+
+    Running sums per ticker pair (i, j) over days where both are present:
+        N   — count
+        Sx  — Σ r_i
+        Sxx — Σ r_i²
+        C   — Σ r_i · r_j
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, recompute_every: int = None):
+        self.window = window
+        self.recompute_every = recompute_every or window
+        self.tickers = []
+        self._pos = {}
+        self.rows = deque()  # (date, returns Series) inside the window
+        self.last_date = None
+        self.last_prices = None
+        self._reset_sums(0)
+        self._updates = 0
+        self._cache = {}
+
+    # ----------------------------- sums ------------------------------
+    def _reset_sums(self, n):
+        self.N = np.zeros((n, n))
+        self.Sx = np.zeros((n, n))
+        self.Sxx = np.zeros((n, n))
+        self.C = np.zeros((n, n))
+
+    def _grow(self, tickers):
+        new = [t for t in tickers if t not in self._pos]
+        if not new:
+            return
+        for t in new:
+            self._pos[t] = len(self.tickers)
+            self.tickers.append(t)
+        pad = ((0, len(new)), (0, len(new)))
+        self.N, self.Sx, self.Sxx, self.C = (np.pad(m, pad) for m in (self.N, self.Sx, self.Sxx, self.C))
+
+    def _vector(self, returns: pd.Series):
+        r = np.zeros(len(self.tickers))
+        m = np.zeros(len(self.tickers))
+        valid = returns.dropna()
+        idx = [self._pos[t] for t in valid.index]
+        r[idx] = valid.to_numpy(dtype="float64")
+        m[idx] = 1.0
+        return r, m
+
+    def _accumulate(self, returns: pd.Series, sign: float):
+        r, m = self._vector(returns)
+        self.N += sign * np.outer(m, m)
+        self.Sx += sign * np.outer(r, m)
+        self.Sxx += sign * np.outer(r * r, m)
+        self.C += sign * np.outer(r, r)
+
+    def _recompute(self):
+        """Rebuilds the sums from the window rows (clears floating-point drift)."""
+        self._reset_sums(len(self.tickers))
+        if not self.rows:
+            return
+        frame = pd.DataFrame([row for _, row in self.rows]).reindex(columns=self.tickers)
+        mask = frame.notna().to_numpy(dtype="float64")
+        r = frame.fillna(0.0).to_numpy(dtype="float64")
+        self.N = mask.T @ mask
+        self.Sx = r.T @ mask
+        self.Sxx = (r * r).T @ mask
+        self.C = r.T @ r
+
+    # ---------------------------- updates ----------------------------
+    def add_returns(self, when, returns: pd.Series):
+        """Adds one day of ticker → return and retires rows beyond the window."""
+        returns = returns[~returns.index.duplicated()]
+        self._grow(list(returns.index))
+        self.rows.append((pd.Timestamp(when), returns))
+        self._accumulate(returns, 1.0)
+        while len(self.rows) > self.window:
+            _, old = self.rows.popleft()
+            self._accumulate(old, -1.0)
+
+        self.last_date = pd.Timestamp(when)
+        self._updates += 1
+        if self._updates % self.recompute_every == 0:
+            self._recompute()
+        self._cache = {}
+
+    def add_prices(self, when, prices: pd.Series):
+        """Adds one price snapshot; returns are taken against the previous one."""
+        prices = pd.to_numeric(prices, errors="coerce")
+        prices = prices[~prices.index.duplicated()]
+        if self.last_prices is not None:
+            prev = self.last_prices.reindex(prices.index)
+            returns = (prices / prev - 1).replace([np.inf, -np.inf], np.nan)
+            self.add_returns(when, returns)
+        else:
+            self.last_date = pd.Timestamp(when)
+        self.last_prices = prices.dropna()
+
+    def update_from_store(self, store=None) -> int:
+        """Feeds every price snapshot newer than last_date. Returns days added."""
+        store = store or get_history_store()
+        panel = store.panel("price")
+        if panel.empty:
+            return 0
+        if self.last_date is not None:
+            panel = panel[panel.index > self.last_date]
+        for when, prices in panel.iterrows():
+            self.add_prices(when, prices)
+        return len(panel)
+
+    # ---------------------------- queries ----------------------------
+    def _stats(self, min_periods):
+        key = ("stats", min_periods)
+        if key not in self._cache:
+            N = self.N
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mean_i = self.Sx / N
+                mean_j = self.Sx.T / N
+                denom = N - 1
+                cov = (self.C - N * mean_i * mean_j) / denom
+                var_i = (self.Sxx - N * mean_i ** 2) / denom
+                var_j = (self.Sxx.T - N * mean_j ** 2) / denom
+                corr = cov / np.sqrt(var_i.clip(min=0) * var_j.clip(min=0))
+            thin = N < min_periods
+            cov[thin] = np.nan
+            corr[thin] = np.nan
+            corr = corr.clip(-1, 1)
+            self._cache[key] = (cov, corr)
+        return self._cache[key]
+
+    def _select(self, matrix, tickers):
+        frame = pd.DataFrame(matrix, index=self.tickers, columns=self.tickers)
+        if tickers is not None:
+            tickers = [str(t).strip().upper() for t in tickers]
+            frame = frame.reindex(index=tickers, columns=tickers)
+        return frame
+
+    def covariance(self, tickers=None, min_periods: int = MIN_PERIODS) -> pd.DataFrame:
+        return self._select(self._stats(min_periods)[0], tickers)
+
+    def correlation(self, tickers=None, min_periods: int = MIN_PERIODS) -> pd.DataFrame:
+        return self._select(self._stats(min_periods)[1], tickers)
+
+    def top_pairs(self, k: int = 10, tickers=None, min_periods: int = MIN_PERIODS, absolute: bool = False) -> pd.DataFrame:
+        """
+        The k most-correlated ticker pairs (upper triangle only), optionally
+        restricted to `tickers`. absolute=True ranks by |correlation|.
+        """
+        corr = self._stats(min_periods)[1]
+        idx = np.arange(len(self.tickers))
+        if tickers is not None:
+            wanted = {str(t).strip().upper() for t in tickers}
+            idx = np.array([self._pos[t] for t in self.tickers if t in wanted], dtype=int)
+
+        columns = ["Ticker A", "Ticker B", "Correlation", "Observations"]
+        if len(idx) < 2:
+            return pd.DataFrame(columns=columns)
+
+        sub = corr[np.ix_(idx, idx)]
+        rows, cols = np.triu_indices(len(idx), k=1)
+        values = sub[rows, cols]
+        keep = ~np.isnan(values)
+        rows, cols, values = rows[keep], cols[keep], values[keep]
+        if len(values) == 0:
+            return pd.DataFrame(columns=columns)
+
+        score = np.abs(values) if absolute else values
+        k = min(k, len(values))
+        top = np.argpartition(-score, k - 1)[:k]
+        top = top[np.argsort(-score[top], kind="stable")]
+
+        names = np.asarray(self.tickers, dtype=object)[idx]
+        return pd.DataFrame({
+            "Ticker A": names[rows[top]],
+            "Ticker B": names[cols[top]],
+            "Correlation": np.round(values[top], 4),
+            "Observations": self.N[idx[rows[top]], idx[cols[top]]].astype(int),
+        })
+
+    # --------------------------- persistence -------------------------
+    def save(self, path: str = CORRELATION_STATE):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            state = {"version": STATE_VERSION, **{k: v for k, v in self.__dict__.items() if k != "_cache"}}
+            pd.to_pickle(state, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"⚠ Correlation state write failed: {e}")
+
+    @classmethod
+    def load(cls, window: int = DEFAULT_WINDOW, path: str = CORRELATION_STATE):
+        engine = cls(window)
+        try:
+            state = pd.read_pickle(path)
+            if state.get("version") == STATE_VERSION and state.get("window") == window:
+                state.pop("version")
+                engine.__dict__.update(state)
+                engine._cache = {}
+        except Exception:
+            pass
+        return engine
+
+
+# =========================================================
+# Shared process-wide engine
+# =========================================================
+_engines = {}
+
+
+def get_rolling_correlation(window: int = DEFAULT_WINDOW, path: str = CORRELATION_STATE,
+                            store=None, refresh: bool = True) -> RollingCorrelation:
+    """
+    Returns the shared engine for `window`, restored from cache/ on first
+    use and fed any snapshots newer than its last update when refresh is True.
+    """
+    engine = _engines.get((window, path))
+    if engine is None:
+        engine = RollingCorrelation.load(window, path)
+        _engines[(window, path)] = engine
+    if refresh and engine.update_from_store(store):
+        engine.save(path)
+    return engine
@@ -0,0 +1,86 @@
+# =========================================================
+# 🔗 Crossmatch Engine — v7.7R
+# Resolves portfolio positions against every loaded Zacks screen
+# with a single ticker → screen-membership index:
+# • Screens concatenated once into one index frame
+# • One hash join for the long (position × screen) view
+# • One pivot for the wide membership / rank view
+# =========================================================
+
+import pandas as pd
+
+SCREEN_COLUMN = "Screen Category"
+
+
+def build_screen_index(screens: dict) -> pd.DataFrame:
+    """
+    Stacks every screen with a Ticker column into one frame keyed by
+    upper-cased Ticker, tagged with its Screen Category.
+    """
+    frames = {name: zdf for name, zdf in (screens or {}).items() if zdf is not None and "Ticker" in zdf.columns}
+    if not frames:
+        return pd.DataFrame(columns=["Ticker", SCREEN_COLUMN])
+
+    index = pd.concat(frames, names=[SCREEN_COLUMN, None]).reset_index(level=0)
+    index.reset_index(drop=True, inplace=True)
+    index["Ticker"] = index["Ticker"].astype(str).str.strip().str.upper()
+    if "Zacks Rank" in index.columns:
+        index["Zacks Rank"] = pd.to_numeric(index["Zacks Rank"], errors="coerce")
+
+    # Keep screen order stable for downstream display
+    index[SCREEN_COLUMN] = pd.Categorical(index[SCREEN_COLUMN], categories=list(frames), ordered=True)
+    return index
+
+
+def membership_matrix(screen_index: pd.DataFrame) -> pd.DataFrame:
+    """Ticker × screen matrix of Zacks Rank (NaN = not on that screen)."""
+    if screen_index.empty:
+        return pd.DataFrame()
+    value_col = "Zacks Rank" if "Zacks Rank" in screen_index.columns else None
+    if value_col is None:
+        values = pd.Series(1.0, index=screen_index.index)
+    else:
+        values = screen_index[value_col]
+    return (
+        values.groupby([screen_index["Ticker"], screen_index[SCREEN_COLUMN]], observed=True)
+        .min()
+        .unstack(SCREEN_COLUMN)
+    )
+
+
+def crossmatch(portfolio_df: pd.DataFrame, screens: dict, screen_index: pd.DataFrame = None):
+    """
+    Matches every position against every screen in one pass.
+
+    Returns (long_df, wide_df):
+        long_df — one row per (position, screen) match, portfolio columns
+                  followed by screen columns and Screen Category
+                  (same shape as the former per-screen merge + concat).
+        wide_df — one row per position (portfolio index) with a rank column
+                  per screen, Screen Count and Best Rank.
+    """
+    if screen_index is None:
+        screen_index = build_screen_index(screens)
+
+    keys = portfolio_df["Ticker"].astype(str).str.strip().str.upper()
+
+    if screen_index.empty:
+        return pd.DataFrame(), pd.DataFrame(index=portfolio_df.index)
+
+    left = portfolio_df.assign(Ticker=keys)
+    long_df = left.merge(screen_index, on="Ticker", how="inner", sort=False)
+    if not long_df.empty:
+        # Screen-major, portfolio order within each screen
+        long_df = long_df.sort_values(SCREEN_COLUMN, kind="stable").reset_index(drop=True)
+        long_df[SCREEN_COLUMN] = long_df[SCREEN_COLUMN].astype(str)
+
+    matrix = membership_matrix(screen_index)
+    matrix.columns = [str(c) for c in matrix.columns]
+    wide_df = matrix.reindex(keys.to_numpy())
+    wide_df.index = portfolio_df.index
+    wide_df.insert(0, "Ticker", keys)
+    rank_cols = list(matrix.columns)
+    wide_df["Screen Count"] = wide_df[rank_cols].notna().sum(axis=1)
+    wide_df["Best Rank"] = wide_df[rank_cols].min(axis=1)
+
+    return long_df, wide_df
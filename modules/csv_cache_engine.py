@@ -0,0 +1,143 @@
+# =========================================================
+# 🗄 Parsed CSV Cache Engine — v7.7R
+# Stores normalised, typed DataFrames for each source CSV so
+# repeat console runs against the same data drop skip the
+# CSV parser entirely.
+# • Keyed by absolute path + size + mtime + loader tag
+# • Binary columnar storage (pandas pickle of the block store)
+# • Size-bounded least-recently-used eviction
+# =========================================================
+
+import os
+import hashlib
+import pandas as pd
+
+CACHE_DIR = os.path.join("cache", "parsed")
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_VERSION = "2"
+
+_cache_enabled = True
+
+
+def set_cache_enabled(enabled: bool):
+    """Globally enable or bypass the parsed-frame cache (CLI --no-cache)."""
+    global _cache_enabled
+    _cache_enabled = bool(enabled)
+
+
+def cache_enabled() -> bool:
+    return _cache_enabled
+
+
+def _cache_key(path, tag):
+    stat = os.stat(path)
+    raw = "|".join([
+        CACHE_VERSION,
+        tag,
+        os.path.abspath(path),
+        str(stat.st_size),
+        str(stat.st_mtime_ns),
+    ])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _is_cacheable_source(source):
+    return isinstance(source, (str, os.PathLike)) and os.path.isfile(source)
+
+
+def cached_frame(source, parser, tag="raw", use_cache=None):
+    """
+    Returns parser(source), serving it from the parsed cache when the
+    source file is unchanged since it was last parsed with the same tag.
+
+    Parameters:
+        source: Path to the CSV (file-like uploads bypass the cache).
+        parser: Callable taking the source and returning a DataFrame.
+        tag: Loader identity — different normalisations of the same file
+             must use different tags.
+        use_cache: Override the global cache switch for this call.
+    """
+    if use_cache is None:
+        use_cache = _cache_enabled
+
+    if not use_cache or not _is_cacheable_source(source):
+        return parser(source)
+
+    entry = os.path.join(CACHE_DIR, _cache_key(source, tag) + ".pkl")
+
+    if os.path.exists(entry):
+        try:
+            df = pd.read_pickle(entry)
+            os.utime(entry)  # mark as recently used for eviction
+            return df
+        except Exception:
+            _remove_quietly(entry)
+
+    df = parser(source)
+    if isinstance(df, pd.DataFrame):
+        _store(entry, df)
+        evict_cache()
+    return df
+
+
+def cached_read_csv(path, use_cache=None, **read_kwargs):
+    """Cached drop-in for pd.read_csv(path) on local files."""
+    tag = "read_csv:" + repr(sorted(read_kwargs.items()))
+    return cached_frame(path, lambda p: pd.read_csv(p, **read_kwargs), tag=tag, use_cache=use_cache)
+
+
+def _store(entry, df):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{entry}.{os.getpid()}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, entry)
+    except Exception as e:
+        print(f"⚠ Parsed cache write failed: {e}")
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def evict_cache(max_bytes: int = None):
+    """
+    Deletes least-recently-used cache entries until the cache directory
+    fits within max_bytes (defaults to CACHE_MAX_BYTES).
+    """
+    if max_bytes is None:
+        max_bytes = CACHE_MAX_BYTES
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+
+    entries = []
+    total = 0
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".pkl"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    removed = 0
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        _remove_quietly(path)
+        total -= size
+        removed += 1
+
+    return removed
+
+
+def clear_cache():
+    """Removes every cached frame."""
+    return evict_cache(max_bytes=0)
@@ -0,0 +1,251 @@
+# =========================================================
+# 🗂 Data Manifest Engine — v7.7R
+# Single indexed view of every dated drop in data/ and data/archive/
+# • Parses category + as-of date from each filename once
+# • category → sorted dates → path, with O(log n) lookups
+# • Persisted to cache/ so later runs only re-list changed folders
+# =========================================================
+
+import os
+import re
+import json
+from bisect import bisect_right
+from datetime import date, datetime
+
+DATA_PATH = "data"
+ARCHIVE_DIRNAME = "archive"
+MANIFEST_FILE = os.path.join("cache", "data_manifest.json")
+MANIFEST_VERSION = 1
+
+_PORTFOLIO_RE = re.compile(r"^Portfolio_Positions_", re.IGNORECASE)
+_SCREEN_RE = re.compile(r"^zacks_custom_screen_\d{4}-\d{2}-\d{2}\s+(?P<name>.+)$", re.IGNORECASE)
+_ISO_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+_FIDELITY_DATE_RE = re.compile(r"([A-Za-z]{3})-(\d{2})-(\d{4})")
+
+
+def normalize_category(name: str) -> str:
+    """Canonical lookup key — 'Growth1', 'Growth 1' and 'growth_1' are one category."""
+    return re.sub(r"[\s_\-]+", "", str(name)).lower()
+
+
+def parse_data_filename(filename: str):
+    """
+    Parses a data-drop filename into its category and as-of date.
+    Returns (category, as_of, archived) or None for non-CSV files.
+
+    Examples:
+        Portfolio_Positions_Nov-25-2025.csv            → ('Portfolio', 2025-11-25, False)
+        archive_zacks_custom_screen_2025-11-13 Growth 1.csv → ('Growth 1', 2025-11-13, True)
+    """
+    if not filename.lower().endswith(".csv"):
+        return None
+
+    stem = filename[:-4]
+    archived = stem.lower().startswith("archive_")
+    if archived:
+        stem = stem[len("archive_"):]
+
+    as_of = None
+    iso = _ISO_DATE_RE.search(stem)
+    if iso:
+        as_of = _safe_date(*iso.groups(), fmt="%Y-%m-%d")
+    else:
+        fid = _FIDELITY_DATE_RE.search(stem)
+        if fid:
+            as_of = _safe_date(fid.group(1).title(), fid.group(2), fid.group(3), fmt="%b-%d-%Y")
+
+    if _PORTFOLIO_RE.match(stem):
+        category = "Portfolio"
+    else:
+        screen = _SCREEN_RE.match(stem)
+        if screen:
+            category = screen.group("name").strip()
+        else:
+            category = stem
+            for regex in (_ISO_DATE_RE, _FIDELITY_DATE_RE):
+                category = regex.sub("", category)
+            category = category.strip(" _-") or stem
+
+    return category, as_of, archived
+
+
+def _safe_date(a, b, c, fmt):
+    try:
+        return datetime.strptime(f"{a}-{b}-{c}", fmt).date()
+    except ValueError:
+        return None
+
+
+class DataManifest:
+    """
+    In-memory index of data drops.
+    Each category holds parallel, date-sorted lists so latest / as-of
+    lookups are a bisect rather than a directory scan.
+    """
+
+    def __init__(self, data_path: str = DATA_PATH):
+        self.data_path = data_path
+        self._dirs = {}        # folder → {"mtime_ns": int, "files": {name: entry}}
+        self._index = {}       # category key → {"name", "dates", "paths"}
+
+    # ----------------------------- build -----------------------------
+    def folders(self):
+        return [self.data_path, os.path.join(self.data_path, ARCHIVE_DIRNAME)]
+
+    def refresh(self):
+        """Re-lists only folders whose mtime changed since the last scan."""
+        changed = False
+        for folder in self.folders():
+            try:
+                mtime_ns = os.stat(folder).st_mtime_ns
+            except OSError:
+                if self._dirs.pop(folder, None) is not None:
+                    changed = True
+                continue
+
+            cached = self._dirs.get(folder)
+            if cached and cached["mtime_ns"] == mtime_ns:
+                continue
+
+            known = cached["files"] if cached else {}
+            files = {}
+            for name in os.listdir(folder):
+                if name in known:
+                    files[name] = known[name]
+                    continue
+                entry = self._parse_entry(folder, name)
+                if entry is not None:
+                    files[name] = entry
+
+            self._dirs[folder] = {"mtime_ns": mtime_ns, "files": files}
+            changed = True
+
+        if changed or not self._index:
+            self._rebuild_index()
+        return changed
+
+    def _parse_entry(self, folder, name):
+        path = os.path.join(folder, name)
+        if not os.path.isfile(path):
+            return None
+        parsed = parse_data_filename(name)
+        if parsed is None:
+            return None
+        category, as_of, archived = parsed
+        if as_of is None:
+            as_of = date.fromtimestamp(os.path.getmtime(path))
+        return {"category": category, "as_of": as_of.isoformat(), "archived": archived}
+
+    def _rebuild_index(self):
+        grouped = {}
+        for folder, info in self._dirs.items():
+            for name, entry in info["files"].items():
+                key = normalize_category(entry["category"])
+                # Live drops in data/ win over an archived copy of the same day
+                sort_key = (entry["as_of"], not entry["archived"], name)
+                grouped.setdefault(key, []).append((sort_key, entry["category"], os.path.join(folder, name)))
+
+        index = {}
+        for key, rows in grouped.items():
+            rows.sort()
+            dates, paths = [], []
+            for (as_of, _, _), _, path in rows:
+                if dates and dates[-1] == as_of:
+                    paths[-1] = path
+                    continue
+                dates.append(as_of)
+                paths.append(path)
+            index[key] = {"name": rows[-1][1], "dates": dates, "paths": paths}
+        self._index = index
+
+    # ----------------------------- lookup ----------------------------
+    def categories(self):
+        """Display names of every indexed category."""
+        return sorted(v["name"] for v in self._index.values())
+
+    def resolve_category(self, category: str):
+        """
+        Maps a category or legacy keyword ('Defensive', 'Growth1') onto an
+        index key. Exact matches win; otherwise a unique partial match is used.
+        """
+        key = normalize_category(category)
+        if key in self._index:
+            return key
+        partial = [k for k in self._index if key and key in k]
+        return partial[0] if len(partial) == 1 else None
+
+    def dates(self, category: str):
+        key = self.resolve_category(category)
+        return [date.fromisoformat(d) for d in self._index[key]["dates"]] if key else []
+
+    def latest(self, category: str):
+        """Path of the most recent drop for a category, or None."""
+        key = self.resolve_category(category)
+        if key is None:
+            return None
+        return self._index[key]["paths"][-1]
+
+    def as_of(self, category: str, when):
+        """Path of the most recent drop on or before `when` (date or ISO string)."""
+        key = self.resolve_category(category)
+        if key is None:
+            return None
+        if isinstance(when, (date, datetime)):
+            when = when.strftime("%Y-%m-%d")
+        entry = self._index[key]
+        pos = bisect_right(entry["dates"], str(when))
+        return entry["paths"][pos - 1] if pos else None
+
+    def history(self, category: str):
+        """All (as_of, path) pairs for a category in ascending date order."""
+        key = self.resolve_category(category)
+        if key is None:
+            return []
+        entry = self._index[key]
+        return [(date.fromisoformat(d), p) for d, p in zip(entry["dates"], entry["paths"])]
+
+    # --------------------------- persistence -------------------------
+    def save(self, path: str = MANIFEST_FILE):
+        payload = {"version": MANIFEST_VERSION, "data_path": self.data_path, "dirs": self._dirs}
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"⚠ Data manifest save failed: {e}")
+
+    @classmethod
+    def load(cls, data_path: str = DATA_PATH, path: str = MANIFEST_FILE):
+        manifest = cls(data_path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("version") == MANIFEST_VERSION and payload.get("data_path") == data_path:
+                manifest._dirs = payload.get("dirs", {})
+        except (OSError, ValueError):
+            pass
+        return manifest
+
+
+# =========================================================
+# Shared process-wide manifest
+# =========================================================
+_manifests = {}
+
+
+def get_manifest(data_path: str = DATA_PATH, refresh: bool = True) -> DataManifest:
+    """
+    Returns the shared manifest for data_path, loading the persisted copy on
+    first use and re-listing only folders that changed since.
+    """
+    manifest = _manifests.get(data_path)
+    if manifest is None:
+        manifest = DataManifest.load(data_path)
+        _manifests[data_path] = manifest
+        refresh = True
+
+    if refresh and manifest.refresh():
+        manifest.save()
+    return manifest
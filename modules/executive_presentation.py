@@ -7,13 +7,18 @@
 
 import pandas as pd
 
+from modules.report_memo_engine import memoize_report
+from modules.tactical_alerts import filter_alerts, render_alert_messages, sort_alerts
 
+
+@memoize_report("executive_presentation")
 def generate_executive_presentation(
     portfolio_summary: dict,
     risk_df: pd.DataFrame = None,
     tactical_scores_df: pd.DataFrame = None,
     alerts_list: list = None,
     intel_brief_text: str = "",
+    alert_min_severity: str = None,
 ):
     """
     Generates a structured multi-slide executive briefing.
@@ -23,6 +28,10 @@ def generate_executive_presentation(
         'content': 'Formatted text'
     }
     Designed for PDF export, future PPT conversion, or live dashboard display.
+
+    alerts_list may be message strings or a tactical_alerts alert table;
+    tables are sorted by severity (optionally limited to alert_min_severity
+    and above) before their messages are rendered.
     """
 
     slides = []
@@ -104,6 +113,8 @@ Interpretation:
     # ===================================================
     # Slide 5 — Tactical Alerts
     # ===================================================
+    if isinstance(alerts_list, pd.DataFrame):
+        alerts_list = render_alert_messages(sort_alerts(filter_alerts(alerts_list, alert_min_severity)))
     alerts_text = "\n".join(alerts_list) if alerts_list else "No tactical alerts triggered."
     
     slides.append({
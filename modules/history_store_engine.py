@@ -0,0 +1,261 @@
+# =========================================================
+# 🕰 Historical Snapshot Store — v7.7R
+# Consolidates every dated portfolio + Zacks screen drop in
+# data/ and data/archive/ into one append-only store.
+# • Each snapshot is ingested once into its own partition file
+# • New drops are picked up incrementally via the data manifest
+# • Queryable by ticker, date range and screen
+# • Panels (date × ticker) for time-series features
+# =========================================================
+
+import os
+import json
+import pandas as pd
+
+from modules.csv_cache_engine import cached_frame, cached_read_csv
+from modules.data_manifest_engine import DATA_PATH, get_manifest, normalize_category
+from modules.position_schema_engine import read_positions_csv
+from modules.zacks_screen_registry import NON_SCREEN_CATEGORIES, match_screen
+
+HISTORY_DIR = os.path.join("archive", "history")
+LEDGER_FILE = "ledger.json"
+
+POSITION_FIELDS = {
+    "Account Number": "account",
+    "Ticker": "ticker",
+    "Quantity": "quantity",
+    "Last Price": "price",
+    "Current Value": "value",
+    "Cost Basis Total": "cost_basis",
+    "Total Gain/Loss Percent": "gain_loss_pct",
+}
+
+# How multi-account / multi-screen rows collapse into one panel cell
+PANEL_AGG = {
+    "price": "mean",
+    "quantity": "sum",
+    "value": "sum",
+    "cost_basis": "sum",
+    "gain_loss_pct": "mean",
+    "zacks_rank": "min",
+}
+
+
+def _position_snapshot(path):
+    df = cached_frame(path, read_positions_csv, tag="positions_schema")
+    if "Is Cash" in df.columns:
+        df = df[~df["Is Cash"]]
+    cols = [c for c in POSITION_FIELDS if c in df.columns]
+    out = df[cols].rename(columns=POSITION_FIELDS)
+    if "account" in out.columns:
+        out["account"] = out["account"].astype(str)
+    out["ticker"] = out["ticker"].astype(str)
+    return out.reset_index(drop=True)
+
+
+def _screen_snapshot(path):
+    df = cached_read_csv(path).copy()
+    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+    df["ticker"] = df["ticker"].astype(str).str.strip().str.upper()
+    if "zacks_rank" in df.columns:
+        df["zacks_rank"] = pd.to_numeric(df["zacks_rank"], errors="coerce")
+    return df
+
+
+class HistoryStore:
+    """
+    Append-only store of portfolio and screen snapshots.
+    Long frames are columns: date, ticker, <fields>; screens add `screen`.
+    """
+
+    def __init__(self, root: str = HISTORY_DIR, data_path: str = DATA_PATH):
+        self.root = root
+        self.data_path = data_path
+        self._ledger = self._load_ledger()
+        self._positions = None
+        self._screens = None
+        self._panels = {}
+
+    # ----------------------------- ledger ----------------------------
+    def _ledger_path(self):
+        return os.path.join(self.root, LEDGER_FILE)
+
+    def _load_ledger(self):
+        try:
+            with open(self._ledger_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"positions": {}, "screens": {}}
+
+    def _save_ledger(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self._ledger_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._ledger, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self._ledger_path())
+
+    # ----------------------------- ingest ----------------------------
+    def _write_partition(self, folder, as_of, frame):
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{as_of}.pkl")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        frame.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def update(self, verbose: bool = False) -> int:
+        """
+        Ingests every snapshot date not yet in the store.
+        Returns the number of new snapshots written.
+        """
+        manifest = get_manifest(self.data_path)
+        added = 0
+
+        for category in manifest.categories():
+            if category == "Portfolio":
+                seen = self._ledger["positions"]
+                folder = os.path.join(self.root, "positions")
+                loader, screen = _position_snapshot, None
+            elif category in NON_SCREEN_CATEGORIES:
+                continue
+            else:
+                screen = match_screen(category) or category
+                seen = self._ledger["screens"].setdefault(screen, {})
+                folder = os.path.join(self.root, "screens", normalize_category(screen))
+                loader = _screen_snapshot
+
+            for as_of, path in manifest.history(category):
+                key = as_of.isoformat()
+                if key in seen:
+                    continue
+                try:
+                    frame = loader(path)
+                except Exception as e:
+                    print(f"⚠ History ingest skipped {os.path.basename(path)}: {e}")
+                    continue
+                frame.insert(0, "date", pd.Timestamp(as_of))
+                if screen is not None:
+                    frame.insert(1, "screen", screen)
+                seen[key] = self._write_partition(folder, key, frame)
+                added += 1
+                if verbose:
+                    print(f"🕰 Ingested {category} snapshot {key}")
+
+        if added:
+            self._save_ledger()
+            self._positions = self._screens = None
+            self._panels = {}
+        return added
+
+    # ----------------------------- frames ----------------------------
+    @staticmethod
+    def _concat_partitions(paths):
+        frames = []
+        for path in paths:
+            try:
+                frames.append(pd.read_pickle(path))
+            except Exception as e:
+                print(f"⚠ History partition unreadable {path}: {e}")
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def _all_positions(self):
+        if self._positions is None:
+            ledger = self._ledger["positions"]
+            self._positions = self._concat_partitions(ledger[d] for d in sorted(ledger))
+        return self._positions
+
+    def _all_screens(self):
+        if self._screens is None:
+            paths = [
+                p for dates in self._ledger["screens"].values() for _, p in sorted(dates.items())
+            ]
+            self._screens = self._concat_partitions(paths)
+        return self._screens
+
+    @staticmethod
+    def _filter(df, tickers=None, start=None, end=None):
+        if df.empty:
+            return df
+        mask = pd.Series(True, index=df.index)
+        if tickers is not None:
+            if isinstance(tickers, str):
+                tickers = [tickers]
+            mask &= df["ticker"].isin([t.upper() for t in tickers])
+        if start is not None:
+            mask &= df["date"] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= df["date"] <= pd.Timestamp(end)
+        return df[mask]
+
+    def positions(self, tickers=None, start=None, end=None) -> pd.DataFrame:
+        """Long frame of position snapshots (date, account, ticker, quantity, price, …)."""
+        return self._filter(self._all_positions(), tickers, start, end)
+
+    def screens(self, screen: str = None, tickers=None, start=None, end=None) -> pd.DataFrame:
+        """Long frame of screen rows, optionally for one screen."""
+        df = self._all_screens()
+        if screen is not None and not df.empty:
+            df = df[df["screen"] == (match_screen(screen) or screen)]
+        return self._filter(df, tickers, start, end)
+
+    def snapshot_dates(self, screen: str = None):
+        """Ingested dates for the portfolio (screen=None) or one screen."""
+        if screen is None:
+            dates = self._ledger["positions"]
+        else:
+            dates = self._ledger["screens"].get(match_screen(screen) or screen, {})
+        return [pd.Timestamp(d) for d in sorted(dates)]
+
+    def screen_names(self):
+        return sorted(self._ledger["screens"])
+
+    # ----------------------------- panels ----------------------------
+    def panel(self, field: str, screen: str = None, tickers=None, start=None, end=None) -> pd.DataFrame:
+        """
+        Date × ticker panel for one field (price, value, quantity, zacks_rank,
+        or any screen metric). Position fields come from portfolio snapshots;
+        anything else is read from screens. Cached until the next update().
+        """
+        source = "positions" if field in POSITION_FIELDS.values() else "screens"
+        key = (field, source, screen)
+
+        if key not in self._panels:
+            df = self.positions() if source == "positions" else self.screens(screen)
+            if df.empty or field not in df.columns:
+                self._panels[key] = pd.DataFrame()
+            else:
+                values = pd.to_numeric(df[field], errors="coerce")
+                self._panels[key] = (
+                    values.groupby([df["date"], df["ticker"]])
+                    .agg(PANEL_AGG.get(field, "mean"))
+                    .unstack("ticker")
+                    .sort_index()
+                )
+
+        panel = self._panels[key]
+        if panel.empty:
+            return panel
+        if start is not None or end is not None:
+            panel = panel.loc[start:end]
+        if tickers is not None:
+            if isinstance(tickers, str):
+                tickers = [tickers]
+            panel = panel.reindex(columns=[t.upper() for t in tickers])
+        return panel
+
+
+# =========================================================
+# Shared process-wide store
+# =========================================================
+_stores = {}
+
+
+def get_history_store(root: str = HISTORY_DIR, data_path: str = DATA_PATH, refresh: bool = True) -> HistoryStore:
+    """Returns the shared store, ingesting any new snapshots when refresh is True."""
+    store = _stores.get((root, data_path))
+    if store is None:
+        store = HistoryStore(root, data_path)
+        _stores[(root, data_path)] = store
+    if refresh:
+        store.update()
+    return store
@@ -0,0 +1,168 @@
+# =========================================================
+# ♻ Incremental Crossmatch & Scoring Engine — v7.7R
+# Day-over-day runs only redo the work that changed:
+# • Diffs today's positions and screen rows against the last
+#   processed snapshot (added / removed / changed, by key)
+# • Re-runs crossmatch + scoring for affected tickers only
+# • Patches the previous result set and persists the new state
+# Scoring functions must be row-local (each output row depends
+# only on its own input row) — true of the tactical and stop rules.
+# =========================================================
+
+import os
+import pandas as pd
+
+from modules.crossmatch_engine import SCREEN_COLUMN, build_screen_index, crossmatch
+
+INCREMENTAL_STATE = os.path.join("cache", "incremental_state.pkl")
+
+_ORDER_COLUMN = "__order"
+
+
+# =========================================================
+# Snapshot Diff
+# =========================================================
+def _keyed_hashes(df: pd.DataFrame, key_cols) -> pd.Series:
+    """Row content hash indexed by key (duplicate keys get an occurrence counter)."""
+    keys = df[key_cols].astype(str)
+    keys["__n"] = keys.groupby(key_cols).cumcount().astype(str)
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    hashes.index = pd.MultiIndex.from_frame(keys)
+    return hashes
+
+
+def diff_snapshots(prev: pd.DataFrame, curr: pd.DataFrame, key_cols) -> dict:
+    """
+    Compares two snapshots row by row on key_cols.
+    Returns {"added", "removed", "changed"} as sets of key tuples.
+    """
+    prev_h = _keyed_hashes(prev, key_cols)
+    curr_h = _keyed_hashes(curr, key_cols)
+
+    common = prev_h.index.intersection(curr_h.index)
+    changed = common[prev_h.reindex(common).to_numpy() != curr_h.reindex(common).to_numpy()]
+
+    strip = lambda idx: {tuple(k[:-1]) for k in idx}
+    return {
+        "added": strip(curr_h.index.difference(prev_h.index)),
+        "removed": strip(prev_h.index.difference(curr_h.index)),
+        "changed": strip(changed),
+    }
+
+
+def _position_keys(df: pd.DataFrame):
+    return [c for c in ("Account Number", "Ticker") if c in df.columns]
+
+
+def affected_tickers(prev_portfolio, portfolio_df, prev_index, screen_index) -> set:
+    """Tickers whose position rows or screen rows differ from the last snapshot."""
+    tickers = set()
+
+    pos_keys = _position_keys(portfolio_df)
+    pos_diff = diff_snapshots(prev_portfolio, portfolio_df, pos_keys)
+    ticker_pos = pos_keys.index("Ticker")
+    for rows in pos_diff.values():
+        tickers.update(str(k[ticker_pos]).upper() for k in rows)
+
+    scr_diff = diff_snapshots(prev_index, screen_index, [SCREEN_COLUMN, "Ticker"])
+    for rows in scr_diff.values():
+        tickers.update(str(k[1]).upper() for k in rows)
+
+    return tickers
+
+
+# =========================================================
+# State Persistence
+# =========================================================
+def load_incremental_state(path: str = INCREMENTAL_STATE):
+    try:
+        return pd.read_pickle(path)
+    except Exception:
+        return None
+
+
+def save_incremental_state(state: dict, path: str = INCREMENTAL_STATE):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pd.to_pickle(state, tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"⚠ Incremental state write failed: {e}")
+
+
+# =========================================================
+# Incremental Run
+# =========================================================
+def _order_result(result, portfolio_df, screen_order):
+    """Screen-major, portfolio-row-minor — the order a full crossmatch produces."""
+    if result.empty:
+        return result
+    pos_keys = _position_keys(portfolio_df)
+    position_rank = pd.Series(
+        range(len(portfolio_df)),
+        index=pd.MultiIndex.from_frame(portfolio_df[pos_keys].astype(str)),
+    )
+    position_rank = position_rank[~position_rank.index.duplicated()]
+    row_keys = pd.MultiIndex.from_frame(result[pos_keys].astype(str))
+    screen_rank = result[SCREEN_COLUMN].map({name: i for i, name in enumerate(screen_order)})
+
+    result = result.assign(**{_ORDER_COLUMN: position_rank.reindex(row_keys).to_numpy()})
+    result = result.assign(__screen=screen_rank.to_numpy())
+    result = result.sort_values(["__screen", _ORDER_COLUMN], kind="stable")
+    return result.drop(columns=["__screen", _ORDER_COLUMN]).reset_index(drop=True)
+
+
+def run_incremental(portfolio_df: pd.DataFrame, screens: dict, score_fn, fingerprint: str = "",
+                    state_path: str = INCREMENTAL_STATE, force_full: bool = False):
+    """
+    Crossmatches and scores portfolio_df against screens, reusing the last
+    run's result for tickers that did not change.
+
+    Parameters:
+        score_fn: Row-local callable(long_df) → scored DataFrame.
+        fingerprint: Identifies scoring parameters; a change forces a full run.
+        force_full: Ignore saved state.
+
+    Returns (result, info) where info has "mode" ('full' | 'incremental')
+    and "affected" (set of re-scored tickers; None on a full run).
+    """
+    portfolio_df = portfolio_df.assign(Ticker=portfolio_df["Ticker"].astype(str).str.strip().str.upper())
+    screen_index = build_screen_index(screens)
+    screen_order = list(screen_index[SCREEN_COLUMN].cat.categories) if not screen_index.empty else []
+
+    state = None if force_full else load_incremental_state(state_path)
+    reusable = (
+        state is not None
+        and state.get("fingerprint") == fingerprint
+        and list(state["portfolio"].columns) == list(portfolio_df.columns)
+        and list(state["screen_index"].columns) == list(screen_index.columns)
+    )
+
+    if not reusable:
+        long_df, _ = crossmatch(portfolio_df, screens, screen_index=screen_index)
+        result = score_fn(long_df) if not long_df.empty else long_df
+        info = {"mode": "full", "affected": None}
+    else:
+        affected = affected_tickers(state["portfolio"], portfolio_df, state["screen_index"], screen_index)
+        prev_result = state["result"]
+
+        if affected:
+            sub_portfolio = portfolio_df[portfolio_df["Ticker"].isin(affected)]
+            sub_index = screen_index[screen_index["Ticker"].isin(affected)]
+            partial, _ = crossmatch(sub_portfolio, screens, screen_index=sub_index)
+            partial = score_fn(partial) if not partial.empty else partial
+
+            kept = prev_result[~prev_result["Ticker"].isin(affected)] if not prev_result.empty else prev_result
+            frames = [f for f in (kept, partial) if not f.empty]
+            result = pd.concat(frames, ignore_index=True) if frames else prev_result.iloc[0:0]
+            result = _order_result(result, portfolio_df, screen_order)
+        else:
+            result = prev_result
+        info = {"mode": "incremental", "affected": affected}
+
+    save_incremental_state(
+        {"fingerprint": fingerprint, "portfolio": portfolio_df, "screen_index": screen_index, "result": result},
+        state_path,
+    )
+    return result, info
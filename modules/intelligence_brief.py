@@ -1,10 +1,13 @@
 import pandas as pd
 
+from modules.report_memo_engine import memoize_report
+
 # =========================================================
 # 📘 Intelligence Brief Engine — v7.7R Final Stable Build
 # Generates full tactical narrative summary for dashboard
 # =========================================================
 
+@memoize_report("intelligence_brief")
 def generate_intelligence_brief(portfolio_df=None, zacks_df=None, cash_value=None, scored_df=None):
     brief = []
     brief.append("🧭 Fox Valley Tactical Intelligence Brief — v7.7R\n")
@@ -1,4 +1,6 @@
 from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase.pdfmetrics import getFont
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
 from datetime import datetime
@@ -7,103 +9,165 @@ from datetime import datetime
 # =========================================================
 # 📑 PDF Export Engine — Executive Briefing Format (v7.7R-BOD)
 # Creates branded, board-ready executive tactical briefing PDF
+# Static cover / certification content is drawn once per briefing
+# as PDF forms (XObjects) and placed with doForm; the report body
+# is pre-wrapped and written one text object per page.
+# The PDF, with its Report Date, is written fresh every call.
 # =========================================================
 
-def export_report_to_pdf(
-    report_text: str,
-    filename: str = "Fox_Valley_Executive_Tactical_Briefing.pdf"
-):
-    """
-    Converts Command Report into a formal Board of Directors PDF.
-    Includes branding, section headers, signature-ready footer.
-    """
+X_MARGIN = inch * 0.75
+Y_MARGIN = inch * 0.75
 
-    c = canvas.Canvas(filename, pagesize=letter)
-    width, height = letter
+BODY_FONT = "Helvetica"
+BODY_SIZE = 9
+BODY_LEADING = 12
 
-    # Define standard executive margins
-    x_margin = inch * 0.75
-    y_margin = inch * 0.75
-    y_pos = height - y_margin
+SUMMARY_LINES = [
+    "This Tactical Command Briefing provides a structured assessment of",
+    "portfolio performance, risk exposure, Zacks-driven opportunity insights,",
+    "and tactical decision guidance for the Board of Directors.",
+    "",
+    "The following document is structured for strategic review,",
+    "with risk posture, ranking insights, tactical scoring, and alerts included."
+]
+
+
+def _text(c, x, y, font, size, lines, leading=BODY_LEADING):
+    """One text object for a block of lines (a single BT … ET)."""
+    t = c.beginText(x, y)
+    t.setFont(font, size, leading)
+    for line in lines:
+        t.textLine(line)
+    return t
+
+
+def _cover_form(c, width, height, name="cover"):
+    """
+    Defines the cover form — branding, summary block and body heading —
+    and returns its layout:
+        date_y   — baseline of the per-report date stamp
+        body_top — first body baseline on the cover page
+    """
+    y_pos = height - Y_MARGIN
+    c.beginForm(name)
 
     # =========================================================
     # COVER HEADER — BRANDING
     # =========================================================
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(x_margin, y_pos, "Fox Valley Wealth Management")
+    c.drawText(_text(c, X_MARGIN, y_pos, "Helvetica-Bold", 16, ["Fox Valley Wealth Management"]))
     y_pos -= 25
-
-    c.setFont("Helvetica", 12)
-    c.drawString(x_margin, y_pos, "Executive Tactical Command Briefing")
+    c.drawText(_text(c, X_MARGIN, y_pos, "Helvetica", 12, ["Executive Tactical Command Briefing"]))
     y_pos -= 30
-
-    c.setFont("Helvetica-Oblique", 10)
-    c.drawString(x_margin, y_pos, "Generated by Fox Valley Intelligence Engine — v7.7R")
+    c.drawText(_text(c, X_MARGIN, y_pos, "Helvetica-Oblique", 10,
+                     ["Generated by Fox Valley Intelligence Engine — v7.7R"]))
     y_pos -= 30
-
-    date_stamp = datetime.now().strftime("%B %d, %Y — %I:%M %p")
-    c.setFont("Helvetica", 9)
-    c.drawString(x_margin, y_pos, f"Report Date: {date_stamp}")
+    date_y = y_pos
     y_pos -= 40
 
     # Divider line
-    c.line(x_margin, y_pos, width - x_margin, y_pos)
+    c.line(X_MARGIN, y_pos, width - X_MARGIN, y_pos)
     y_pos -= 30
 
     # =========================================================
     # EXECUTIVE SUMMARY BLOCK
     # =========================================================
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(x_margin, y_pos, "📌 Executive Summary")
+    c.drawText(_text(c, X_MARGIN, y_pos, "Helvetica-Bold", 12, ["📌 Executive Summary"]))
     y_pos -= 25
-
-    c.setFont("Helvetica", 9)
-    summary_lines = [
-        "This Tactical Command Briefing provides a structured assessment of",
-        "portfolio performance, risk exposure, Zacks-driven opportunity insights,",
-        "and tactical decision guidance for the Board of Directors.",
-        "",
-        "The following document is structured for strategic review,",
-        "with risk posture, ranking insights, tactical scoring, and alerts included."
-    ]
-
-    for line in summary_lines:
-        c.drawString(x_margin, y_pos, line)
-        y_pos -= 12
+    c.drawText(_text(c, X_MARGIN, y_pos, "Helvetica", 9, SUMMARY_LINES))
+    y_pos -= 12 * len(SUMMARY_LINES)
 
     y_pos -= 20
-    c.line(x_margin, y_pos, width - x_margin, y_pos)
+    c.line(X_MARGIN, y_pos, width - X_MARGIN, y_pos)
     y_pos -= 30
 
-    # =========================================================
-    # MAIN REPORT BODY
-    # =========================================================
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(x_margin, y_pos, "📄 Tactical Command Report")
+    c.drawText(_text(c, X_MARGIN, y_pos, "Helvetica-Bold", 12, ["📄 Tactical Command Report"]))
     y_pos -= 25
 
-    c.setFont("Helvetica", 9)
+    c.endForm()
+    return {"date_y": date_y, "body_top": y_pos}
 
-    lines = report_text.split("\n")
-    for line in lines:
-        if y_pos < y_margin:
-            c.showPage()
-            y_pos = height - y_margin
-            c.setFont("Helvetica", 9)
-        c.drawString(x_margin, y_pos, line)
-        y_pos -= 12
+
+def _certification_form(c, height, name="certification"):
+    """Defines the complete signature page as a form."""
+    c.beginForm(name)
 
     # =========================================================
     # SIGNATURE FOOTER — BOD READY
     # =========================================================
-    c.showPage()
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(x_margin, height - 100, "Fox Valley Tactical Command — Executive Certification")
+    c.drawText(_text(c, X_MARGIN, height - 100, "Helvetica-Bold", 14,
+                     ["Fox Valley Tactical Command — Executive Certification"]))
+    c.drawText(_text(c, X_MARGIN, height - 130, "Helvetica", 9, ["Prepared for: Board of Directors"]))
+    c.drawText(_text(c, X_MARGIN, height - 150, "Helvetica", 9,
+                     ["Authorized by: Fox Valley Wealth Management Tactical Intelligence Division"]))
+    c.drawText(_text(c, X_MARGIN, height - 200, "Helvetica", 9,
+                     ["______________________________", "Executive Officer Signature"], leading=15))
+    c.endForm()
+
+
+def wrap_report_lines(report_text: str, max_width: float, font: str = BODY_FONT, size: float = BODY_SIZE):
+    """
+    Report text → display lines no wider than max_width. Only lines long
+    enough to possibly overflow (by the font's widest glyph) are measured.
+    """
+    widest = max(getFont(font).widths) / 1000 * size
+    safe_chars = int(max_width // widest)
+    lines = []
+    for line in report_text.split("\n"):
+        if len(line) <= safe_chars:
+            lines.append(line)
+        else:
+            lines.extend(simpleSplit(line, font, size, max_width) or [""])
+    return lines
+
+
+def paginate_report(report_text: str, max_width: float, first_top: float, top: float):
+    """
+    Report text → body lines per page: the first page starts at
+    first_top (below the cover content), later pages at top.
+    """
+    lines = wrap_report_lines(report_text, max_width)
+    pages = []
+    while True:
+        capacity = int(((top if pages else first_top) - Y_MARGIN) // BODY_LEADING) + 1
+        pages.append(lines[:capacity])
+        lines = lines[capacity:]
+        if not lines:
+            return pages
+
+
+def export_report_to_pdf(
+    report_text: str,
+    filename: str = "Fox_Valley_Executive_Tactical_Briefing.pdf"
+):
+    """
+    Converts Command Report into a formal Board of Directors PDF.
+    Includes branding, section headers, signature-ready footer.
+    """
+
+    c = canvas.Canvas(filename, pagesize=letter)
+    width, height = letter
+    layout = _cover_form(c, width, height)
+    _certification_form(c, height)
+
+    # Cover page — branding / summary form plus this report's date
+    c.doForm("cover")
+    date_stamp = datetime.now().strftime("%B %d, %Y — %I:%M %p")
     c.setFont("Helvetica", 9)
-    c.drawString(x_margin, height - 130, "Prepared for: Board of Directors")
-    c.drawString(x_margin, height - 150, "Authorized by: Fox Valley Wealth Management Tactical Intelligence Division")
-    c.drawString(x_margin, height - 200, "______________________________")
-    c.drawString(x_margin, height - 215, "Executive Officer Signature")
+    c.drawString(X_MARGIN, layout["date_y"], f"Report Date: {date_stamp}")
+
+    # =========================================================
+    # MAIN REPORT BODY — one text object per page
+    # =========================================================
+    top = layout["body_top"]
+    for i, page in enumerate(paginate_report(report_text, width - 2 * X_MARGIN, top, height - Y_MARGIN)):
+        if i:
+            c.showPage()
+            top = height - Y_MARGIN
+        c.drawText(_text(c, X_MARGIN, top, BODY_FONT, BODY_SIZE, page))
+
+    # Certification page
+    c.showPage()
+    c.doForm("certification")
     c.save()
 
     return filename
@@ -0,0 +1,139 @@
+# =========================================================
+# 📑 PDF Table Writer — v7.7R
+# Streams large DataFrames into reportlab PDFs page by page:
+# • Values formatted column-at-a-time before layout (str(), blanks for missing)
+# • Column widths / row heights fixed up front, so reportlab
+#   never measures individual cells
+# • One page-sized Table per chunk, built only when the page is
+#   laid out and dropped once drawn — memory stays bounded and
+#   build time grows linearly with rows
+# • Header row and TableStyle compiled once and shared by every page
+# =========================================================
+
+import math
+
+import numpy as np
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Flowable, Table, TableStyle
+
+DEFAULT_FONT = "Helvetica"
+DEFAULT_FONT_SIZE = 8
+CELL_PADDING = 3  # reportlab's default left/right/top/bottom cell padding
+
+TABLE_STYLE_COMMANDS = [
+    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+]
+
+
+def format_table_values(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """
+    Display strings for each column, one vectorized pass per column.
+    Values print exactly as str() would (1.0 stays "1.0"); missing
+    values become blanks instead of "nan" / "None".
+    """
+    out = {}
+    for col in columns:
+        series = df[col]
+        text = series.astype(str).to_numpy(dtype=object)
+        text[series.isna().to_numpy()] = ""
+        out[col] = text
+    return pd.DataFrame(out, index=df.index, columns=list(columns))
+
+
+class _TableChunk(Flowable):
+    """Rows [start, stop) of a PdfTableWriter, materialised only while laid out."""
+
+    def __init__(self, writer, start, stop):
+        super().__init__()
+        self.writer = writer
+        self.start = start
+        self.stop = stop
+        self.hAlign = "CENTER"
+        self._table = None
+
+    def _build(self):
+        if self._table is None:
+            self._table = self.writer.table(self.start, self.stop)
+        return self._table
+
+    def wrap(self, availWidth, availHeight):
+        self.width, self.height = self._build().wrap(availWidth, availHeight)
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        parts = self._build().split(availWidth, availHeight)
+        self._table = None
+        return parts
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        self._build().drawOn(canvas, x, y, _sW)
+        self._table = None
+
+
+class PdfTableWriter:
+    """
+    Page-chunked reportlab table for a DataFrame.
+
+    writer = PdfTableWriter(df, columns, available_width=doc.width)
+    elements += writer.flowables(page_height=doc.height, first_page_height=...)
+    """
+
+    def __init__(self, df: pd.DataFrame, columns=None, available_width: float = None,
+                 font: str = DEFAULT_FONT, font_size: float = DEFAULT_FONT_SIZE, style_commands=None):
+        self.columns = [c for c in (columns or list(df.columns)) if c in df.columns]
+        self.values = format_table_values(df, self.columns).to_numpy(dtype=object)
+        self.font = font
+        self.font_size = font_size
+        self.row_height = math.ceil(font_size * 1.2) + 2 * CELL_PADDING
+        self.col_widths = self._column_widths(available_width)
+        self.style = TableStyle(
+            (style_commands or TABLE_STYLE_COMMANDS)
+            + [("FONTNAME", (0, 0), (-1, -1), font), ("FONTSIZE", (0, 0), (-1, -1), font_size)]
+        )
+
+    def _column_widths(self, available_width):
+        """Widest formatted value per column (found by length, measured once)."""
+        widths = []
+        for j, col in enumerate(self.columns):
+            cells = self.values[:, j]
+            widest = str(col)
+            if len(cells):
+                lengths = np.fromiter((len(v) for v in cells), dtype=np.int64, count=len(cells))
+                candidate = cells[int(lengths.argmax())]
+                if len(candidate) > len(widest):
+                    widest = candidate
+            widths.append(max(stringWidth(str(col), self.font, self.font_size),
+                              stringWidth(widest, self.font, self.font_size)) + 2 * CELL_PADDING + 2)
+        total = sum(widths)
+        if available_width and total > available_width:
+            widths = [w * available_width / total for w in widths]
+        return widths
+
+    def rows_per_page(self, height: float) -> int:
+        """Body rows that fit under the header in `height` points."""
+        return max(1, int(height // self.row_height) - 1)
+
+    def table(self, start: int, stop: int) -> Table:
+        """Header + rows [start, stop) with the shared widths and style."""
+        data = [self.columns] + self.values[start:stop].tolist()
+        table = Table(data, colWidths=self.col_widths, rowHeights=[self.row_height] * len(data), repeatRows=1)
+        table.setStyle(self.style)
+        return table
+
+    def flowables(self, page_height: float, first_page_height: float = None) -> list:
+        """
+        Lazy page-sized chunks covering every row. first_page_height is the
+        space left on the first page (after titles etc.).
+        """
+        n = len(self.values)
+        first = self.rows_per_page(first_page_height if first_page_height is not None else page_height)
+        per_page = self.rows_per_page(page_height)
+        bounds = [0, min(first, n)]
+        while bounds[-1] < n:
+            bounds.append(min(bounds[-1] + per_page, n))
+        return [_TableChunk(self, a, b) for a, b in zip(bounds[:-1], bounds[1:])]
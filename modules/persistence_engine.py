@@ -0,0 +1,177 @@
+# =========================================================
+# 📅 Rank Persistence Engine — v7.7R
+# Computes the PersistenceDays consumed by tactical_engine:
+# • Current streak of consecutive screen-days on each screen
+# • Current streak of consecutive screen-days at today's rank
+# Full history: one vectorized run-length pass over the
+# date × ticker rank matrix. Daily runs: cached streaks are
+# extended by the new day only.
+# =========================================================
+
+import os
+import numpy as np
+import pandas as pd
+
+from modules.history_store_engine import get_history_store
+
+PERSISTENCE_CACHE = os.path.join("cache", "persistence_state.pkl")
+ALL_SCREENS = "All Screens"
+
+_STATE_COLUMNS = ["streak", "rank", "rank_streak"]
+
+
+# =========================================================
+# Vectorized Run-Length Kernels
+# =========================================================
+def trailing_run_length(mask: np.ndarray) -> np.ndarray:
+    """
+    For a (dates × tickers) boolean matrix, returns the length of the
+    trailing run of True values in each column (0 if the last day is False).
+    """
+    n = mask.shape[0]
+    if n == 0:
+        return np.zeros(mask.shape[1], dtype=np.int64)
+    rows = np.arange(n)[:, None]
+    last_break = np.where(mask, -1, rows).max(axis=0)
+    return (n - 1 - last_break).astype(np.int64)
+
+
+def compute_streaks(rank_panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Full-history streaks from a date × ticker Zacks Rank panel
+    (NaN = not on the screen that day). Returns one row per ticker
+    present on the last date: streak, rank, rank_streak.
+    """
+    if rank_panel is None or rank_panel.empty:
+        return pd.DataFrame(columns=_STATE_COLUMNS)
+
+    ranks = rank_panel.to_numpy(dtype="float64")
+    present = ~np.isnan(ranks)
+    current = ranks[-1]
+
+    streak = trailing_run_length(present)
+    with np.errstate(invalid="ignore"):
+        same_rank = present & (ranks == current)
+    rank_streak = trailing_run_length(same_rank)
+
+    state = pd.DataFrame(
+        {"streak": streak, "rank": current, "rank_streak": rank_streak},
+        index=rank_panel.columns,
+    )
+    return state[state["streak"] > 0]
+
+
+def extend_streaks(state: pd.DataFrame, day_ranks: pd.Series) -> pd.DataFrame:
+    """
+    Rolls streak state forward by one screen-day.
+    day_ranks: ticker → rank for tickers on the screen that day.
+    """
+    day_ranks = pd.to_numeric(day_ranks, errors="coerce").dropna()
+    day_ranks = day_ranks[~day_ranks.index.duplicated()]
+    prev = state.reindex(day_ranks.index)
+
+    streak = prev["streak"].fillna(0).astype(np.int64) + 1
+    same = prev["rank"].to_numpy() == day_ranks.to_numpy()
+    rank_streak = np.where(same, prev["rank_streak"].fillna(0).to_numpy() + 1, 1).astype(np.int64)
+
+    return pd.DataFrame(
+        {"streak": streak.to_numpy(), "rank": day_ranks.to_numpy(), "rank_streak": rank_streak},
+        index=day_ranks.index,
+    )
+
+
+# =========================================================
+# Cached Persistence State
+# =========================================================
+def _load_cache(path):
+    try:
+        return pd.read_pickle(path)
+    except Exception:
+        return {}
+
+
+def _save_cache(cache, path):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pd.to_pickle(cache, tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"⚠ Persistence cache write failed: {e}")
+
+
+def _advance(entry, panel):
+    """Extends a cached entry with panel dates it has not seen, or recomputes."""
+    dates = list(panel.index)
+    seen = entry.get("dates", []) if entry else []
+
+    if not seen or dates[:len(seen)] != seen:
+        return {"dates": dates, "state": compute_streaks(panel)}
+
+    state = entry["state"]
+    for day in dates[len(seen):]:
+        state = extend_streaks(state, panel.loc[day].dropna())
+    return {"dates": dates, "state": state}
+
+
+def update_persistence(store=None, use_cache: bool = True, cache_path: str = PERSISTENCE_CACHE) -> dict:
+    """
+    Returns {screen name | ALL_SCREENS: streak state DataFrame} for the
+    latest screen-day. With the cache, only days added since the last
+    run are processed.
+    """
+    if store is None:
+        store = get_history_store()
+
+    cache = _load_cache(cache_path) if use_cache else {}
+    updated = {}
+    changed = False
+
+    keys = [(ALL_SCREENS, None)] + [(name, name) for name in store.screen_names()]
+    for key, screen in keys:
+        panel = store.panel("zacks_rank", screen=screen)
+        if panel.empty:
+            continue
+        updated[key] = _advance(cache.get(key), panel)
+        changed |= updated[key]["dates"] != cache.get(key, {}).get("dates")
+
+    if use_cache and (changed or set(updated) != set(cache)):
+        _save_cache(updated, cache_path)
+
+    return {key: entry["state"] for key, entry in updated.items()}
+
+
+def persistence_table(store=None, use_cache: bool = True) -> pd.DataFrame:
+    """
+    One row per ticker on any current screen:
+        Ticker, Zacks Rank, PersistenceDays (consecutive days at current rank),
+        ScreenDays (consecutive days on any screen), '<screen> Days' per screen.
+    """
+    states = update_persistence(store, use_cache=use_cache)
+    overall = states.get(ALL_SCREENS)
+    if overall is None or overall.empty:
+        return pd.DataFrame(columns=["Ticker", "Zacks Rank", "PersistenceDays", "ScreenDays"])
+
+    table = pd.DataFrame({
+        "Zacks Rank": overall["rank"],
+        "PersistenceDays": overall["rank_streak"],
+        "ScreenDays": overall["streak"],
+    })
+    for name, state in states.items():
+        if name == ALL_SCREENS:
+            continue
+        table[f"{name} Days"] = state["streak"].reindex(table.index).fillna(0).astype(np.int64)
+
+    table.index.name = "Ticker"
+    return table.reset_index()
+
+
+def attach_persistence(df: pd.DataFrame, ticker_col: str = "Ticker", store=None) -> pd.DataFrame:
+    """Populates PersistenceDays (0 for tickers not on a current screen)."""
+    if df is None or df.empty or ticker_col not in df.columns:
+        return df
+
+    table = persistence_table(store).set_index("Ticker")
+    tickers = df[ticker_col].astype(str).str.upper()
+    df["PersistenceDays"] = tickers.map(table["PersistenceDays"]).fillna(0).astype(np.int64)
+    return df
@@ -1,46 +1,45 @@
 # === Fox Valley Intelligence Engine – Portfolio Engine v7.7R ===
 
 import pandas as pd
+from modules.csv_cache_engine import cached_frame
+from modules.position_schema_engine import read_positions_csv, ensure_numeric
 
 # ------------------------------
 # Load Portfolio CSV
 # ------------------------------
 def load_portfolio_data(file):
     try:
-        df = pd.read_csv(file)
-
-        # Normalize column names
-        df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
-
-        # Required columns check
-        required = ["ticker", "shares", "cost_basis", "current_price"]
-        for r in required:
-            if r not in df.columns:
-                raise ValueError(f"Missing required column: {r}")
-
-        # Clean numeric columns
-        numeric_cols = ["shares", "cost_basis", "current_price"]
-        for col in numeric_cols:
-            df[col] = (
-                df[col]
-                .astype(str)
-                .str.replace(r"[\$,]", "", regex=True)
-                .astype(float)
-            )
-
-        # Compute tactical fields
-        df["position_value"] = df["shares"] * df["current_price"]
-        df["total_cost"] = df["shares"] * df["cost_basis"]
-        df["gain_loss"] = df["position_value"] - df["total_cost"]
-        df["gain_loss_pct"] = (df["gain_loss"] / df["total_cost"]) * 100
-
-        return df
+        return cached_frame(file, _parse_portfolio_data, tag="portfolio_engine")
 
     except Exception as e:
         print(f"Portfolio Load Error: {e}")
         return None
 
 
+def _parse_portfolio_data(file):
+    df = read_positions_csv(file)
+
+    # Normalize column names
+    df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
+
+    # Required columns check
+    required = ["ticker", "shares", "cost_basis", "current_price"]
+    for r in required:
+        if r not in df.columns:
+            raise ValueError(f"Missing required column: {r}")
+
+    # Clean numeric columns (no-op for schema-typed Fidelity columns)
+    ensure_numeric(df, ["shares", "cost_basis", "current_price"])
+
+    # Compute tactical fields
+    df["position_value"] = df["shares"] * df["current_price"]
+    df["total_cost"] = df["shares"] * df["cost_basis"]
+    df["gain_loss"] = df["position_value"] - df["total_cost"]
+    df["gain_loss_pct"] = (df["gain_loss"] / df["total_cost"]) * 100
+
+    return df
+
+
 # ------------------------------
 # Optional Manual Cash Override
 # ------------------------------
@@ -0,0 +1,177 @@
+# =========================================================
+# 🧾 Position Schema Engine — v7.7R
+# Single declared schema for the Fidelity positions export.
+# Parses $8395.00 / +$414.00 / +5.18% / blank cash rows once,
+# in one vectorized pass per column, so every downstream engine
+# receives an already-typed frame.
+# =========================================================
+
+import io
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+# Parse rules
+CURRENCY = "currency"                # $8395.00
+SIGNED_CURRENCY = "signed_currency"  # +$414.00 / -$142.00
+PERCENT = "percent"                  # +5.18% → 5.18 (percent units)
+QUANTITY = "quantity"                # 463 / 12.5 — float, blank for cash rows
+CATEGORY = "category"                # low-cardinality labels
+TICKER = "ticker"                    # stripped, upper-cased, '**' money-market suffix removed
+TEXT = "text"
+
+NUMERIC_RULES = {CURRENCY, SIGNED_CURRENCY, PERCENT, QUANTITY}
+
+POSITIONS_SCHEMA = {
+    "Account Number": CATEGORY,
+    "Account Name": CATEGORY,
+    "Symbol": TICKER,
+    "Description": TEXT,
+    "Quantity": QUANTITY,
+    "Last Price": CURRENCY,
+    "Last Price Change": SIGNED_CURRENCY,
+    "Current Value": CURRENCY,
+    "Today's Gain/Loss Dollar": SIGNED_CURRENCY,
+    "Today's Gain/Loss Percent": PERCENT,
+    "Total Gain/Loss Dollar": SIGNED_CURRENCY,
+    "Total Gain/Loss Percent": PERCENT,
+    "Percent Of Account": PERCENT,
+    "Cost Basis Total": CURRENCY,
+    "Average Cost Basis": CURRENCY,
+    "Type": CATEGORY,
+}
+
+# Fidelity column → engine column expected by scoring / risk / alert modules
+POSITIONS_ALIASES = {
+    "Symbol": "Ticker",
+    "Quantity": "Shares",
+    "Last Price": "Current Price",
+    "Average Cost Basis": "Cost Basis",
+    "Total Gain/Loss Dollar": "Gain/Loss $",
+    "Total Gain/Loss Percent": "Gain/Loss %",
+}
+
+# $ , + % and spaces dropped, accounting negatives "(12.5)" → "-12.5",
+# quotes dropped so a stray one cannot span lines in the C parser
+_NUMERIC_STRIP = str.maketrans({**dict.fromkeys("$,+% )\"", None), "(": "-"})
+
+
+# =========================================================
+# Column Parsers
+# =========================================================
+def parse_numeric(series: pd.Series) -> pd.Series:
+    """
+    Strips $ , + % from a text column and converts it to float64;
+    accounting negatives in parentheses keep their sign. The column is
+    joined into one buffer, stripped with a single str.translate call
+    and handed to pandas' C float parser — no per-cell regex. Blank /
+    '--' cells become NaN.
+    """
+    if is_numeric_dtype(series) or series.empty:
+        return series.astype("float64", copy=False)
+
+    text = series.fillna("").astype(str)
+    buffer = "\n".join(text.to_numpy()).translate(_NUMERIC_STRIP)
+    values = None
+    # A cell with its own line break would shift every row after it
+    if "\r" not in buffer and buffer.count("\n") == len(series) - 1:
+        try:
+            values = pd.read_csv(
+                io.StringIO(buffer + "\n"),
+                header=None,
+                names=["value"],
+                dtype="float64",
+                na_values=["--", "n/a", "N/A"],
+                skip_blank_lines=False,
+            )["value"].to_numpy()
+        except ValueError:
+            values = None
+    if values is None or len(values) != len(series):
+        # Stray text or embedded line breaks — fall back to per-cell coercion
+        values = pd.to_numeric(text.str.translate(_NUMERIC_STRIP).to_numpy(dtype=object), errors="coerce")
+    return pd.Series(values, index=series.index, name=series.name, dtype="float64")
+
+
+def parse_ticker(series: pd.Series) -> pd.Series:
+    return series.astype("string").str.strip().str.rstrip("*").str.upper()
+
+
+def ensure_numeric(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """
+    Converts the listed columns to float64 in place, skipping columns
+    that are already numeric (the normal case for schema-loaded frames).
+    """
+    for col in columns:
+        if col in df.columns and not is_numeric_dtype(df[col]):
+            df[col] = parse_numeric(df[col])
+    return df
+
+
+# =========================================================
+# Frame Normalisation
+# =========================================================
+def normalize_positions(df: pd.DataFrame, schema: dict = None, add_aliases: bool = True) -> pd.DataFrame:
+    """
+    Applies the declared parse rule to every schema column present in df
+    and drops Fidelity's trailing disclaimer rows. Adds engine-facing
+    alias columns (Ticker, Current Price, Gain/Loss %…) when missing.
+    """
+    if schema is None:
+        schema = POSITIONS_SCHEMA
+
+    df.columns = [str(c).strip() for c in df.columns]
+
+    for col, rule in schema.items():
+        if col not in df.columns:
+            continue
+        if rule in NUMERIC_RULES:
+            df[col] = parse_numeric(df[col])
+        elif rule == TICKER:
+            df[col] = parse_ticker(df[col])
+        elif rule == CATEGORY:
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("string").str.strip().astype("category")
+
+    # Disclaimer / "Date downloaded" footer lines have no symbol
+    if "Symbol" in df.columns:
+        df = df[df["Symbol"].notna() & (df["Symbol"] != "")].reset_index(drop=True)
+
+    if "Symbol" in df.columns and "Quantity" in df.columns:
+        df["Is Cash"] = df["Quantity"].isna() & df["Symbol"].notna()
+
+    if add_aliases:
+        for source, alias in POSITIONS_ALIASES.items():
+            if source in df.columns and alias not in df.columns:
+                df[alias] = df[source]
+
+    return df
+
+
+def read_positions_csv(source, usecols=None, schema: dict = None, add_aliases: bool = True) -> pd.DataFrame:
+    """
+    Reads a positions export and returns the typed frame.
+
+    Parameters:
+        source: Path or file-like CSV.
+        usecols: Optional subset of columns to parse (others are never materialised).
+        schema: Column → parse rule map (defaults to POSITIONS_SCHEMA).
+        add_aliases: Add engine-facing alias columns.
+    """
+    if schema is None:
+        schema = POSITIONS_SCHEMA
+
+    wanted = None if usecols is None else {str(c).strip() for c in usecols}
+    dtype = {
+        col: ("category" if rule == CATEGORY else str)
+        for col, rule in schema.items()
+        if wanted is None or col in wanted
+    }
+
+    df = pd.read_csv(
+        source,
+        encoding="utf-8-sig",
+        usecols=(lambda c: c.strip() in wanted) if wanted is not None else None,
+        dtype=dtype,
+        skip_blank_lines=True,
+    )
+    return normalize_positions(df, schema=schema, add_aliases=add_aliases)
@@ -0,0 +1,174 @@
+# =========================================================
+# 🌊 Position Stream Engine — v7.7R
+# Chunked ingestion for household-scale positions exports
+# • Reads the CSV in bounded chunks through the position schema
+# • Folds each chunk into running per-account / per-ticker totals
+# • Keeps only the columns the scoring engines need (optional),
+#   and optionally only the rows a caller asks for
+# • Portfolio summary available after every chunk
+# =========================================================
+
+import pandas as pd
+
+from modules.position_schema_engine import (
+    POSITIONS_SCHEMA,
+    CATEGORY,
+    TEXT,
+    normalize_positions,
+)
+
+DEFAULT_CHUNKSIZE = 50_000
+
+# Columns needed by scoring, stop, alert and risk engines (aliases added after parse)
+SCORING_COLUMNS = [
+    "Account Number",
+    "Account Name",
+    "Symbol",
+    "Quantity",
+    "Last Price",
+    "Current Value",
+    "Cost Basis Total",
+    "Average Cost Basis",
+    "Total Gain/Loss Dollar",
+    "Total Gain/Loss Percent",
+]
+
+_TOTAL_COLUMNS = {
+    "Current Value": "Value",
+    "Cost Basis Total": "Cost Basis",
+    "Total Gain/Loss Dollar": "Gain/Loss $",
+    "Quantity": "Quantity",
+}
+
+# Per-chunk categoricals would not line up across chunks — keep them as text
+_STREAM_SCHEMA = {col: (TEXT if rule == CATEGORY else rule) for col, rule in POSITIONS_SCHEMA.items()}
+
+
+class PositionStreamAggregator:
+    """
+    Running totals over a stream of normalised position chunks.
+    State is O(accounts + tickers), independent of row count.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+        self.by_account = None
+        self.by_ticker = None
+        self._total_value = 0.0
+        self._total_gain = 0.0
+        self._pct_sum = 0.0
+        self._pct_count = 0
+
+    def update(self, chunk: pd.DataFrame):
+        self.rows += len(chunk)
+        self.chunks += 1
+
+        present = {src: dst for src, dst in _TOTAL_COLUMNS.items() if src in chunk.columns}
+        totals = chunk[list(present)].rename(columns=present)
+        totals["Positions"] = 1
+
+        if "Account Number" in chunk.columns:
+            self.by_account = self._fold(self.by_account, totals.groupby(chunk["Account Number"], dropna=False).sum())
+        if "Symbol" in chunk.columns:
+            self.by_ticker = self._fold(self.by_ticker, totals.groupby(chunk["Symbol"], dropna=False).sum())
+
+        if "Current Value" in chunk.columns:
+            self._total_value += float(chunk["Current Value"].sum())
+        if "Total Gain/Loss Dollar" in chunk.columns:
+            self._total_gain += float(chunk["Total Gain/Loss Dollar"].sum())
+        if "Total Gain/Loss Percent" in chunk.columns:
+            pct = chunk["Total Gain/Loss Percent"]
+            self._pct_sum += float(pct.sum())
+            self._pct_count += int(pct.notna().sum())
+
+    @staticmethod
+    def _fold(running, partial):
+        if running is None:
+            return partial
+        return running.add(partial, fill_value=0)
+
+    def summary(self) -> dict:
+        """Same keys as portfolio_engine.calculate_portfolio_summary."""
+        return {
+            "total_value": self._total_value,
+            "total_gain": self._total_gain,
+            "avg_gain_pct": self._pct_sum / self._pct_count if self._pct_count else 0,
+        }
+
+    def account_totals(self) -> pd.DataFrame:
+        return self._finish(self.by_account, "Account Number")
+
+    def ticker_totals(self) -> pd.DataFrame:
+        return self._finish(self.by_ticker, "Ticker")
+
+    @staticmethod
+    def _finish(frame, key_name):
+        if frame is None:
+            return pd.DataFrame()
+        out = frame.copy()
+        out.index.name = key_name
+        out["Positions"] = out["Positions"].astype("int64")
+        if {"Gain/Loss $", "Cost Basis"}.issubset(out.columns):
+            out["Gain/Loss %"] = (out["Gain/Loss $"] / out["Cost Basis"].where(out["Cost Basis"] != 0) * 100).round(2)
+        return out.reset_index()
+
+
+def iter_position_chunks(source, chunksize: int = DEFAULT_CHUNKSIZE, usecols=SCORING_COLUMNS, add_aliases: bool = True):
+    """
+    Yields normalised position chunks of at most `chunksize` rows.
+    Pass usecols=None to keep every export column.
+    """
+    wanted = None if usecols is None else set(usecols)
+    dtype = {col: str for col in _STREAM_SCHEMA if wanted is None or col in wanted}
+
+    reader = pd.read_csv(
+        source,
+        encoding="utf-8-sig",
+        usecols=(lambda c: c.strip() in wanted) if wanted is not None else None,
+        dtype=dtype,
+        chunksize=chunksize,
+    )
+    with reader:
+        for chunk in reader:
+            chunk = normalize_positions(chunk, schema=_STREAM_SCHEMA, add_aliases=add_aliases)
+            if not chunk.empty:
+                yield chunk
+
+
+def stream_positions(source, chunksize: int = DEFAULT_CHUNKSIZE, usecols=SCORING_COLUMNS):
+    """
+    Generator of (chunk, aggregator) pairs. The aggregator already
+    includes the yielded chunk, so aggregator.summary() is a running
+    portfolio summary while the file is still being read.
+    """
+    aggregator = PositionStreamAggregator()
+    for chunk in iter_position_chunks(source, chunksize=chunksize, usecols=usecols):
+        aggregator.update(chunk)
+        yield chunk, aggregator
+
+
+def ingest_positions_streaming(source, chunksize: int = DEFAULT_CHUNKSIZE, usecols=SCORING_COLUMNS,
+                               materialize: bool = True, on_chunk=None, row_filter=None):
+    """
+    Streams a positions export and returns (frame, aggregator).
+
+    Parameters:
+        materialize: Keep the (column-pruned) rows; False keeps aggregates only
+                     so peak memory is bounded by one chunk.
+        on_chunk: Optional callback(aggregator) after each chunk — e.g. to
+                  display the running summary.
+        row_filter: Optional callable(chunk) → boolean mask of the rows to
+                    keep. The aggregator still sees every row.
+    """
+    frames = []
+    aggregator = PositionStreamAggregator()
+
+    for chunk, aggregator in stream_positions(source, chunksize=chunksize, usecols=usecols):
+        if materialize:
+            frames.append(chunk if row_filter is None else chunk[row_filter(chunk)])
+        if on_chunk is not None:
+            on_chunk(aggregator)
+
+    frame = pd.concat(frames, ignore_index=True) if frames else None
+    return frame, aggregator
@@ -1,38 +1,346 @@
 import os
+import glob
+import hashlib
+import sqlite3
+import threading
+import zlib
 from datetime import datetime
-from shutil import copyfile
+
+import pandas as pd
 
 
 # =========================================================
 # 📦 Report Archive Engine — v7.7R Final Deployment
-# Archives Tactical Command Reports with timestamped filenames
+# Content-addressed archive of Tactical Command Reports:
+# • Each distinct report stored once, zlib-compressed, under its
+#   sha256 (archive/reports/blobs/ab/abcdef….z)
+# • SQLite index of report type, as-of date, account and tickers
+#   covered — lookups are indexed queries, not directory walks
+# • Re-archiving existing content only adds an index row
+# • Retention runs as bulk SQL deletes plus one orphan-blob sweep
+# • One SQLite connection per thread, so the shared archive works
+#   from Streamlit's script threads
 # =========================================================
 
-def archive_report(source_file: str, archive_base: str = "Fox_Valley_Tactical_Command_Report"):
+ARCHIVE_DIR = os.path.join("archive", "reports")
+INDEX_NAME = "index.db"
+BLOB_SUFFIX = ".z"
+COMPRESSION_LEVEL = 6
+DEFAULT_REPORT_TYPE = "command_report"
+
+_SCHEMA = [
     """
-    Archives a PDF Command Report into /archive/reports with
-    timestamp-based filename. Ensures no overwrite.
-    
-    Parameters:
-        source_file: Path to original generated PDF.
-        archive_base: Prefix for archived PDF files.
-    
-    Returns:
-        archive_path: Path where archived file is stored.
+    CREATE TABLE IF NOT EXISTS blobs (
+        hash TEXT PRIMARY KEY,
+        size INTEGER,
+        stored_size INTEGER,
+        created TEXT
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reports (
+        id INTEGER PRIMARY KEY,
+        hash TEXT NOT NULL REFERENCES blobs (hash),
+        name TEXT,
+        report_type TEXT,
+        as_of TEXT,
+        account TEXT,
+        archived_at TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS reports_type_date ON reports (report_type, as_of)",
+    "CREATE INDEX IF NOT EXISTS reports_account_date ON reports (account, as_of)",
+    "CREATE INDEX IF NOT EXISTS reports_hash ON reports (hash)",
     """
+    CREATE TABLE IF NOT EXISTS report_tickers (
+        ticker TEXT NOT NULL,
+        report_id INTEGER NOT NULL REFERENCES reports (id) ON DELETE CASCADE,
+        PRIMARY KEY (ticker, report_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS report_tickers_report ON report_tickers (report_id)",
+]
+
+REPORT_COLUMNS = ["id", "hash", "name", "report_type", "as_of", "account", "archived_at"]
+
+
+def _as_of(value):
+    """ISO date string (YYYY-MM-DD) — defaults to today."""
+    return (pd.Timestamp(value) if value is not None else pd.Timestamp.now()).strftime("%Y-%m-%d")
+
+
+class ReportArchive:
+    """Content-addressed blob store plus its SQLite index under root."""
+
+    def __init__(self, root: str = ARCHIVE_DIR):
+        self.root = root
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        self._local = threading.local()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            for statement in _SCHEMA:
+                self.conn.execute(statement)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's connection to the index, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.root, INDEX_NAME))
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Closes the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ----------------------------- blobs -----------------------------
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest + BLOB_SUFFIX)
+
+    def _put_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        if self.conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone():
+            return digest  # already archived — index row only
+
+        path = self.blob_path(digest)
+        packed = zlib.compress(data, COMPRESSION_LEVEL)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(packed)
+        os.replace(tmp_path, path)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO blobs (hash, size, stored_size, created) VALUES (?, ?, ?, ?)",
+                (digest, len(data), len(packed), datetime.now().isoformat(timespec="seconds")),
+            )
+        return digest
+
+    def read(self, key) -> bytes:
+        """Original report bytes by report id or content hash."""
+        digest = key
+        if isinstance(key, int):
+            row = self.conn.execute("SELECT hash FROM reports WHERE id = ?", (key,)).fetchone()
+            if row is None:
+                raise KeyError(f"No archived report {key}")
+            digest = row[0]
+        with open(self.blob_path(digest), "rb") as f:
+            return zlib.decompress(f.read())
+
+    def restore(self, key, destination: str) -> str:
+        """Writes an archived report back out as a regular file."""
+        data = self.read(key)
+        tmp_path = f"{destination}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, destination)
+        return destination
+
+    # ---------------------------- archive ----------------------------
+    def add(self, data: bytes, name: str = None, report_type: str = DEFAULT_REPORT_TYPE,
+            as_of=None, account: str = None, tickers=None) -> dict:
+        """
+        Archives report bytes. The same content with the same type, date
+        and account is indexed once; returns {id, hash, path, duplicate}.
+        """
+        digest = self._put_blob(bytes(data))
+        as_of = _as_of(as_of)
+        existing = self.conn.execute(
+            "SELECT id FROM reports WHERE hash = ? AND report_type IS ? AND as_of = ? AND account IS ?",
+            (digest, report_type, as_of, account),
+        ).fetchone()
+        if existing:
+            return {"id": existing[0], "hash": digest, "path": self.blob_path(digest), "duplicate": True}
+
+        tickers = sorted({str(t).strip().upper() for t in (tickers or []) if str(t).strip()})
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO reports (hash, name, report_type, as_of, account, archived_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, name, report_type, as_of, account, datetime.now().isoformat(timespec="seconds")),
+            )
+            report_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO report_tickers (ticker, report_id) VALUES (?, ?)",
+                [(t, report_id) for t in tickers],
+            )
+        return {"id": report_id, "hash": digest, "path": self.blob_path(digest), "duplicate": False}
+
+    # ----------------------------- queries ---------------------------
+    def find(self, report_type: str = None, ticker: str = None, account: str = None,
+             start=None, end=None, limit: int = None) -> pd.DataFrame:
+        """
+        Indexed report lookup, newest first — e.g. every briefing covering
+        NVDA in Q4: find("briefing", ticker="NVDA", start="2025-10-01", end="2025-12-31").
+        """
+        sql = f"SELECT {', '.join('r.' + c for c in REPORT_COLUMNS)} FROM reports r"
+        where, params = [], []
+        if ticker is not None:
+            sql += " JOIN report_tickers t ON t.report_id = r.id"
+            where.append("t.ticker = ?")
+            params.append(str(ticker).strip().upper())
+        if report_type is not None:
+            where.append("r.report_type = ?")
+            params.append(report_type)
+        if account is not None:
+            where.append("r.account = ?")
+            params.append(account)
+        if start is not None:
+            where.append("r.as_of >= ?")
+            params.append(_as_of(start))
+        if end is not None:
+            where.append("r.as_of <= ?")
+            params.append(_as_of(end))
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY r.as_of DESC, r.id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return pd.DataFrame(self.conn.execute(sql, params).fetchall(), columns=REPORT_COLUMNS)
 
-    # Ensure archive directory exists
-    archive_dir = os.path.join("archive", "reports")
-    os.makedirs(archive_dir, exist_ok=True)
+    def tickers(self, report_id: int) -> list:
+        rows = self.conn.execute("SELECT ticker FROM report_tickers WHERE report_id = ? ORDER BY ticker", (report_id,))
+        return [r[0] for r in rows]
 
-    # Generate timestamp-based filename
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    archive_filename = f"{archive_base}_{timestamp}.pdf"
-    archive_path = os.path.join(archive_dir, archive_filename)
+    def stats(self) -> dict:
+        reports, = self.conn.execute("SELECT COUNT(*) FROM reports").fetchone()
+        blobs, size, stored = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+        ).fetchone()
+        return {"reports": reports, "blobs": blobs, "bytes": size, "stored_bytes": stored}
 
-    # Copy file into archive
+    # ---------------------------- retention --------------------------
+    def prune(self, older_than_days: int = None, before=None, keep_latest: int = None,
+              report_type: str = None) -> dict:
+        """
+        Bulk retention:
+            before / older_than_days — drop index rows with as_of earlier than that
+            keep_latest — keep only the newest N reports per (type, account)
+        limited to report_type when given. Blobs no longer referenced by any
+        report are deleted afterwards. Returns {"reports": n, "blobs": n}.
+        """
+        if older_than_days is not None:
+            cutoff = pd.Timestamp.now().normalize() - pd.Timedelta(days=older_than_days)
+            before = cutoff if before is None else max(pd.Timestamp(before), cutoff)
+        type_clause, type_params = ("AND report_type = ?", [report_type]) if report_type else ("", [])
+
+        removed = 0
+        with self.conn:
+            if before is not None:
+                removed += self.conn.execute(
+                    f"DELETE FROM reports WHERE as_of < ? {type_clause}", [_as_of(before)] + type_params
+                ).rowcount
+            if keep_latest is not None:
+                removed += self.conn.execute(
+                    f"""
+                    DELETE FROM reports WHERE id IN (
+                        SELECT id FROM (
+                            SELECT id, ROW_NUMBER() OVER (
+                                PARTITION BY report_type, account ORDER BY as_of DESC, id DESC
+                            ) AS rank
+                            FROM reports WHERE 1 = 1 {type_clause}
+                        ) WHERE rank > ?
+                    )
+                    """,
+                    type_params + [int(keep_latest)],
+                ).rowcount
+        return {"reports": removed, "blobs": self.sweep()}
+
+    def sweep(self) -> int:
+        """Deletes blobs no report references any more."""
+        orphans = [r[0] for r in self.conn.execute(
+            "SELECT hash FROM blobs WHERE NOT EXISTS (SELECT 1 FROM reports WHERE reports.hash = blobs.hash)"
+        )]
+        for digest in orphans:
+            path = self.blob_path(digest)
+            try:
+                os.remove(path)
+                if not os.listdir(os.path.dirname(path)):
+                    os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass
+        with self.conn:
+            self.conn.executemany("DELETE FROM blobs WHERE hash = ?", [(d,) for d in orphans])
+        return len(orphans)
+
+    def import_legacy(self, pattern: str = "*.pdf", report_type: str = DEFAULT_REPORT_TYPE) -> int:
+        """
+        Moves timestamped PDFs from the old flat archive layout into the
+        content store (as-of taken from the filename timestamp). Returns
+        the number of files imported.
+        """
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(self.root, pattern))):
+            stamp = os.path.splitext(os.path.basename(path))[0].rsplit("_", 2)
+            try:
+                as_of = pd.Timestamp(stamp[-2]) if len(stamp) == 3 else None
+            except ValueError:
+                as_of = None
+            with open(path, "rb") as f:
+                self.add(f.read(), name=os.path.basename(path), report_type=report_type, as_of=as_of)
+            os.remove(path)
+            imported += 1
+        return imported
+
+
+# =========================================================
+# Shared process-wide archive
+# =========================================================
+_archives = {}
+
+
+def get_report_archive(root: str = ARCHIVE_DIR) -> ReportArchive:
+    archive = _archives.get(root)
+    if archive is None:
+        archive = ReportArchive(root)
+        _archives[root] = archive
+    return archive
+
+
+def archive_report(source_file, archive_base: str = "Fox_Valley_Tactical_Command_Report",
+                   report_type: str = DEFAULT_REPORT_TYPE, as_of=None, account: str = None, tickers=None):
+    """
+    Archives a PDF Command Report into the content-addressed store under
+    archive/reports. Identical content is stored once.
+
+    Parameters:
+        source_file: Path to original generated PDF (or the PDF bytes).
+        archive_base: Name recorded in the index for this report.
+        report_type / as_of / account / tickers: index metadata
+            (as_of defaults to today).
+
+    Returns:
+        report_id: Index id of the archived report — pass it to
+            ReportArchive.read / restore to get the PDF back.
+        On failure, an "❌ Archive failed: …" message instead.
+    """
     try:
-        copyfile(source_file, archive_path)
-        return archive_path
+        if isinstance(source_file, (bytes, bytearray)):
+            data = bytes(source_file)
+        else:
+            with open(source_file, "rb") as f:
+                data = f.read()
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        entry = get_report_archive().add(
+            data, name=f"{archive_base}_{timestamp}.pdf", report_type=report_type,
+            as_of=as_of, account=account, tickers=tickers,
+        )
+        return entry["id"]
     except Exception as e:
         return f"❌ Archive failed: {str(e)}"
+
+
+def find_reports(report_type: str = None, ticker: str = None, account: str = None,
+                 start=None, end=None, limit: int = None) -> pd.DataFrame:
+    """Indexed search of archived reports (see ReportArchive.find)."""
+    return get_report_archive().find(report_type, ticker, account, start, end, limit)
+
+
+def prune_archive(older_than_days: int = None, before=None, keep_latest: int = None,
+                  report_type: str = None) -> dict:
+    """Bulk retention over the shared archive (see ReportArchive.prune)."""
+    return get_report_archive().prune(older_than_days, before, keep_latest, report_type)
@@ -0,0 +1,235 @@
+# =========================================================
+# 🧠 Report Memo Engine — v7.7R
+# Skips regenerating reports, briefs, slide decks and their PDFs
+# when the inputs are unchanged since a previous run.
+# • Keyed by a content fingerprint of every argument (frame
+#   contents, parameters) plus the report's template version
+# • Text / slides stored as pickles, PDFs as their raw bytes
+# • Bounded LRU on disk — size and age limits, oldest evicted first
+# =========================================================
+
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+MEMO_DIR = os.path.join("cache", "reports")
+MEMO_MAX_BYTES = 128 * 1024 * 1024
+MEMO_MAX_AGE = 7 * 24 * 3600  # seconds
+MEMO_VERSION = "1"
+
+_memo_enabled = True
+
+
+def set_memo_enabled(enabled: bool):
+    """Globally enable or bypass report memoization."""
+    global _memo_enabled
+    _memo_enabled = bool(enabled)
+
+
+def memo_enabled() -> bool:
+    return _memo_enabled
+
+
+# =========================================================
+# Fingerprints
+# =========================================================
+def _feed(h, value):
+    """Adds a canonical encoding of value to hash h."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        if isinstance(value, pd.DataFrame):
+            h.update(b"DF" + repr((list(value.columns), [str(t) for t in value.dtypes])).encode("utf-8"))
+        else:
+            h.update(b"S" + repr((value.name, str(value.dtype))).encode("utf-8"))
+        try:
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        except TypeError:  # unhashable cells (lists, dicts)
+            h.update(pickle.dumps(value))
+    elif isinstance(value, np.ndarray):
+        h.update(b"A" + repr((value.shape, str(value.dtype))).encode("utf-8"))
+        h.update(np.ascontiguousarray(value).tobytes() if value.dtype != object else pickle.dumps(value.tolist()))
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for key in sorted(value, key=repr):
+            _feed(h, key)
+            _feed(h, value[key])
+        h.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[" if isinstance(value, list) else b"(")
+        for item in value:
+            _feed(h, item)
+        h.update(b"]")
+    elif value is None or isinstance(value, (str, bytes, bool, int, float, np.generic)):
+        h.update(f"{type(value).__name__}:{value!r};".encode("utf-8"))
+    else:
+        h.update(pickle.dumps(value))
+
+
+def fingerprint(*values) -> str:
+    """Content hash of any mix of frames, series, arrays, containers and scalars."""
+    h = hashlib.sha1()
+    for value in values:
+        _feed(h, value)
+    return h.hexdigest()
+
+
+# =========================================================
+# Store
+# =========================================================
+def _entry(key, suffix):
+    return os.path.join(MEMO_DIR, key + suffix)
+
+
+def _read(path, max_age):
+    try:
+        if time.time() - os.stat(path).st_mtime > max_age:
+            _remove_quietly(path)
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)  # mark as recently used for eviction
+        return data
+    except OSError:
+        return None
+
+
+def _write(path, data: bytes):
+    try:
+        os.makedirs(MEMO_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"⚠ Report memo write failed: {e}")
+    evict_memo()
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def evict_memo(max_bytes: int = None, max_age: float = None):
+    """
+    Deletes entries older than max_age, then least-recently-used entries
+    until the memo directory fits within max_bytes.
+    """
+    max_bytes = MEMO_MAX_BYTES if max_bytes is None else max_bytes
+    max_age = MEMO_MAX_AGE if max_age is None else max_age
+    if not os.path.isdir(MEMO_DIR):
+        return 0
+
+    now = time.time()
+    entries, total, removed = [], 0, 0
+    for name in os.listdir(MEMO_DIR):
+        if name.endswith(".tmp"):
+            continue
+        path = os.path.join(MEMO_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if now - stat.st_mtime > max_age:
+            _remove_quietly(path)
+            removed += 1
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        _remove_quietly(path)
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear_memo():
+    """Removes every memoized report."""
+    return evict_memo(max_bytes=0)
+
+
+# =========================================================
+# Decorators
+# =========================================================
+def _call_key(namespace, version, signature, args, kwargs, skip=()):
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    params = {k: v for k, v in bound.arguments.items() if k not in skip}
+    return fingerprint(MEMO_VERSION, namespace, version, params)
+
+
+def memoize_report(namespace: str, version: str = "1", max_age: float = None):
+    """
+    Memoizes a report builder returning text / slides / other picklable
+    values. Bump version whenever the builder's output format changes.
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _memo_enabled:
+                return func(*args, **kwargs)
+            path = _entry(_call_key(namespace, version, signature, args, kwargs), ".pkl")
+            data = _read(path, MEMO_MAX_AGE if max_age is None else max_age)
+            if data is not None:
+                try:
+                    return pickle.loads(data)
+                except Exception:
+                    _remove_quietly(path)
+            result = func(*args, **kwargs)
+            _write(path, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            return result
+
+        wrapper.uncached = func
+        return wrapper
+    return decorate
+
+
+def memoize_file(namespace: str, version: str = "1", filename_arg: str = "filename", max_age: float = None):
+    """
+    Memoizes an exporter that writes a file to its `filename` argument
+    and returns the filename. The output path is not part of the key:
+    on a hit the stored bytes are written to the requested path.
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _memo_enabled:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            filename = bound.arguments[filename_arg]
+            key = _call_key(namespace, version, signature, args, kwargs, skip=(filename_arg,))
+            path = _entry(key, ".bin")
+
+            data = _read(path, MEMO_MAX_AGE if max_age is None else max_age)
+            if data is not None:
+                with open(filename, "wb") as f:
+                    f.write(data)
+                return filename
+
+            result = func(*args, **kwargs)
+            try:
+                with open(filename, "rb") as f:
+                    _write(path, f.read())
+            except OSError as e:
+                print(f"⚠ Report memo write failed: {e}")
+            return result
+
+        wrapper.uncached = func
+        return wrapper
+    return decorate
@@ -1,9 +1,10 @@
 import pandas as pd
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 
+from modules.pdf_table_writer import PdfTableWriter
+
 
 def apply_stop_logic(df: pd.DataFrame, stop_loss_pct: float = -15.0, trim_gain_pct: float = 25.0) -> pd.DataFrame:
     """
@@ -40,7 +41,11 @@ def export_to_csv(df: pd.DataFrame, filename: str = "tactical_intelligence_repor
 
 
 def export_to_pdf(df: pd.DataFrame, filename: str = "tactical_intelligence_report.pdf"):
-    """Export tactical intelligence report to a simple PDF table."""
+    """
+    Export tactical intelligence report to a PDF table.
+    Rows are streamed one page-sized table at a time (see pdf_table_writer),
+    so large books build in linear time with bounded memory.
+    """
     styles = getSampleStyleSheet()
     doc = SimpleDocTemplate(filename, pagesize=letter)
     elements = []
@@ -65,21 +70,10 @@ def export_to_pdf(df: pd.DataFrame, filename: str = "tactical_intelligence_repor
         if c in df.columns
     ]
 
-    data = [cols] + df[cols].astype(str).values.tolist()
-
-    table = Table(data, repeatRows=1)
-    table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-                ("FONTSIZE", (0, 0), (-1, -1), 8),
-            ]
-        )
-    )
+    writer = PdfTableWriter(df, cols, available_width=doc.width)
+    frame_height = doc.height - 12  # SimpleDocTemplate frame padding (6 pt top and bottom)
+    title_height = title.wrap(doc.width, doc.height)[1] + title.getSpaceAfter() + 12
+    elements.extend(writer.flowables(frame_height, first_page_height=frame_height - title_height))
 
-    elements.append(table)
     doc.build(elements)
     print(f"📄 PDF Exported: {filename}")
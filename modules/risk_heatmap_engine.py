@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from modules.position_schema_engine import ensure_numeric
 
 # =========================================================
 # 🛡 Fox Valley Risk Heatmap Engine — v7.7R Final Stable Build
@@ -10,28 +11,47 @@ import numpy as np
 # • Tactical risk priority levels (Low → Critical)
 # =========================================================
 
-def generate_risk_heatmap(portfolio_df):
+def _group_total(series, keys):
+    """Scalar total, or a per-row group total when keys are given."""
+    if keys is None:
+        return series.sum()
+    return series.groupby(keys, observed=True, dropna=False).transform("sum")
+
+
+def classify_risk_levels(df):
+    """Vectorized Tactical Risk Level (LOW/MEDIUM/HIGH/CRITICAL) — first matching tier wins."""
+    with np.errstate(invalid="ignore"):
+        conditions = [
+            (df["CapitalWeight %"] > 25) | (df["LossSeverity %"] > 30),
+            (df["StopRisk %"] <= 2) | (df["Gain/Loss %"] < -10),
+            (df["StopRisk %"] <= 5) | (df["Gain/Loss %"] < 0),
+        ]
+    return np.select(conditions, ["CRITICAL", "HIGH", "MEDIUM"], "LOW")
+
+
+def generate_risk_heatmap(portfolio_df, group_by=None):
     """
     Accepts portfolio_df and returns a structured DataFrame showing:
     - StopRisk %
     - Capital Weight %
     - Loss Severity %
     - Tactical Risk Level (LOW/MEDIUM/HIGH/CRITICAL)
+
+    group_by: optional column (e.g. 'Account Number') — weights and loss
+    severity are then measured within each group instead of across the file.
     """
     if portfolio_df is None or portfolio_df.empty:
         return pd.DataFrame()
 
     df = portfolio_df.copy()
+    keys = df[group_by] if group_by else None
 
     # Ensure numeric precision
-    numeric_cols = ["Current Value", "Gain/Loss $", "Gain/Loss %", "Current Price", "Stop Price"]
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    ensure_numeric(df, ["Current Value", "Gain/Loss $", "Gain/Loss %", "Current Price", "Stop Price"])
 
-    # 1️⃣ Capital Weight (% of portfolio value)
+    # 1️⃣ Capital Weight (% of portfolio / account value)
     df["CapitalWeight %"] = round(
-        (df["Current Value"] / df["Current Value"].sum()) * 100, 2
+        (df["Current Value"] / _group_total(df["Current Value"], keys)) * 100, 2
     )
 
     # 2️⃣ StopRisk — how close is price to stop (%)
@@ -43,30 +63,23 @@ def generate_risk_heatmap(portfolio_df):
         df["StopRisk %"] = np.nan
 
     # 3️⃣ Loss Severity % — contribution to negative portfolio value
+    losses = df["Gain/Loss $"].where(df["Gain/Loss $"] < 0, 0).abs()
     df["LossSeverity %"] = np.where(
         df["Gain/Loss $"] < 0,
-        round((abs(df["Gain/Loss $"]) / abs(df[df["Gain/Loss $"] < 0]["Gain/Loss $"]).sum()) * 100, 2),
+        round((losses / _group_total(losses, keys)) * 100, 2),
         0
     )
 
     # 4️⃣ Tactical Risk Level — Unified Risk Assessment
-    def tactical_risk_level(row):
-        if row["CapitalWeight %"] > 25 or row["LossSeverity %"] > 30:
-            return "CRITICAL"
-        if row["StopRisk %"] <= 2 or row["Gain/Loss %"] < -10:
-            return "HIGH"
-        if row["StopRisk %"] <= 5 or row["Gain/Loss %"] < 0:
-            return "MEDIUM"
-        return "LOW"
-
-    df["Risk Level"] = df.apply(tactical_risk_level, axis=1)
+    df["Risk Level"] = classify_risk_levels(df)
 
     # Output structure
-    return df[[
+    columns = [
         "Ticker",
         "CapitalWeight %",
         "Gain/Loss %",
         "StopRisk %",
         "LossSeverity %",
         "Risk Level",
-    ]]
+    ]
+    return df[([group_by] if group_by else []) + columns]
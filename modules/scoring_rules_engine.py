@@ -0,0 +1,220 @@
+# =========================================================
+# 📐 Scoring Rules Engine — v7.7R
+# Declarative scoring tables shared by tactical_scoring_engine
+# and tactical_engine:
+# • bands  — ordered (op, threshold, output) rows, first match wins
+# • map    — exact value → output lookup
+# Tables compile once into NumPy searchsorted / select kernels
+# that score whole columns at a time. Defaults can be overridden
+# from config/scoring_rules.json without code edits.
+# =========================================================
+
+import os
+import copy
+import json
+import operator
+import numpy as np
+import pandas as pd
+
+SCORING_RULES_FILE = os.path.join("config", "scoring_rules.json")
+
+DEFAULT_RULE_TABLES = {
+    # ----- tactical_scoring_engine -----
+    "gain_score": {
+        "column": "Gain/Loss %",
+        "bands": [[">", 25, 40], [">", 10, 30], [">", 0, 20]],
+        "default": 10,
+    },
+    "zacks_score": {
+        "column": "Zacks Rank",
+        "map": [[1, 35], [2, 25], [3, 15]],
+        "default": 0,
+    },
+    "risk_score": {
+        "column": "RiskGap %",
+        "bands": [[">=", 10, 25], [">=", 6, 15], [">", 0, 5]],
+        "default": 0,
+    },
+    "momentum_score": {"constant": 10},
+    "tactical_priority": {
+        "bands": [[">=", 80, "STRONG BUY"], [">=", 60, "ACCUMULATE/HOLD"], [">=", 40, "CAUTION / HOLD"]],
+        "default": "AT RISK / TRIM",
+    },
+    # ----- tactical_engine -----
+    "tactical_weights": {
+        "composite_cap": 50,
+        "momentum_cap": 20,
+        "rank1_bonus": 15,
+        "volatility_default": 20,
+        "volatility_cap": 20,
+        "volatility_weight": 0.5,
+        "min_score": 0,
+        "max_score": 100,
+    },
+    "trust_multiplier": {
+        "bands": [[">=", 10, 1.2], [">=", 5, 1.1]],
+        "default": 1.0,
+        "cap": 100,
+    },
+    "stability_class": {
+        "bands": [[">=", 10, "🛡 Durable"], [">=", 5, "🌱 Emerging"]],
+        "default": "⚠ Unstable",
+    },
+    "tactical_tag": {
+        "bands": [
+            [">=", 85, "🚀 Target Buy"],
+            [">=", 70, "📈 Accumulate"],
+            [">=", 55, "⚖ Hold"],
+            [">=", 40, "✂ Trim"],
+        ],
+        "default": "⛔ Sell Candidate",
+    },
+}
+
+_OPS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+}
+
+
+# =========================================================
+# Kernel Compilation
+# =========================================================
+def _output_array(values):
+    if all(isinstance(v, (int, np.integer)) and not isinstance(v, bool) for v in values):
+        return np.asarray(values, dtype=np.int64)
+    if all(isinstance(v, (int, float, np.number)) for v in values):
+        return np.asarray(values, dtype=np.float64)
+    return np.asarray(values, dtype=object)
+
+
+def _as_float(values):
+    if isinstance(values, pd.Series):
+        values = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    return np.asarray(values, dtype="float64")
+
+
+def compile_band_rule(rule: dict):
+    """
+    Compiles a 'bands' table into a column kernel. Uniform '>' or '>='
+    tables with descending thresholds become one searchsorted lookup;
+    anything else becomes a single np.select. NaN inputs get the default.
+    """
+    bands = rule["bands"]
+    default = rule["default"]
+    ops = [b[0] for b in bands]
+    thresholds = [float(b[1]) for b in bands]
+    outputs = [b[2] for b in bands]
+
+    descending = all(a > b for a, b in zip(thresholds, thresholds[1:]))
+    if len(set(ops)) == 1 and ops[0] in (">", ">=") and descending:
+        edges = np.asarray(thresholds[::-1])
+        table = _output_array([default] + outputs[::-1])
+        side = "left" if ops[0] == ">" else "right"
+
+        def kernel(values):
+            x = _as_float(values)
+            idx = np.searchsorted(edges, x, side=side)
+            idx[np.isnan(x)] = 0
+            return table[idx]
+
+        return kernel
+
+    choices = _output_array(outputs + [default])
+
+    def kernel(values):
+        x = _as_float(values)
+        with np.errstate(invalid="ignore"):
+            conditions = [_OPS[op](x, thr) for op, thr in zip(ops, thresholds)]
+        return np.select(conditions, list(choices[:-1]), choices[-1])
+
+    return kernel
+
+
+def compile_map_rule(rule: dict):
+    """
+    Compiles a 'map' table (exact matches against the raw column values —
+    no type coercion, so '1' and 1 stay distinct) into a column kernel.
+    """
+    keys = [k for k, _ in rule["map"]]
+    outputs = _output_array([v for _, v in rule["map"]] + [rule["default"]])
+
+    def kernel(values):
+        raw = values.to_numpy() if isinstance(values, pd.Series) else np.asarray(values)
+        conditions = [raw == k for k in keys]
+        return np.select(conditions, list(outputs[:-1]), outputs[-1])
+
+    return kernel
+
+
+def compile_rule(rule: dict):
+    if "bands" in rule:
+        return compile_band_rule(rule)
+    if "map" in rule:
+        return compile_map_rule(rule)
+    if "constant" in rule:
+        constant = rule["constant"]
+        return lambda values: np.full(len(values), constant)
+    raise ValueError(f"Unrecognised scoring rule: {rule}")
+
+
+# =========================================================
+# Rule Table Loading
+# =========================================================
+def load_rule_tables(path: str = SCORING_RULES_FILE) -> dict:
+    """Defaults overlaid with any tables present in the JSON config file."""
+    tables = copy.deepcopy(DEFAULT_RULE_TABLES)
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                overrides = json.load(f)
+            for name, table in overrides.items():
+                if isinstance(table, dict) and isinstance(tables.get(name), dict):
+                    tables[name].update(table)
+                else:
+                    tables[name] = table
+        except (OSError, ValueError) as e:
+            print(f"⚠ Scoring rules config ignored ({path}): {e}")
+    return tables
+
+
+class ScoringRules:
+    """Rule tables plus their compiled column kernels."""
+
+    def __init__(self, tables: dict):
+        self.tables = tables
+        self.kernels = {
+            name: compile_rule(table)
+            for name, table in tables.items()
+            if isinstance(table, dict) and ({"bands", "map", "constant"} & set(table))
+        }
+
+    def column(self, name: str):
+        return self.tables[name].get("column")
+
+    def score(self, name: str, values):
+        return self.kernels[name](values)
+
+    def weight(self, table: str, key: str):
+        return self.tables[table][key]
+
+
+_active_rules = None
+
+
+def get_scoring_rules() -> ScoringRules:
+    """Compiled rules, built once per process."""
+    global _active_rules
+    if _active_rules is None:
+        _active_rules = ScoringRules(load_rule_tables())
+    return _active_rules
+
+
+def reload_scoring_rules(path: str = SCORING_RULES_FILE) -> ScoringRules:
+    """Re-reads the config file and recompiles every kernel."""
+    global _active_rules
+    _active_rules = ScoringRules(load_rule_tables(path))
+    return _active_rules
@@ -8,7 +8,10 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.styles import getSampleStyleSheet
 
+from modules.report_memo_engine import memoize_file
 
+
+@memoize_file("slides_pdf")
 def export_slides_to_pdf(slides, filename="Fox_Valley_Executive_Presentation.pdf"):
     """
     Accepts list of slides (list of dicts with 'title' and 'content')
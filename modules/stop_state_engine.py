@@ -0,0 +1,307 @@
+# =========================================================
+# 🧗 Stop State Engine — v7.7R
+# Real trailing stops: each position keeps its high-water mark
+# and active stop level between runs, so stops ratchet up with
+# new highs and never move down when the price falls.
+# • One state row per (account, ticker)
+# • Snapshots or intraday ticks update every row in one
+#   vectorized max / compare pass; ticks write only the rows of
+#   the tickers they carry, in place
+# • Marks ratcheted elsewhere (the live alert stream) merge back
+#   without ever lowering a stop
+# • Persisted as a single pickle in archive/
+# =========================================================
+
+import os
+import numpy as np
+import pandas as pd
+
+from modules.trailing_stop_manager import DEFAULT_STOP_PCT, STOP_PRECEDENCE, resolve_stop_pcts
+
+STOP_STATE_FILE = os.path.join("archive", "stop_state.pkl")
+STATE_KEYS = ["account", "ticker"]
+STATE_COLUMNS = ["high_water", "stop_pct", "stop_price", "last_price", "breached", "updated"]
+ALL_ACCOUNTS = "ALL"
+
+
+def _empty_state():
+    index = pd.MultiIndex.from_arrays([[], []], names=STATE_KEYS)
+    return pd.DataFrame(
+        {
+            "high_water": pd.Series(dtype="float64"),
+            "stop_pct": pd.Series(dtype="float64"),
+            "stop_price": pd.Series(dtype="float64"),
+            "last_price": pd.Series(dtype="float64"),
+            "breached": pd.Series(dtype="bool"),
+            "updated": pd.Series(dtype="datetime64[ns]"),
+        },
+        index=index,
+    )
+
+
+def _position_keys(df: pd.DataFrame) -> pd.MultiIndex:
+    tickers = df["Ticker"].astype(str).str.strip().str.upper()
+    if "Account Number" in df.columns:
+        accounts = df["Account Number"].astype(str).str.strip()
+    else:
+        accounts = pd.Series(ALL_ACCOUNTS, index=df.index)
+    return pd.MultiIndex.from_arrays([accounts.to_numpy(), tickers.to_numpy()], names=STATE_KEYS)
+
+
+class StopStateStore:
+    """
+    High-water marks and active stop levels per position.
+
+    state columns:
+        high_water — highest price seen since the position entered the store
+        stop_pct   — trailing percentage in force
+        stop_price — active stop (high_water trailed by stop_pct, never lowered)
+        last_price — most recent price applied
+        breached   — last_price ≤ stop_price on the most recent update
+        updated    — timestamp of the most recent update
+    """
+
+    def __init__(self, path: str = STOP_STATE_FILE):
+        self.path = path
+        self._ticker_rows = None
+        self._ticker_rows_index = None
+        self.state = self._load()
+
+    # Rows live in plain NumPy column arrays so tick updates can write the
+    # touched rows in place; the DataFrame view is assembled on access.
+    @property
+    def state(self) -> pd.DataFrame:
+        return pd.DataFrame({col: self._columns[col].copy() for col in STATE_COLUMNS}, index=self._index)
+
+    @state.setter
+    def state(self, frame: pd.DataFrame):
+        self._index = frame.index
+        self._columns = {col: frame[col].to_numpy(copy=True) for col in STATE_COLUMNS}
+
+    # --------------------------- persistence -------------------------
+    def _load(self):
+        try:
+            state = pd.read_pickle(self.path)
+            if list(state.columns) == STATE_COLUMNS:
+                return state
+        except Exception:
+            pass
+        return _empty_state()
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            self.state.to_pickle(tmp_path)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠ Stop state write failed: {e}")
+
+    # ----------------------------- updates ---------------------------
+    def _apply(self, keys: pd.MultiIndex, prices: np.ndarray, pcts: np.ndarray, as_of, pos: np.ndarray = None):
+        """
+        Core ratchet over aligned key / price / pct arrays. pos gives the
+        keys' state row positions when the caller already knows them
+        (unique, tracked rows); otherwise they are looked up.
+        """
+        keep = ~np.isnan(prices)
+        keys, prices, pcts = keys[keep], prices[keep], pcts[keep]
+        if pos is not None:
+            pos = pos[keep]
+        else:
+            if keys.has_duplicates:
+                frame = pd.DataFrame({"price": prices, "pct": pcts}, index=keys)
+                frame = frame.groupby(level=STATE_KEYS, sort=False).agg({"price": "max", "pct": "first"})
+                keys, prices, pcts = frame.index, frame["price"].to_numpy(), frame["pct"].to_numpy()
+            pos = self._index.get_indexer(keys)
+
+        # Tracked rows are written in place — only brand-new positions
+        # touch the whole frame
+        found = pos >= 0
+        prev_hw, prev_stop, prev_pct = (np.full(len(keys), np.nan) for _ in range(3))
+        for prev, col in ((prev_hw, "high_water"), (prev_stop, "stop_price"), (prev_pct, "stop_pct")):
+            prev[found] = self._columns[col][pos[found]]
+
+        # A changed percentage re-trails from the high-water mark instead of ratcheting
+        retrail = ~np.isnan(prev_pct) & (prev_pct != pcts)
+        prev_stop = np.where(retrail, np.nan, prev_stop)
+
+        high_water = np.fmax(prev_hw, prices)
+        trailed = np.round(high_water * (1 - pcts / 100), 2)
+        stop_price = np.fmax(prev_stop, trailed)
+
+        updated = pd.DataFrame(
+            {
+                "high_water": high_water,
+                "stop_pct": pcts,
+                "stop_price": stop_price,
+                "last_price": prices,
+                "breached": prices <= stop_price,
+                "updated": pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now(),
+            },
+            index=keys,
+        )
+
+        if found.any():
+            rows = pos[found]
+            for col in STATE_COLUMNS:
+                self._columns[col][rows] = updated[col].to_numpy()[found]
+        if not found.all():
+            self.state = pd.concat([self.state, updated[~found]])
+        return updated
+
+    def update_snapshot(self, df: pd.DataFrame, default_pct=DEFAULT_STOP_PCT, ticker_stops=None,
+                        sector_stops=None, account_stops=None, precedence=STOP_PRECEDENCE,
+                        as_of=None, prune: bool = True) -> pd.DataFrame:
+        """
+        Applies a full positions snapshot (Ticker, Current Price, optional
+        Account Number / Sector). Positions missing from the snapshot are
+        dropped when prune is True. Returns the updated state rows.
+        """
+        if df is None or df.empty:
+            return _empty_state()
+        keys = _position_keys(df)
+        prices = pd.to_numeric(df["Current Price"], errors="coerce").to_numpy(dtype="float64")
+        pcts = resolve_stop_pcts(df, ticker_stops, sector_stops, account_stops, default_pct, precedence)
+        updated = self._apply(keys, prices, pcts.to_numpy(dtype="float64"), as_of)
+        if prune:
+            state = self.state
+            self.state = state[state.index.isin(keys)]
+        return updated
+
+    def update_prices(self, prices, as_of=None) -> pd.DataFrame:
+        """
+        Applies ticker → price ticks (Series or dict) to every tracked
+        position in those tickers. Untracked tickers are ignored.
+        Returns the updated state rows.
+        """
+        prices = pd.Series(prices, dtype="float64")
+        if prices.empty or not len(self._index):
+            return _empty_state()
+        prices.index = prices.index.astype(str).str.strip().str.upper()
+        prices = prices[~prices.index.duplicated(keep="last")]
+
+        lookup = self._rows_by_ticker()
+        hits = [(lookup[t], p) for t, p in prices.items() if t in lookup]
+        if not hits:
+            return _empty_state()
+        rows = np.concatenate([r for r, _ in hits])
+        row_prices = np.concatenate([np.full(len(r), p) for r, p in hits])
+        row_pcts = self._columns["stop_pct"][rows]
+        return self._apply(self._index[rows], row_prices, row_pcts, as_of, pos=rows)
+
+    def update_marks(self, df: pd.DataFrame, as_of=None) -> pd.DataFrame:
+        """
+        Merges high-water marks and stops tracked elsewhere (e.g. by the
+        streaming alert evaluator) from a positions frame with Ticker,
+        Current Price, High Water Mark, Stop Price and optional Account
+        Number. Both only ratchet up; untracked positions are ignored.
+        Returns the updated state rows.
+        """
+        if df is None or df.empty or not len(self._index):
+            return _empty_state()
+        marks = pd.DataFrame(
+            {
+                "high_water": pd.to_numeric(df["High Water Mark"], errors="coerce").to_numpy(dtype="float64"),
+                "stop_price": pd.to_numeric(df["Stop Price"], errors="coerce").to_numpy(dtype="float64"),
+                "last_price": pd.to_numeric(df["Current Price"], errors="coerce").to_numpy(dtype="float64"),
+            },
+            index=_position_keys(df),
+        )
+        if marks.index.has_duplicates:
+            marks = marks.groupby(level=STATE_KEYS, sort=False).agg(
+                {"high_water": "max", "stop_price": "max", "last_price": "last"}
+            )
+        pos = self._index.get_indexer(marks.index)
+        marks = marks[pos >= 0]
+        rows = pos[pos >= 0]
+        if not len(rows):
+            return _empty_state()
+
+        cols = self._columns
+        cols["high_water"][rows] = np.fmax(cols["high_water"][rows], marks["high_water"].to_numpy())
+        cols["stop_price"][rows] = np.fmax(cols["stop_price"][rows], marks["stop_price"].to_numpy())
+        last = marks["last_price"].to_numpy()
+        cols["last_price"][rows] = np.where(np.isnan(last), cols["last_price"][rows], last)
+        cols["breached"][rows] = cols["last_price"][rows] <= cols["stop_price"][rows]
+        cols["updated"][rows] = (pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now()).to_datetime64()
+        return self.state.iloc[rows]
+
+    def _rows_by_ticker(self) -> dict:
+        """ticker → state row positions, rebuilt only when the set of positions changes."""
+        if self._ticker_rows_index is not self._index:
+            tickers = self._index.get_level_values("ticker").to_numpy()
+            self._ticker_rows = pd.Series(np.arange(len(tickers))).groupby(tickers).indices
+            self._ticker_rows_index = self._index
+        return self._ticker_rows
+
+    def reset(self, tickers=None):
+        """Forgets high-water marks (all positions, or just these tickers)."""
+        if tickers is None:
+            self.state = _empty_state()
+            return
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        drop = self._index.get_level_values("ticker").isin([t.upper() for t in tickers])
+        self.state = self.state[~drop]
+
+    def trail(self, df: pd.DataFrame, default_pct=DEFAULT_STOP_PCT, ticker_stops=None, sector_stops=None,
+              account_stops=None, precedence=STOP_PRECEDENCE, as_of=None, save: bool = True) -> pd.DataFrame:
+        """
+        Trailing stops that actually trail: updates the high-water marks
+        from this snapshot, then returns df with High Water Mark, Stop
+        Price, Protection Gap % and Stop Breached columns.
+        """
+        if df is None or df.empty or "Current Price" not in df.columns:
+            return df
+        self.update_snapshot(df, default_pct, ticker_stops, sector_stops, account_stops, precedence, as_of=as_of)
+        if save:
+            self.save()
+        return self.attach(df)
+
+    # ----------------------------- queries ---------------------------
+    def breaches(self) -> pd.DataFrame:
+        """Positions whose last price is at or below their trailed stop."""
+        state = self.state
+        return state[state["breached"]].reset_index()
+
+    def attach(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds High Water Mark, Stop Price, Protection Gap % and Stop Breached
+        to a positions frame from the stored state.
+        """
+        if df is None or df.empty:
+            return df
+        out = df.copy()
+        rows = self.state.reindex(_position_keys(out))
+        price = pd.to_numeric(out["Current Price"], errors="coerce").to_numpy(dtype="float64")
+        stop = rows["stop_price"].to_numpy(dtype="float64")
+
+        out["High Water Mark"] = rows["high_water"].to_numpy()
+        out["Stop Price"] = stop
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["Protection Gap %"] = np.round((price - stop) / price * 100, 2)
+        out["Stop Breached"] = price <= stop
+        return out
+
+
+# =========================================================
+# Shared process-wide store
+# =========================================================
+_stores = {}
+
+
+def get_stop_state(path: str = STOP_STATE_FILE) -> StopStateStore:
+    store = _stores.get(path)
+    if store is None:
+        store = StopStateStore(path)
+        _stores[path] = store
+    return store
+
+
+def apply_persistent_trailing_stops(df: pd.DataFrame, default_pct=DEFAULT_STOP_PCT, ticker_stops=None,
+                                    sector_stops=None, account_stops=None, as_of=None,
+                                    store: StopStateStore = None, save: bool = True) -> pd.DataFrame:
+    """Shared-store form of StopStateStore.trail."""
+    store = store or get_stop_state()
+    return store.trail(df, default_pct, ticker_stops, sector_stops, account_stops, as_of=as_of, save=save)
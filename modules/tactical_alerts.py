@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+from modules.position_schema_engine import ensure_numeric
 
 # =========================================================
 # 🚨 Tactical Alerts Engine — v7.7R Final Stable Build
@@ -7,70 +9,219 @@ import pandas as pd
 # • Unrealized loss analysis
 # • Capital concentration risk
 # • Tactical Score + Zacks Opportunity Flags
+# Alerts are computed as a typed table (one vectorized mask per
+# rule); message strings are rendered only for display / export.
+# Pass an alert_state_engine store to emit only new, escalated or
+# resolved alerts instead of the full list on every run.
 # =========================================================
 
-def generate_tactical_alerts(portfolio_df=None, scored_df=None, zacks_df=None):
+ALERT_SEVERITIES = ["CRITICAL", "HIGH", "MEDIUM", "INFO"]
+
+# Rule id → severity, threshold and message template. Templates see
+# Ticker, Metric, Reference and Scope from each alert row.
+ALERT_RULES = {
+    "STOP_BREACH": {
+        "severity": "CRITICAL",
+        "threshold": 0.0,
+        "template": "🚨 STOP BREACH: {Ticker} is below stop ({Metric:.2f} ≤ {Reference:.2f}). Immediate review required.",
+    },
+    "HEAVY_LOSS": {
+        "severity": "HIGH",
+        "threshold": -10.0,
+        "template": "⚠ HEAVY LOSS: {Ticker} is down {Metric:.2f}%, review risk mitigation or exit strategy.",
+    },
+    "CAPITAL_CLUSTER": {
+        "severity": "HIGH",
+        "threshold": 20.0,
+        "template": "🛑 CAPITAL CLUSTER: {Ticker} accounts for {Metric:.2f}% of {Scope} value. Diversification recommended.",
+    },
+    "NEAR_STOP": {
+        "severity": "MEDIUM",
+        "threshold": 3.0,
+        "template": "⏳ NEAR STOP: {Ticker} is within {Metric:.2f}% of trailing stop.",
+    },
+    "RANK1_BUY": {
+        "severity": "INFO",
+        "threshold": 80.0,
+        "template": "🎯 HIGH-PROBABILITY BUY SIGNAL: {Ticker} — Rank 1 with TacticalScore {Metric:g}.",
+    },
+}
+
+NO_ALERTS_MESSAGE = "📈 No critical tactical alerts. Portfolio remains stable."
+NO_ALERT_CHANGES_MESSAGE = "📈 No new tactical alerts since the last run."
+RESOLVED_TEMPLATE = "✅ RESOLVED: {Ticker} — {Rule} alert cleared."
+ACCOUNT_COLUMN = "Account Number"
+
+
+def _empty_alert_table():
+    return pd.DataFrame({
+        "Account": pd.Series(dtype=object),
+        "Ticker": pd.Series(dtype=object),
+        "Rule": pd.Categorical([], categories=list(ALERT_RULES)),
+        "Severity": pd.Categorical([], categories=ALERT_SEVERITIES, ordered=True),
+        "Metric": pd.Series(dtype="float64"),
+        "Reference": pd.Series(dtype="float64"),
+        "Threshold": pd.Series(dtype="float64"),
+        "Scope": pd.Series(dtype=object),
+    })
+
+
+def build_alert_table(portfolio_df=None, scored_df=None, zacks_df=None, group_by=None) -> pd.DataFrame:
+    """
+    One row per triggered alert:
+        Account (group_by / Account Number, None without one),
+        Ticker, Rule (id), Severity (ordered CRITICAL → INFO),
+        Metric (the value that tripped the rule), Reference (stop price for
+        STOP_BREACH), Threshold, Scope (account or 'total portfolio').
+    Rows are grouped by rule in ALERT_RULES order, portfolio order within.
+
+    group_by: optional account column — capital concentration is then
+    measured against each account's value rather than the whole file.
+    """
     if portfolio_df is None or portfolio_df.empty:
-        return ["📭 No portfolio data available for alerts."]
+        return _empty_alert_table()
 
-    alerts = []
-    df = portfolio_df.copy()
-    df["Current Value"] = pd.to_numeric(df["Current Value"], errors="coerce")
-    df["Gain/Loss %"] = pd.to_numeric(df["Gain/Loss %"], errors="coerce")
-    df["Current Price"] = pd.to_numeric(df["Current Price"], errors="coerce")
-    df["Stop Price"] = pd.to_numeric(df.get("Stop Price", None), errors="coerce")
-
-    # ===== 🚨 1. Stop Breach Detection =====
-    if "Stop Price" in df.columns:
-        breached = df[df["Current Price"] <= df["Stop Price"]]
-        for _, row in breached.iterrows():
-            alerts.append(
-                f"🚨 STOP BREACH: {row['Ticker']} is below stop "
-                f"({row['Current Price']:.2f} ≤ {row['Stop Price']:.2f}). Immediate review required."
-            )
+    account_col = group_by or ACCOUNT_COLUMN
+    cols = [c for c in ["Ticker", "Current Value", "Gain/Loss %", "Current Price", "Stop Price", account_col] if c in portfolio_df.columns]
+    df = portfolio_df[cols].copy()
+    if "Stop Price" not in df.columns:
+        df["Stop Price"] = np.nan
+    ensure_numeric(df, ["Current Value", "Gain/Loss %", "Current Price", "Stop Price"])
 
-    # ===== ⚠ 2. Unrealized Loss Warning =====
-    severe_loss = df[df["Gain/Loss %"] <= -10]
-    for _, row in severe_loss.iterrows():
-        alerts.append(
-            f"⚠ HEAVY LOSS: {row['Ticker']} is down {row['Gain/Loss %']:.2f}%, "
-            f"review risk mitigation or exit strategy."
-        )
-
-    # ===== 🛑 3. Capital Concentration Risk (>20%) =====
-    df["CapitalWeight %"] = round((df["Current Value"] / df["Current Value"].sum()) * 100, 2)
-    concentration = df[df["CapitalWeight %"] > 20]
-    for _, row in concentration.iterrows():
-        alerts.append(
-            f"🛑 CAPITAL CLUSTER: {row['Ticker']} accounts for {row['CapitalWeight %']:.2f}% "
-            f"of total portfolio value. Diversification recommended."
-        )
-
-    # ===== ⏳ 4. 3% Stop Proximity Warning =====
-    if "Stop Price" in df.columns:
-        df["StopRisk %"] = round(((df["Current Price"] - df["Stop Price"]) / df["Current Price"]) * 100, 2)
-        near_stop = df[df["StopRisk %"] <= 3]
-        for _, row in near_stop.iterrows():
-            alerts.append(
-                f"⏳ NEAR STOP: {row['Ticker']} is within {row['StopRisk %']:.2f}% of trailing stop."
-            )
+    tickers = df["Ticker"].to_numpy(dtype=object)
+    accounts = (
+        df[account_col].astype(str).to_numpy(dtype=object)
+        if account_col in df.columns else np.full(len(df), None, dtype=object)
+    )
+    price = df["Current Price"].to_numpy(dtype="float64", na_value=np.nan)
+    stop = df["Stop Price"].to_numpy(dtype="float64", na_value=np.nan)
+    gain = df["Gain/Loss %"].to_numpy(dtype="float64", na_value=np.nan)
 
-    # ===== 🎯 5. Tactical Opportunity — Rank1 + Strong Tactical Score =====
-    if scored_df is not None and not scored_df.empty and zacks_df is not None and not zacks_df.empty:
-        merged = pd.merge(scored_df, zacks_df, left_on="Ticker", right_on="ticker", how="inner")
-        tactical_buys = merged[
-            (merged["zacks_rank"] == 1) & 
-            (merged["TacticalScore"] >= 80)
+    if group_by:
+        totals = df["Current Value"].groupby(df[group_by], observed=True, dropna=False).transform("sum")
+        scope = ("account " + df[group_by].astype(str)).to_numpy(dtype=object)
+    else:
+        totals = df["Current Value"].sum()
+        scope = np.full(len(df), "total portfolio", dtype=object)
+    weight = np.round((df["Current Value"] / totals * 100).to_numpy(dtype="float64", na_value=np.nan), 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stop_risk = np.round((price - stop) / price * 100, 2)
+
+    with np.errstate(invalid="ignore"):
+        rules = [
+            ("STOP_BREACH", price <= stop, price, stop),
+            ("HEAVY_LOSS", gain <= ALERT_RULES["HEAVY_LOSS"]["threshold"], gain, None),
+            ("CAPITAL_CLUSTER", weight > ALERT_RULES["CAPITAL_CLUSTER"]["threshold"], weight, None),
+            ("NEAR_STOP", stop_risk <= ALERT_RULES["NEAR_STOP"]["threshold"], stop_risk, None),
         ]
-        for _, row in tactical_buys.iterrows():
-            alerts.append(
-                f"🎯 HIGH-PROBABILITY BUY SIGNAL: {row['Ticker']} — "
-                f"Rank 1 with TacticalScore {row['TacticalScore']}."
+
+    parts = []
+    for rule, mask, metric, reference in rules:
+        idx = np.flatnonzero(mask)
+        if len(idx):
+            parts.append((rule, accounts[idx], tickers[idx], metric[idx],
+                          reference[idx] if reference is not None else np.full(len(idx), np.nan),
+                          scope[idx] if rule == "CAPITAL_CLUSTER" else np.full(len(idx), None, dtype=object)))
+
+    # ===== Rank 1 + Strong Tactical Score (membership test, no merge) =====
+    if scored_df is not None and not scored_df.empty and zacks_df is not None and not zacks_df.empty:
+        rank1 = zacks_df.loc[pd.to_numeric(zacks_df["zacks_rank"], errors="coerce") == 1, "ticker"]
+        score = pd.to_numeric(scored_df["TacticalScore"], errors="coerce")
+        hit = scored_df["Ticker"].isin(rank1) & (score >= ALERT_RULES["RANK1_BUY"]["threshold"])
+        if hit.any():
+            n = int(hit.sum())
+            hit_accounts = (
+                scored_df.loc[hit, account_col].astype(str).to_numpy(dtype=object)
+                if account_col in scored_df.columns else np.full(n, None, dtype=object)
             )
+            parts.append(("RANK1_BUY", hit_accounts, scored_df.loc[hit, "Ticker"].to_numpy(dtype=object),
+                          score[hit].to_numpy(dtype="float64"), np.full(n, np.nan), np.full(n, None, dtype=object)))
+
+    if not parts:
+        return _empty_alert_table()
+
+    rule_names = list(ALERT_RULES)
+    rule_codes = np.concatenate([np.full(len(p[2]), rule_names.index(p[0]), dtype=np.int8) for p in parts])
+    severity_codes = np.array([ALERT_SEVERITIES.index(ALERT_RULES[r]["severity"]) for r in rule_names], dtype=np.int8)
+    thresholds = np.array([ALERT_RULES[r]["threshold"] for r in rule_names], dtype="float64")
+
+    table = pd.DataFrame({
+        "Account": np.concatenate([p[1] for p in parts]),
+        "Ticker": np.concatenate([p[2] for p in parts]),
+        "Rule": pd.Categorical.from_codes(rule_codes, categories=rule_names),
+        "Severity": pd.Categorical.from_codes(severity_codes[rule_codes], categories=ALERT_SEVERITIES, ordered=True),
+        "Metric": np.concatenate([p[3] for p in parts]),
+        "Reference": np.concatenate([p[4] for p in parts]),
+        "Threshold": thresholds[rule_codes],
+        "Scope": np.concatenate([p[5] for p in parts]),
+    })
+    return table
+
+
+# =========================================================
+# 🔎 Filtering / Ordering
+# =========================================================
+def filter_alerts(alert_table, min_severity=None, rules=None, tickers=None):
+    """Subset of an alert table — severity at or above min_severity, rule ids, tickers."""
+    mask = pd.Series(True, index=alert_table.index)
+    if min_severity is not None:
+        mask &= alert_table["Severity"] <= min_severity
+    if rules is not None:
+        mask &= alert_table["Rule"].isin([rules] if isinstance(rules, str) else rules)
+    if tickers is not None:
+        mask &= alert_table["Ticker"].isin([tickers] if isinstance(tickers, str) else tickers)
+    return alert_table[mask]
+
+
+def sort_alerts(alert_table):
+    """Most severe first, then rule order, keeping portfolio order within a rule."""
+    return alert_table.sort_values(["Severity", "Rule"], kind="stable")
+
+
+# =========================================================
+# 🖋 Message Rendering (display / export only)
+# =========================================================
+def render_alert_messages(alerts):
+    """
+    Alert table → message strings. Rows with a RESOLVED Status (alert
+    state changes, stream events) render as a cleared notice. Lists of
+    strings (legacy callers) are passed through unchanged.
+    """
+    if alerts is None:
+        return []
+    if not isinstance(alerts, pd.DataFrame):
+        return list(alerts)
+    templates = {rule: spec["template"] for rule, spec in ALERT_RULES.items()}
+    resolved = (
+        (alerts["Status"].astype(str) == "RESOLVED").to_numpy()
+        if "Status" in alerts.columns else np.zeros(len(alerts), dtype=bool)
+    )
+    rows = alerts[["Ticker", "Rule", "Metric", "Reference", "Scope"]].to_dict("records")
+    return [
+        (RESOLVED_TEMPLATE if cleared else templates[row["Rule"]]).format(**row)
+        for row, cleared in zip(rows, resolved)
+    ]
+
+
+def generate_tactical_alerts(portfolio_df=None, scored_df=None, zacks_df=None, group_by=None, state=None):
+    """
+    Rendered alert messages (see build_alert_table for the structured form).
+    group_by: optional account column — capital concentration is then
+    measured against each account's value rather than the whole file.
+    state: optional alert_state_engine.AlertStateStore — only alerts that are
+    new, escalated or resolved since the previous run are returned.
+    """
+    if portfolio_df is None or portfolio_df.empty:
+        return ["📭 No portfolio data available for alerts."]
+
+    table = build_alert_table(portfolio_df, scored_df, zacks_df, group_by)
+    if state is not None:
+        table = state.reconcile(table)
+    alerts = render_alert_messages(table)
 
     # ===== No alerts? =====
     if not alerts:
-        alerts.append("📈 No critical tactical alerts. Portfolio remains stable.")
+        alerts.append(NO_ALERTS_MESSAGE if state is None else NO_ALERT_CHANGES_MESSAGE)
 
     return alerts
 
@@ -79,5 +230,10 @@ def generate_tactical_alerts(portfolio_df=None, scored_df=None, zacks_df=None):
 # 🗂 Export-Friendly Helper Format
 # =========================================================
 def alerts_to_dataframe(alerts_list):
-    """Converts alert messages to a DataFrame for dashboard export."""
+    """
+    Converts alerts to a DataFrame for dashboard export. Alert tables keep
+    their typed columns and gain a rendered 'Tactical Alerts' column.
+    """
+    if isinstance(alerts_list, pd.DataFrame):
+        return alerts_list.assign(**{"Tactical Alerts": render_alert_messages(alerts_list)})
     return pd.DataFrame({"Tactical Alerts": alerts_list}) if alerts_list else pd.DataFrame()
@@ -8,27 +8,53 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from modules.persistence_engine import attach_persistence
+from modules.scoring_rules_engine import get_scoring_rules
 
 # ------------------------------------------------------------
 # Tactical Scoring (Existing Core Risk/Reward Model)
+# Weights, bands and labels come from the scoring rule tables;
+# the *_kernel functions score whole columns at once and the
+# row-level helpers below delegate to them.
 # ------------------------------------------------------------
-def compute_tactical_score(row):
-    score = 0
-    score += min(row.get("CompositeScore", 0), 50)
-    score += min(row.get("PriceChange5d", 0), 20)
+def _column_or(df, col, default):
+    if col not in df.columns:
+        return np.full(len(df), float(default))
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def tactical_score_kernel(df, rules=None):
+    rules = rules or get_scoring_rules()
+    w = rules.tables["tactical_weights"]
+
+    score = np.minimum(_column_or(df, "CompositeScore", 0), w["composite_cap"])
+    score = score + np.minimum(_column_or(df, "PriceChange5d", 0), w["momentum_cap"])
 
-    if str(row.get("Zacks Rank", "")).strip() == "1":
-        score += 15
+    if "Zacks Rank" in df.columns:
+        is_rank1 = (df["Zacks Rank"].astype(str).str.strip() == "1").to_numpy()
+        score = score + np.where(is_rank1, w["rank1_bonus"], 0)
 
-    volatility = row.get("Volatility30d", 20)
-    score -= min(volatility, 20) * 0.5
+    volatility = _column_or(df, "Volatility30d", w["volatility_default"])
+    score = score - np.minimum(volatility, w["volatility_cap"]) * w["volatility_weight"]
 
-    return max(0, min(score, 100))
+    # Missing inputs score the floor, as the original row model did
+    return np.nan_to_num(np.clip(score, w["min_score"], w["max_score"]), nan=w["min_score"])
+
+
+def compute_tactical_score(row):
+    return tactical_score_kernel(pd.DataFrame([row]))[0]
 
 
 # ------------------------------------------------------------
 # 📅 Rank Persistence Engine (NEW in Phase 6.1)
 # ------------------------------------------------------------
+def persistence_kernel(df):
+    if "PersistenceDays" not in df.columns:
+        return np.zeros(len(df), dtype=np.int64)
+    days = pd.to_numeric(df["PersistenceDays"], errors="coerce").fillna(0)
+    return np.trunc(days.to_numpy(dtype="float64")).astype(np.int64)
+
+
 def compute_persistence(row):
     days = row.get("PersistenceDays", 0)
     try:
@@ -38,21 +64,19 @@ def compute_persistence(row):
 
 
 def stability_class(days):
-    if days >= 10:
-        return "🛡 Durable"
-    elif days >= 5:
-        return "🌱 Emerging"
-    else:
-        return "⚠ Unstable"
+    return get_scoring_rules().score("stability_class", [days])[0]
+
+
+def trust_kernel(days, score, rules=None):
+    rules = rules or get_scoring_rules()
+    score = np.asarray(score, dtype="float64")
+    multiplier = rules.score("trust_multiplier", days)
+    cap = rules.tables["trust_multiplier"]["cap"]
+    return np.where(multiplier != 1.0, np.minimum(score * multiplier, cap), score)
 
 
 def trust_factor(days, score):
-    if days >= 10:
-        return min(score * 1.2, 100)
-    elif days >= 5:
-        return min(score * 1.1, 100)
-    else:
-        return score
+    return trust_kernel([days], [score])[0]
 
 
 # ------------------------------------------------------------
@@ -69,16 +93,7 @@ def compute_final_tactical_score(row):
 # Tactical Decision Tagging
 # ------------------------------------------------------------
 def tactical_tag(score):
-    if score >= 85:
-        return "🚀 Target Buy"
-    elif score >= 70:
-        return "📈 Accumulate"
-    elif score >= 55:
-        return "⚖ Hold"
-    elif score >= 40:
-        return "✂ Trim"
-    else:
-        return "⛔ Sell Candidate"
+    return get_scoring_rules().score("tactical_tag", [score])[0]
 
 
 # ------------------------------------------------------------
@@ -88,12 +103,19 @@ def apply_tactical_analysis(df):
     if df is None or df.empty:
         return df
 
-    df["PersistenceDays"] = df.apply(compute_persistence, axis=1)
-    df["StabilityClass"] = df["PersistenceDays"].apply(stability_class)
+    # Populate streaks from archived screens unless the caller supplied them
+    if "PersistenceDays" not in df.columns:
+        df = attach_persistence(df)
+
+    rules = get_scoring_rules()
+    days = persistence_kernel(df)
+
+    df["PersistenceDays"] = days
+    df["StabilityClass"] = rules.score("stability_class", days)
 
-    df["TacticalScore"] = df.apply(compute_tactical_score, axis=1)
-    df["FinalTacticalScore"] = df.apply(compute_final_tactical_score, axis=1)
-    df["TacticalTag"] = df["FinalTacticalScore"].apply(tactical_tag)
+    df["TacticalScore"] = tactical_score_kernel(df, rules)
+    df["FinalTacticalScore"] = np.round(trust_kernel(days, df["TacticalScore"], rules), 2)
+    df["TacticalTag"] = rules.score("tactical_tag", df["FinalTacticalScore"])
 
     df["LastUpdated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     return df
@@ -1,4 +1,6 @@
 import pandas as pd
+from modules.position_schema_engine import ensure_numeric
+from modules.scoring_rules_engine import get_scoring_rules
 
 # =========================================================
 # 🧠 Tactical Scoring Engine — v7.7R Stable Build
@@ -23,22 +25,17 @@ def calculate_tactical_scores(portfolio_df):
     df = portfolio_df.copy()
 
     # Ensure numeric
-    for col in ["Gain/Loss %", "Current Price", "Stop Price"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    ensure_numeric(df, ["Gain/Loss %", "Current Price", "Stop Price"])
+
+    # Thresholds, points and labels live in the scoring rule tables
+    rules = get_scoring_rules()
 
     # ===== 1) Score based on Gain/Loss % =====
-    df["GainScore"] = df["Gain/Loss %"].apply(lambda x: 40 if x > 25 else
-                                                     30 if x > 10 else
-                                                     20 if x > 0 else
-                                                     10)
+    df["GainScore"] = rules.score("gain_score", df[rules.column("gain_score")])
 
     # ===== 2) Zacks Tactical Score (if integrated) =====
-    if "Zacks Rank" in df.columns:
-        df["ZacksScore"] = df["Zacks Rank"].apply(lambda x: 35 if x == 1 else
-                                                            25 if x == 2 else
-                                                            15 if x == 3 else
-                                                             0)
+    if rules.column("zacks_score") in df.columns:
+        df["ZacksScore"] = rules.score("zacks_score", df[rules.column("zacks_score")])
     else:
         df["ZacksScore"] = 0
 
@@ -46,15 +43,13 @@ def calculate_tactical_scores(portfolio_df):
     if "Stop Price" in df.columns:
         df["RiskGap %"] = round(((df["Current Price"] - df["Stop Price"]) / df["Current Price"]) * 100, 2)
 
-        df["RiskScore"] = df["RiskGap %"].apply(lambda x: 25 if x >= 10 else
-                                                         15 if x >= 6 else
-                                                          5 if x > 0 else
-                                                          0)
+        df["RiskScore"] = rules.score("risk_score", df[rules.column("risk_score")])
     else:
         df["RiskScore"] = 5
+        df["Stop Price"] = float("nan")  # raw exports carry no stops
 
     # ===== 4) Momentum Score Placeholder =====
-    df["MomentumScore"] = 10  # Can be replaced later with real indicator
+    df["MomentumScore"] = rules.score("momentum_score", df.index)  # Can be replaced later with real indicator
 
     # ===== Final Weighted Calculation =====
     df["TacticalScore"] = round(
@@ -62,17 +57,7 @@ def calculate_tactical_scores(portfolio_df):
     )
 
     # ===== Tactical Priority Label =====
-    def map_priority(score):
-        if score >= 80:
-            return "STRONG BUY"
-        elif score >= 60:
-            return "ACCUMULATE/HOLD"
-        elif score >= 40:
-            return "CAUTION / HOLD"
-        else:
-            return "AT RISK / TRIM"
-
-    df["Tactical Priority"] = df["TacticalScore"].apply(map_priority)
+    df["Tactical Priority"] = rules.score("tactical_priority", df["TacticalScore"])
 
     return df[[
         "Ticker",
@@ -1,20 +1,41 @@
+import numpy as np
 import pandas as pd
 
 # =========================================================
 # Trailing Stop Manager — v7.7R Final Stable Build
 # Supports fixed and custom trailing stops
+# • Custom stops resolve per-ticker / per-sector / per-account
+#   override tables through one precedence lookup
+# • Stop Price and Protection Gap % are float columns
+# • Pass a stop_state_engine store to trail each position's
+#   persisted high-water mark instead of today's price
 # =========================================================
 
+DEFAULT_STOP_PCT = 5
 
-def apply_trailing_stop(df, trailing_stop_pct=5):
+# Most specific first — the first level with an entry for a row wins
+STOP_PRECEDENCE = ("ticker", "sector", "account")
+
+STOP_KEY_COLUMNS = {
+    "ticker": "Ticker",
+    "sector": "Sector",
+    "account": "Account Number",
+}
+
+
+def apply_trailing_stop(df, trailing_stop_pct=5, store=None):
     """
     Applies a universal trailing stop (percentage-based)
     Example:
         If Current Price = $100 and Stop = 5%
         Stop Price = $95
+    store: optional StopStateStore — the stop then trails the position's
+    high-water mark across runs and never moves down.
     """
     if df.empty or "Current Price" not in df.columns:
         return df
+    if store is not None:
+        return store.trail(df, trailing_stop_pct)
 
     df["Stop Price"] = (df["Current Price"] * (1 - trailing_stop_pct / 100)).round(2)
     df["Protection Gap %"] = (
@@ -24,6 +45,76 @@ def apply_trailing_stop(df, trailing_stop_pct=5):
     return df
 
 
+def _normalize_key(values: pd.Series, level: str) -> pd.Series:
+    keys = values.astype(str).str.strip()
+    return keys.str.upper() if level == "ticker" else keys
+
+
+def _round_cents(values: pd.Series) -> pd.Series:
+    """
+    round(x, 2) for a whole column. numpy's round scales by 100 first and
+    can land a cent away from Python's round on half-cent values, so only
+    those near-ties are re-rounded one by one.
+    """
+    x = values.to_numpy(dtype="float64")
+    out = np.round(x, 2)
+    with np.errstate(invalid="ignore"):
+        scaled = x * 100
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    out[near_tie] = [round(v, 2) for v in x[near_tie].tolist()]
+    return pd.Series(out, index=values.index)
+
+
+def resolve_stop_pcts(df, ticker_stops=None, sector_stops=None, account_stops=None,
+                      default_pct=DEFAULT_STOP_PCT, precedence=STOP_PRECEDENCE):
+    """
+    Trailing stop % per row. Each override table is mapped onto its key
+    column in one hash lookup; levels are layered from least to most
+    specific so the first level in `precedence` with an entry wins.
+    Tables whose key column is missing from df are ignored.
+    """
+    tables = {"ticker": ticker_stops, "sector": sector_stops, "account": account_stops}
+    pct = pd.Series(float(default_pct), index=df.index)
+
+    for level in reversed(precedence):
+        table = tables.get(level)
+        column = STOP_KEY_COLUMNS[level]
+        if not table or column not in df.columns:
+            continue
+        lookup = {str(k).strip().upper() if level == "ticker" else str(k).strip(): float(v) for k, v in table.items()}
+        keys = _normalize_key(df[column], level).where(df[column].notna())
+        pct = keys.map(lookup).fillna(pct)
+
+    return pct
+
+
+def apply_trailing_stops(df, default_pct=DEFAULT_STOP_PCT, ticker_stops=None, sector_stops=None,
+                         account_stops=None, precedence=STOP_PRECEDENCE, store=None):
+    """
+    Vectorized trailing stops with per-ticker, per-sector and per-account
+    overrides. Rows without a Ticker or Current Price get NaN stops.
+    store: optional StopStateStore — stops trail persisted high-water marks.
+    """
+    if df.empty or "Current Price" not in df.columns:
+        return df
+    if store is not None:
+        return store.trail(df, default_pct, ticker_stops, sector_stops, account_stops, precedence)
+
+    price = pd.to_numeric(df["Current Price"], errors="coerce").astype("float64")
+    pct = resolve_stop_pcts(df, ticker_stops, sector_stops, account_stops, default_pct, precedence)
+    valid = price.notna()
+    if "Ticker" in df.columns:
+        valid &= df["Ticker"].notna()
+
+    stop_price = _round_cents((price * (1 - pct / 100)).where(valid))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gap = _round_cents((price - stop_price) / price * 100)
+
+    df["Stop Price"] = stop_price
+    df["Protection Gap %"] = gap
+    return df
+
+
 def apply_custom_trailing_stops(df, stop_dict):
     """
     Apply custom trailing stops based on specific stock risk.
@@ -35,24 +126,4 @@ def apply_custom_trailing_stops(df, stop_dict):
         }
     Stocks not listed in stop_dict use 5% default.
     """
-    if df.empty:
-        return df
-
-    df["Stop Price"] = None
-    df["Protection Gap %"] = None
-
-    for idx, row in df.iterrows():
-        ticker = row.get("Ticker", None)
-        price = row.get("Current Price", None)
-
-        if pd.isna(ticker) or pd.isna(price):
-            continue
-
-        pct = stop_dict.get(ticker, 5)
-        stop_price = round(price * (1 - pct / 100), 2)
-        gap_pct = round(((price - stop_price) / price) * 100, 2)
-
-        df.loc[df["Ticker"] == ticker, "Stop Price"] = stop_price
-        df.loc[df["Ticker"] == ticker, "Protection Gap %"] = gap_pct
-
-    return df
+    return apply_trailing_stops(df, DEFAULT_STOP_PCT, ticker_stops=stop_dict)
@@ -0,0 +1,293 @@
+# =========================================================
+# 📉 Value-at-Risk Engine — v7.7R
+# Volatility / co-movement risk from archived position prices:
+# • Historical VaR / CVaR — replay of observed snapshot returns
+# • Parametric VaR / CVaR — variance-covariance (normal)
+# • Monte Carlo VaR / CVaR — Cholesky-correlated draws in fixed
+#   batches; only the running loss tail is kept, so memory stays
+#   bounded for 100k+ paths × thousands of positions
+# Reported per position, per account and for the portfolio.
+# Losses are positive dollar amounts.
+# =========================================================
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from modules.history_store_engine import get_history_store
+from modules.position_schema_engine import ensure_numeric
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_PATHS = 100_000
+MIN_OBSERVATIONS = 2
+BATCH_BUDGET = 4_000_000  # floats per simulated batch (~32 MB)
+
+ACCOUNT_COLUMN = "Account Number"
+
+
+# =========================================================
+# Inputs
+# =========================================================
+def returns_matrix(store=None, tickers=None, start=None, end=None, min_observations: int = MIN_OBSERVATIONS):
+    """
+    Snapshot-over-snapshot simple returns (date × ticker) from the history
+    store price panel. Tickers with fewer than min_observations returns are
+    dropped; remaining gaps are treated as zero return.
+    """
+    store = store or get_history_store()
+    prices = store.panel("price", tickers=tickers, start=start, end=end)
+    if prices.empty or len(prices) < 2:
+        return pd.DataFrame()
+    returns = prices.pct_change(fill_method=None).iloc[1:]
+    returns = returns.loc[:, returns.notna().sum() >= min_observations]
+    return returns.fillna(0.0)
+
+
+def _exposures(portfolio_df, returns, account_col):
+    """Positions aligned to return columns; tickers without history get no exposure."""
+    df = portfolio_df.copy()
+    if "Is Cash" in df.columns:
+        df = df[~df["Is Cash"].astype(bool)]
+    ensure_numeric(df, ["Current Value"])
+    df = df.reset_index(drop=True)
+    if account_col not in df.columns:
+        df[account_col] = "ALL"
+
+    tickers = df["Ticker"].astype(str).str.strip().str.upper()
+    col_idx = pd.Index(returns.columns).get_indexer(tickers)
+    values = df["Current Value"].fillna(0.0).to_numpy(dtype="float64")
+    covered = col_idx >= 0
+
+    positions = pd.DataFrame({
+        account_col: df[account_col].astype(str).to_numpy(),
+        "Ticker": tickers.to_numpy(),
+        "Current Value": values,
+        "Has History": covered,
+    })
+    accounts, acct_idx = np.unique(positions[account_col].to_numpy(), return_inverse=True)
+    return positions, col_idx, values * covered, accounts, acct_idx
+
+
+def factor_loadings(returns: np.ndarray, cov: np.ndarray) -> np.ndarray:
+    """
+    Matrix F with F.T @ F == cov, so standard normal draws @ F are correlated
+    scenarios. Uses the Cholesky factor, or — when there are fewer observations
+    than tickers — the scaled demeaned returns, which reproduce the same
+    (rank-deficient) covariance at a fraction of the cost.
+    """
+    T, n = returns.shape
+    if 1 < T <= n:
+        return (returns - returns.mean(axis=0)) / math.sqrt(T - 1)
+    return _safe_cholesky(cov).T
+
+
+def _safe_cholesky(cov):
+    """Cholesky factor, clipping negative eigenvalues when cov is not positive definite."""
+    try:
+        return np.linalg.cholesky(cov + np.eye(len(cov)) * 1e-12)
+    except np.linalg.LinAlgError:
+        vals, vecs = np.linalg.eigh(cov)
+        fixed = (vecs * np.clip(vals, 1e-12, None)) @ vecs.T
+        return np.linalg.cholesky(fixed)
+
+
+# =========================================================
+# Tail Statistics
+# =========================================================
+def _tail_size(paths: int, confidence: float) -> int:
+    # Rounded first: 1 - 0.95 is 0.05000000000000004, which would ceil one path too deep
+    return max(1, int(math.ceil(round(paths * (1 - confidence), 9))))
+
+
+def tail_var_cvar(pnl: np.ndarray, confidence: float = DEFAULT_CONFIDENCE):
+    """
+    VaR / CVaR per column of a (paths × columns) P&L matrix: VaR is the
+    k-th worst loss, CVaR the mean of the k worst, k = ceil(paths × (1 − c)).
+    """
+    k = _tail_size(pnl.shape[0], confidence)
+    worst = np.partition(pnl, k - 1, axis=0)[:k]
+    return -worst.max(axis=0), -worst.mean(axis=0)
+
+
+class TailAccumulator:
+    """Keeps the k smallest P&L values per column across streamed batches."""
+
+    def __init__(self, k: int, columns: int, dtype=np.float64):
+        self.k = k
+        self.tail = np.empty((0, columns), dtype=dtype)
+
+    def add(self, batch: np.ndarray):
+        merged = np.vstack([self.tail, batch.astype(self.tail.dtype, copy=False)])
+        if len(merged) > self.k:
+            merged = np.partition(merged, self.k - 1, axis=0)[: self.k]
+        self.tail = merged
+
+    def result(self):
+        tail = self.tail.astype(np.float64, copy=False)
+        return -tail.max(axis=0), -tail.mean(axis=0)
+
+
+# =========================================================
+# VaR Methods
+# =========================================================
+def _position_measures(long_tail, short_tail, values):
+    """
+    Per-position (VaR, CVaR) from per-ticker return tails: long positions
+    lose on the lower tail, short (negative value) positions on the upper.
+    """
+    var = np.where(values >= 0, long_tail[0], short_tail[0]) * np.abs(values)
+    cvar = np.where(values >= 0, long_tail[1], short_tail[1]) * np.abs(values)
+    return var, cvar
+
+
+def historical_var(returns: np.ndarray, weights: np.ndarray, confidence: float, horizon: int = 1):
+    """(VaR, CVaR) per column of weights (tickers × books) from observed returns."""
+    pnl = returns @ weights * math.sqrt(horizon)
+    return tail_var_cvar(pnl, confidence)
+
+
+def parametric_var(mu: np.ndarray, cov: np.ndarray, weights: np.ndarray, confidence: float, horizon: int = 1):
+    """Normal variance-covariance (VaR, CVaR) per column of weights."""
+    z = NormalDist().inv_cdf(confidence)
+    mean = (mu @ weights) * horizon
+    sigma = np.sqrt(np.einsum("ij,ik,kj->j", weights, cov, weights).clip(min=0)) * math.sqrt(horizon)
+    var = z * sigma - mean
+    cvar = sigma * NormalDist().pdf(z) / (1 - confidence) - mean
+    return var, cvar
+
+
+def _ticker_parametric(mu, cov, confidence, horizon, side):
+    """Per-ticker return (VaR, CVaR) — side=1 for longs, -1 for shorts."""
+    z = NormalDist().inv_cdf(confidence)
+    sigma = np.sqrt(np.diag(cov).clip(min=0)) * math.sqrt(horizon)
+    mean = side * mu * horizon
+    return z * sigma - mean, sigma * NormalDist().pdf(z) / (1 - confidence) - mean
+
+
+def monte_carlo_var(mu, cov, weights, confidence=DEFAULT_CONFIDENCE, paths=DEFAULT_PATHS, horizon=1,
+                    batch_size=None, seed=None, ticker_tails=True, short_tails=False, loadings=None):
+    """
+    Streams `paths` correlated normal return scenarios in fixed-size batches
+    (draws @ loadings, Cholesky by default).
+    Only the running k-worst tail per book (and per ticker when
+    ticker_tails) is retained between batches.
+
+    Returns {"books": (var, cvar) per column of weights,
+             "long": per-ticker return (var, cvar) | None,
+             "short": per-ticker upper-tail (var, cvar) | None}.
+    """
+    n = len(mu)
+    if loadings is None:
+        loadings = _safe_cholesky(cov).T
+    rng = np.random.default_rng(seed)
+    k = _tail_size(paths, confidence)
+    batch_size = batch_size or max(256, min(paths, BATCH_BUDGET // max(n, 1)))
+    scale = math.sqrt(horizon)
+
+    books = TailAccumulator(k, weights.shape[1])
+    long_tail = TailAccumulator(k, n, dtype=np.float32) if ticker_tails else None
+    short_tail = TailAccumulator(k, n, dtype=np.float32) if ticker_tails and short_tails else None
+
+    done = 0
+    while done < paths:
+        size = min(batch_size, paths - done)
+        draws = rng.standard_normal((size, loadings.shape[0])) @ loadings
+        draws *= scale
+        draws += mu * horizon
+        books.add(draws @ weights)
+        if long_tail is not None:
+            long_tail.add(draws)
+        if short_tail is not None:
+            short_tail.add(-draws)
+        done += size
+
+    return {
+        "books": books.result(),
+        "long": long_tail.result() if long_tail is not None else None,
+        "short": short_tail.result() if short_tail is not None else None,
+    }
+
+
+# =========================================================
+# Portfolio Report
+# =========================================================
+def compute_var_report(portfolio_df: pd.DataFrame, returns: pd.DataFrame = None, store=None,
+                       confidence: float = DEFAULT_CONFIDENCE, horizon: int = 1,
+                       paths: int = DEFAULT_PATHS, batch_size: int = None, seed: int = None,
+                       methods=("historical", "parametric", "monte_carlo"),
+                       account_col: str = ACCOUNT_COLUMN) -> dict:
+    """
+    VaR / CVaR at `confidence` over `horizon` snapshots.
+
+    Returns dict:
+        positions — one row per position: account, ticker, value, Has History,
+                    <Method> VaR / <Method> CVaR
+        accounts  — one row per account with the same measures
+        portfolio — Series of measures for the whole book
+        tickers   — number of tickers with usable history
+    """
+    if returns is None:
+        returns = returns_matrix(store)
+    if portfolio_df is None or portfolio_df.empty or returns.empty:
+        return {"positions": pd.DataFrame(), "accounts": pd.DataFrame(), "portfolio": pd.Series(dtype=float), "tickers": 0}
+
+    positions, col_idx, values, accounts, acct_idx = _exposures(portfolio_df, returns, account_col)
+    cols = np.where(col_idx >= 0, col_idx, 0)
+    R = returns.to_numpy(dtype="float64")
+    n, A = R.shape[1], len(accounts)
+    shorts = bool((values < 0).any())
+
+    # Ticker × book weights: one column per account, then the whole portfolio
+    W = np.zeros((n, A + 1))
+    np.add.at(W, (cols, acct_idx), values)
+    W[:, A] = W[:, :A].sum(axis=1)
+
+    account_frame = pd.DataFrame({account_col: accounts})
+    account_frame["Current Value"] = np.bincount(acct_idx, weights=positions["Current Value"], minlength=A)
+    portfolio = {"Current Value": positions["Current Value"].sum()}
+
+    def record(label, ticker_long, ticker_short, books):
+        ticker_short = ticker_short if ticker_short is not None else ticker_long
+        pos_var, pos_cvar = _position_measures(
+            (ticker_long[0][cols], ticker_long[1][cols]),
+            (ticker_short[0][cols], ticker_short[1][cols]),
+            values,
+        )
+        positions[f"{label} VaR"], positions[f"{label} CVaR"] = np.round(pos_var, 2), np.round(pos_cvar, 2)
+        account_frame[f"{label} VaR"] = np.round(books[0][:A], 2)
+        account_frame[f"{label} CVaR"] = np.round(books[1][:A], 2)
+        portfolio[f"{label} VaR"], portfolio[f"{label} CVaR"] = round(float(books[0][A]), 2), round(float(books[1][A]), 2)
+
+    if "historical" in methods:
+        scaled = R * math.sqrt(horizon)
+        record(
+            "Historical",
+            tail_var_cvar(scaled, confidence),
+            tail_var_cvar(-scaled, confidence) if shorts else None,
+            historical_var(R, W, confidence, horizon),
+        )
+
+    mu = R.mean(axis=0)
+    cov = np.cov(R, rowvar=False, ddof=1).reshape(n, n) if len(R) > 1 else np.zeros((n, n))
+
+    if "parametric" in methods:
+        record(
+            "Parametric",
+            _ticker_parametric(mu, cov, confidence, horizon, 1.0),
+            _ticker_parametric(mu, cov, confidence, horizon, -1.0) if shorts else None,
+            parametric_var(mu, cov, W, confidence, horizon),
+        )
+
+    if "monte_carlo" in methods:
+        mc = monte_carlo_var(mu, cov, W, confidence, paths, horizon, batch_size, seed,
+                             short_tails=shorts, loadings=factor_loadings(R, cov))
+        record("Monte Carlo", mc["long"], mc["short"], mc["books"])
+
+    return {
+        "positions": positions,
+        "accounts": account_frame,
+        "portfolio": pd.Series(portfolio),
+        "tickers": int((W[:, A] != 0).sum()),
+    }
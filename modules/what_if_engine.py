@@ -0,0 +1,128 @@
+# =========================================================
+# 🧪 What-If Threshold Engine — v7.7R
+# Evaluates a whole grid of stop-loss × trim thresholds (and
+# trailing-stop percentages) in one broadcast NumPy pass,
+# instead of calling apply_stop_logic once per combination.
+# Decisions match risk_and_reporting_engine.apply_stop_logic.
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+from modules.position_schema_engine import ensure_numeric
+
+DEFAULT_STOP_GRID = [-5.0, -10.0, -15.0, -20.0, -25.0]
+DEFAULT_TRIM_GRID = [10.0, 20.0, 30.0, 40.0, 50.0]
+DEFAULT_TRAILING_GRID = [3.0, 5.0, 7.5, 10.0, 15.0]
+
+HOLD, STOP, TRIM = 0, 1, 2
+DECISION_LABELS = np.array(["Hold", "Sell - Stop Loss Trigger", "Trim - Secure Profits"], dtype=object)
+
+
+class WhatIfResult:
+    """
+    Result cube for a stop × trim grid.
+        decisions[s, t, n] — HOLD / STOP / TRIM code per grid point and position
+        stop_counts / trim_counts — positions triggered per grid point
+        stop_notional / trim_notional — Current Value affected per grid point
+    """
+
+    def __init__(self, stops, trims, tickers, decisions, values):
+        self.stops = np.asarray(stops, dtype="float64")
+        self.trims = np.asarray(trims, dtype="float64")
+        self.tickers = tickers
+        self.decisions = decisions
+
+        is_stop = decisions == STOP
+        is_trim = decisions == TRIM
+        self.stop_counts = self._grid(is_stop.sum(axis=2))
+        self.trim_counts = self._grid(is_trim.sum(axis=2))
+        self.stop_notional = self._grid(is_stop @ values)
+        self.trim_notional = self._grid(is_trim @ values)
+
+    def _grid(self, matrix):
+        return pd.DataFrame(
+            matrix,
+            index=pd.Index(self.stops, name="Stop Loss %"),
+            columns=pd.Index(self.trims, name="Trim Gain %"),
+        )
+
+    def summary(self) -> pd.DataFrame:
+        """One row per grid point: counts and notional for stops and trims."""
+        out = pd.DataFrame({
+            "Stops Triggered": self.stop_counts.stack(),
+            "Stop Notional": self.stop_notional.stack(),
+            "Trims Triggered": self.trim_counts.stack(),
+            "Trim Notional": self.trim_notional.stack(),
+        })
+        out["Capital Moved"] = out["Stop Notional"] + out["Trim Notional"]
+        return out.reset_index()
+
+    def decisions_at(self, stop_loss_pct: float, trim_gain_pct: float) -> pd.DataFrame:
+        """Per-ticker Stop Recommendation for one grid point."""
+        s = int(np.argmin(np.abs(self.stops - stop_loss_pct)))
+        t = int(np.argmin(np.abs(self.trims - trim_gain_pct)))
+        return pd.DataFrame({
+            "Ticker": self.tickers,
+            "Stop Recommendation": DECISION_LABELS[self.decisions[s, t]],
+        })
+
+
+def evaluate_stop_grid(df: pd.DataFrame, stop_grid=None, trim_grid=None) -> WhatIfResult:
+    """
+    Broadcasts apply_stop_logic over every (stop_loss_pct, trim_gain_pct)
+    pair. Memory is stops × trims × positions bytes for the decision cube.
+    """
+    stops = np.asarray(stop_grid if stop_grid is not None else DEFAULT_STOP_GRID, dtype="float64")
+    trims = np.asarray(trim_grid if trim_grid is not None else DEFAULT_TRIM_GRID, dtype="float64")
+
+    frame = df.copy()
+    ensure_numeric(frame, ["Gain/Loss %", "Current Value"])
+    gain = frame["Gain/Loss %"].to_numpy(dtype="float64", na_value=np.nan) if "Gain/Loss %" in frame else np.full(len(frame), np.nan)
+    values = frame["Current Value"].fillna(0).to_numpy(dtype="float64") if "Current Value" in frame else np.zeros(len(frame))
+    not_sell = (frame["Action"] != "Sell").to_numpy() if "Action" in frame else np.ones(len(frame), dtype=bool)
+    has_gain = ~np.isnan(gain)
+
+    with np.errstate(invalid="ignore"):
+        stop_hit = has_gain & (gain[None, :] <= stops[:, None])                # (S, N)
+        trim_hit = has_gain & (gain[None, :] >= trims[:, None]) & not_sell     # (T, N)
+
+    decisions = np.where(stop_hit[:, None, :], STOP, HOLD).astype(np.int8)    # (S, 1→T, N)
+    decisions = np.broadcast_to(decisions, (len(stops), len(trims), len(frame))).copy()
+    decisions[np.broadcast_to(trim_hit[None, :, :], decisions.shape)] = TRIM   # trim overrides, as in apply_stop_logic
+
+    tickers = frame["Ticker"].to_numpy() if "Ticker" in frame else np.arange(len(frame))
+    return WhatIfResult(stops, trims, tickers, decisions, values)
+
+
+def evaluate_trailing_grid(df: pd.DataFrame, trailing_grid=None, reference_col: str = None) -> dict:
+    """
+    Stop prices and breaches for every trailing-stop percentage at once.
+    reference_col is the price the stop trails (defaults to 'High Water Mark'
+    when present, else 'Current Price' — which, like apply_trailing_stop,
+    can never breach).
+
+    Returns {"stop_prices": DataFrame (ticker × pct), "breach_counts": Series,
+             "breach_notional": Series}.
+    """
+    pcts = np.asarray(trailing_grid if trailing_grid is not None else DEFAULT_TRAILING_GRID, dtype="float64")
+    if reference_col is None:
+        reference_col = "High Water Mark" if "High Water Mark" in df.columns else "Current Price"
+
+    frame = df.copy()
+    ensure_numeric(frame, ["Current Price", "Current Value", reference_col])
+    price = frame["Current Price"].to_numpy(dtype="float64", na_value=np.nan)
+    reference = frame[reference_col].to_numpy(dtype="float64", na_value=np.nan)
+    values = frame["Current Value"].fillna(0).to_numpy(dtype="float64") if "Current Value" in frame else np.zeros(len(frame))
+
+    stop_prices = np.round(reference[:, None] * (1 - pcts[None, :] / 100), 2)   # (N, P)
+    with np.errstate(invalid="ignore"):
+        breached = price[:, None] <= stop_prices
+
+    index = pd.Index(pcts, name="Trailing Stop %")
+    tickers = frame["Ticker"] if "Ticker" in frame else pd.RangeIndex(len(frame))
+    return {
+        "stop_prices": pd.DataFrame(stop_prices, index=pd.Index(tickers), columns=index),
+        "breach_counts": pd.Series(breached.sum(axis=0), index=index, name="Breaches"),
+        "breach_notional": pd.Series(values @ breached, index=index, name="Breach Notional"),
+    }
@@ -3,22 +3,16 @@ Zacks Screening Engine — v7.7R-Patch2
 Handles loading and parsing of Zacks Growth / Defensive screens.
 """
 
-import os
 import pandas as pd
+from modules.crossmatch_engine import crossmatch
+from modules.zacks_screen_registry import discover_screens, load_all_screens
 
 DATA_PATH = "data"
 
 def load_zacks_screens():
-    """Load all Zacks screen files (Growth1, Growth2, Defensive)."""
-    screens = {}
+    """Load the latest file for every registered Zacks screen."""
     try:
-        for file in os.listdir(DATA_PATH):
-            if "Growth 1" in file:
-                screens["Growth 1"] = pd.read_csv(os.path.join(DATA_PATH, file))
-            elif "Growth 2" in file:
-                screens["Growth 2"] = pd.read_csv(os.path.join(DATA_PATH, file))
-            elif "Defensive" in file:
-                screens["Defensive Dividends"] = pd.read_csv(os.path.join(DATA_PATH, file))
+        screens, _ = load_all_screens(discover_screens(DATA_PATH))
     except Exception:
         return {}
 
@@ -37,18 +31,20 @@ def merge_with_portfolio(portfolio_df, screens: dict):
     """
     Merge screening results with portfolio data.
     Key: Ticker symbol.
+    Adds one 'Zacks Rank_<Screen>' column per screen plus 'Zacks Rank'
+    (best rank across screens) and 'Screen Count'.
     """
     if not screens:
         return portfolio_df  # No data to merge
 
-    for name, df in screens.items():
-        if "Ticker" in df.columns:
-            df["Ticker"] = df["Ticker"].str.upper()
-            portfolio_df = portfolio_df.merge(
-                df[["Ticker", "Zacks Rank"]],
-                on="Ticker",
-                how="left",
-                suffixes=("", f"_{name.replace(' ', '_')}")
-            )
-
-    return portfolio_df
+    _, wide = crossmatch(portfolio_df, screens)
+    if wide.empty or "Best Rank" not in wide.columns:
+        return portfolio_df
+
+    rank_cols = [c for c in wide.columns if c not in ("Ticker", "Screen Count", "Best Rank")]
+    merged = portfolio_df.copy()
+    for col in rank_cols:
+        merged[f"Zacks Rank_{col.replace(' ', '_')}"] = wide[col]
+    merged["Zacks Rank"] = wide["Best Rank"]
+    merged["Screen Count"] = wide["Screen Count"]
+    return merged
@@ -0,0 +1,137 @@
+# =========================================================
+# 📋 Zacks Screen Registry & Concurrent Loader — v7.7R
+# • Screens are declared once by name pattern (register_screen)
+# • Latest file for every screen resolved through the data manifest
+# • All screens read + normalised together on a thread pool and
+#   yielded as each finishes; one bad file never aborts the rest
+# =========================================================
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from modules.csv_cache_engine import cached_read_csv
+from modules.data_manifest_engine import DATA_PATH, get_manifest
+
+# Screen name → {"name", "pattern"} in declaration order
+SCREEN_REGISTRY = {}
+
+NON_SCREEN_CATEGORIES = {"Portfolio"}
+
+
+def register_screen(name: str, pattern: str = None):
+    """
+    Declares a Zacks screen. `pattern` is a case-insensitive regex matched
+    against manifest categories and uploaded filenames; it defaults to the
+    screen name with flexible spacing ('Growth 1' also matches 'Growth1').
+    """
+    if pattern is None:
+        pattern = r"\s*".join(re.escape(part) for part in name.split())
+    SCREEN_REGISTRY[name] = {"name": name, "pattern": re.compile(pattern, re.IGNORECASE)}
+    return SCREEN_REGISTRY[name]
+
+
+def unregister_screen(name: str):
+    SCREEN_REGISTRY.pop(name, None)
+
+
+def registered_screens():
+    return list(SCREEN_REGISTRY)
+
+
+def match_screen(label: str):
+    """Returns the registered screen name matching a category or filename, else None."""
+    for name, spec in SCREEN_REGISTRY.items():
+        if spec["pattern"].search(str(label)):
+            return name
+    return None
+
+
+register_screen("Growth 1")
+register_screen("Growth 2")
+register_screen("Defensive Dividends", r"defensive")
+
+
+# =========================================================
+# Discovery
+# =========================================================
+def discover_screens(data_path: str = DATA_PATH, include_unregistered: bool = True):
+    """
+    Maps every screen present in the data manifest to its latest file.
+    Unregistered screen categories are included under their own name
+    unless include_unregistered is False.
+    Returns {screen_name: path}.
+    """
+    manifest = get_manifest(data_path)
+    found = {}
+    for category in manifest.categories():
+        if category in NON_SCREEN_CATEGORIES:
+            continue
+        name = match_screen(category)
+        if name is None:
+            if not include_unregistered:
+                continue
+            name = category
+        if name not in found:
+            found[name] = manifest.latest(category)
+
+    # Registered screens first, in declaration order
+    order = {name: i for i, name in enumerate(SCREEN_REGISTRY)}
+    return {name: found[name] for name in sorted(found, key=lambda n: (order.get(n, len(order)), n))}
+
+
+# =========================================================
+# Concurrent Loading
+# =========================================================
+def _default_loader(source, screen_name):
+    return cached_read_csv(source)
+
+
+def iter_screen_loads(sources: dict, loader=None, max_workers: int = None):
+    """
+    Loads every screen concurrently and yields (screen_name, df, error)
+    in completion order. Exactly one of df / error is None per result.
+
+    Parameters:
+        sources: {screen_name: path or uploaded file}
+        loader: Callable(source, screen_name) → DataFrame
+        max_workers: Thread pool size (defaults to one per screen, max 16)
+    """
+    if loader is None:
+        loader = _default_loader
+
+    pending = {name: src for name, src in sources.items() if src is not None}
+    if not pending:
+        return
+
+    workers = max_workers or min(16, len(pending), (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(loader, src, name): name for name, src in pending.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                yield name, future.result(), None
+            except Exception as e:
+                yield name, None, e
+
+
+def load_all_screens(sources: dict = None, loader=None, max_workers: int = None, verbose: bool = True):
+    """
+    Loads all screens (discovered from the manifest when sources is None).
+    Returns (screens, errors): {name: DataFrame}, {name: Exception}.
+    """
+    if sources is None:
+        sources = discover_screens()
+
+    screens, errors = {}, {}
+    for name, df, error in iter_screen_loads(sources, loader, max_workers):
+        if error is not None:
+            errors[name] = error
+            if verbose:
+                print(f"⚠ Error loading {name} screen: {error}")
+        else:
+            screens[name] = df
+
+    # Completion order is nondeterministic — return in declaration order
+    ordered = {name: screens[name] for name in sources if name in screens}
+    return ordered, errors
@@ -1,4 +1,6 @@
 import pandas as pd
+from modules.csv_cache_engine import cached_frame
+from modules.zacks_screen_registry import iter_screen_loads
 
 # =========================================================
 # 📁 Zacks Unified Analyzer — v7.7R Final Stable Build
@@ -14,25 +16,30 @@ def load_zacks_file(file_path, screen_source):
     Ticker, Zacks Rank, Name, Industry, Market Cap, PE, PEG, Price
     """
     try:
-        df = pd.read_csv(file_path)
-        df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+        df = cached_frame(file_path, _parse_zacks_file, tag="zacks_unified")
         df["screen_source"] = screen_source
-
-        required = [
-            "ticker", "zacks_rank", "name", "industry",
-            "market_cap", "pe", "peg", "price"
-        ]
-        for col in required:
-            if col not in df.columns:
-                df[col] = None
-
-        return df[required + ["screen_source"]]
+        return df
 
     except Exception as e:
         print(f"Error loading Zacks file ({screen_source}): {e}")
         return pd.DataFrame()
 
 
+def _parse_zacks_file(file_path):
+    df = pd.read_csv(file_path)
+    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+
+    required = [
+        "ticker", "zacks_rank", "name", "industry",
+        "market_cap", "pe", "peg", "price"
+    ]
+    for col in required:
+        if col not in df.columns:
+            df[col] = None
+
+    return df[required]
+
+
 def merge_zacks_screens(files_dict):
     """
     Accepts dict of uploaded files:
@@ -43,13 +50,13 @@ def merge_zacks_screens(files_dict):
     }
     Returns unified DataFrame.
     """
-    merged_frames = []
+    loaded = {}
 
-    for screen_name, file_path in files_dict.items():
-        if file_path:
-            df = load_zacks_file(file_path, screen_name)
-            if not df.empty:
-                merged_frames.append(df)
+    # Screens load concurrently; frames are re-ordered to match files_dict
+    for screen_name, df, error in iter_screen_loads(files_dict, loader=load_zacks_file):
+        if df is not None and not df.empty:
+            loaded[screen_name] = df
+    merged_frames = [loaded[name] for name in files_dict if name in loaded]
 
     if not merged_frames:
         print("No Zacks files loaded.")
@@ -4,8 +4,10 @@
 import streamlit as st
 import pandas as pd
 from modules.portfolio_engine import load_portfolio_data, calculate_portfolio_summary
-from modules.zacks_unified_analyzer import load_zacks_files, merge_zacks_screens
+from modules.zacks_unified_analyzer import merge_zacks_screens
+from modules.zacks_screen_registry import match_screen
 from modules.trailing_stop_manager import apply_trailing_stops
+from modules.stop_state_engine import get_stop_state
 from modules.tactical_scoring_engine import generate_tactical_scores
 from modules.intelligence_brief import build_intelligence_brief
 from modules.risk_heatmap_engine import generate_risk_heatmap
@@ -26,9 +28,7 @@ st.caption("Portfolio ║ Risk ║ Tactical Alerts ║ Intel Brief ║ Exec Repo
 st.sidebar.header("📂 Data Inputs")
 
 portfolio_file = st.sidebar.file_uploader("Portfolio CSV", type=['csv'])
-growth1_file = st.sidebar.file_uploader("Growth 1 CSV", type=['csv'])
-growth2_file = st.sidebar.file_uploader("Growth 2 CSV", type=['csv'])
-defdiv_file = st.sidebar.file_uploader("Defensive Dividends CSV", type=['csv'])
+screen_files = st.sidebar.file_uploader("Zacks Screen CSVs", type=['csv'], accept_multiple_files=True)
 
 manual_cash = st.sidebar.number_input("Manual Cash Override ($)", min_value=0.0, value=0.0)
 default_stop = st.sidebar.slider("Default Trailing Stop (%)", 1, 25, 15)
@@ -41,8 +41,8 @@ if portfolio_file:
     portfolio_df = load_portfolio_data(portfolio_file)
 
     if portfolio_df is not None:
-        # Apply trailing stops
-        portfolio_df = apply_trailing_stops(portfolio_df, default_stop)
+        # Apply trailing stops — ratcheted from each position's stored high-water mark
+        portfolio_df = apply_trailing_stops(portfolio_df, default_stop, store=get_stop_state())
 
         # Tactical scoring
         portfolio_df = generate_tactical_scores(portfolio_df)
@@ -67,12 +67,13 @@ st.subheader("🎯 Zacks Unified Candidates")
 
 zacks_df = None
 
-if growth1_file or growth2_file or defdiv_file:
-    zacks_df = load_zacks_files(growth1_file, growth2_file, defdiv_file)
+if screen_files:
+    # Registered screens keep their canonical name; any other upload is its own screen
+    screen_sources = {(match_screen(f.name) or f.name): f for f in screen_files}
+    zacks_df = merge_zacks_screens(screen_sources)
 
-    if zacks_df is not None:
-        merged_df = merge_zacks_screens(portfolio_df, zacks_df)
-        st.dataframe(merged_df)
+    if zacks_df is not None and not zacks_df.empty:
+        st.dataframe(zacks_df)
     else:
         st.warning("Zacks screening data could not be processed.")
 else:
@@ -121,8 +122,11 @@ st.subheader("🗂 Report Archive")
 
 if st.button("Archive Latest Report"):
     if portfolio_df is not None:
-        archive_report(pdf_bytes)
-        st.success("Report archived successfully!")
+        report_id = archive_report(pdf_bytes)
+        if isinstance(report_id, int):
+            st.success(f"Report archived successfully! (archive id {report_id})")
+        else:
+            st.error(report_id)
     else:
         st.error("Portfolio data required.")
 
@@ -0,0 +1,33 @@
+import glob
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+DATA_DIR = os.path.join(ROOT, "data")
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Runs the test from an empty directory so cache/ and archive/ writes stay out of the repo."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def positions_export():
+    """Path of the real Fidelity positions export shipped in data/."""
+    paths = sorted(glob.glob(os.path.join(DATA_DIR, "Portfolio_Positions_*.csv")))
+    if not paths:
+        pytest.skip("no Fidelity positions export in data/")
+    return paths[-1]
+
+
+@pytest.fixture
+def positions(positions_export):
+    from modules.position_schema_engine import read_positions_csv
+    return read_positions_csv(positions_export)
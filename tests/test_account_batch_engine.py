@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from modules.account_batch_engine import run_account_batch
+from modules.tactical_scoring_engine import calculate_tactical_scores
+
+
+def test_scores_export_without_stop_price(positions):
+    assert "Stop Price" not in positions.columns
+    scores = calculate_tactical_scores(positions)
+
+    assert scores["Stop Price"].isna().all()
+    assert (scores["RiskScore"] == 5).all()
+
+
+@pytest.mark.parametrize("default_stop_pct", [None, 10.0])
+def test_batch_runs_on_real_export(positions, default_stop_pct):
+    batch = run_account_batch(positions, default_stop_pct=default_stop_pct)
+
+    assert len(batch["positions"]) == len(positions)
+    assert batch["household"]["positions"] == len(positions)
+    assert np.isclose(batch["household"]["total_value"], positions["Current Value"].sum())
+    assert batch["accounts"]["Household Weight %"].sum() == pytest.approx(100, abs=0.05)
+    if default_stop_pct is not None:
+        held = batch["positions"]["Current Price"].notna()
+        assert batch["positions"].loc[held, "Stop Price"].notna().all()
@@ -0,0 +1,92 @@
+import threading
+
+import pandas as pd
+
+from modules.alert_state_engine import AlertStateStore
+from modules.tactical_alerts import build_alert_table
+
+
+def _book(price_by_ticker):
+    # quiet filler positions keep every weight under the concentration limit
+    price_by_ticker = {**price_by_ticker, **{f"F{i}": 150.0 for i in range(8)}}
+    return pd.DataFrame({
+        "Account Number": "A1",
+        "Ticker": list(price_by_ticker),
+        "Current Price": list(price_by_ticker.values()),
+        "Stop Price": 100.0,
+        "Gain/Loss %": 0.0,
+        "Current Value": 1000.0,
+    })
+
+
+def _statuses(changes):
+    return dict(zip(changes["Ticker"] + "/" + changes["Rule"].astype(str), changes["Status"].astype(str)))
+
+
+def test_reports_only_changes(workdir):
+    store = AlertStateStore(str(workdir / "alerts.db"))
+
+    first = store.reconcile(build_alert_table(_book({"AAA": 90.0, "BBB": 150.0})), when="2025-11-25 10:00")
+    assert _statuses(first) == {"AAA/STOP_BREACH": "NEW", "AAA/NEAR_STOP": "NEW"}
+
+    again = store.reconcile(build_alert_table(_book({"AAA": 91.0, "BBB": 150.0})), when="2025-11-25 10:05")
+    assert again.empty
+
+    cleared = store.reconcile(build_alert_table(_book({"AAA": 120.0, "BBB": 150.0})), when="2025-11-25 10:10")
+    assert set(_statuses(cleared).values()) == {"RESOLVED"}
+
+
+def test_writes_from_other_threads_persist(workdir, capsys):
+    path = str(workdir / "alerts.db")
+    store = AlertStateStore(path)  # created on this thread
+    tickers = [f"T{i:02d}" for i in range(16)]
+
+    def worker(ticker):
+        store.reconcile(build_alert_table(_book({ticker: 90.0})), full=False)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in tickers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert "Alert state write failed" not in capsys.readouterr().out
+    reloaded = AlertStateStore(path)
+    assert {t for _, t, _ in reloaded.state if t.startswith("T")} == set(tickers)
+    assert all(reloaded.get("A1", t, "STOP_BREACH")["active"] for t in tickers)
+
+
+def _events(rows, when):
+    return pd.DataFrame({
+        "Timestamp": pd.Timestamp(when),
+        "Account": "A1",
+        "Ticker": [t for t, _, _ in rows],
+        "Rule": [r for _, r, _ in rows],
+        "Severity": "HIGH",
+        "Status": [s for _, _, s in rows],
+        "Metric": 90.0,
+        "Reference": 100.0,
+        "Threshold": 0.0,
+        "Scope": None,
+    })
+
+
+def test_stream_events_with_unknown_resolutions_still_persist(workdir, capsys):
+    path = str(workdir / "alerts.db")
+    store = AlertStateStore(path)
+    store.record_events(_events([("AAA", "STOP_BREACH", "TRIGGERED"), ("BBB", "STOP_BREACH", "TRIGGERED")],
+                                "2025-11-25 10:00"))
+
+    changes = store.record_events(_events([
+        ("CCC", "STOP_BREACH", "TRIGGERED"),
+        ("BBB", "STOP_BREACH", "RESOLVED"),
+        ("ZZZ", "STOP_BREACH", "RESOLVED"),  # seeded silently by the stream, never stored
+    ], "2025-11-25 10:05"))
+
+    assert "Alert state write failed" not in capsys.readouterr().out
+    assert _statuses(changes) == {"CCC/STOP_BREACH": "NEW", "BBB/STOP_BREACH": "RESOLVED"}
+    reloaded = AlertStateStore(path)
+    assert reloaded.get("A1", "AAA", "STOP_BREACH")["active"]
+    assert not reloaded.get("A1", "BBB", "STOP_BREACH")["active"]
+    assert reloaded.get("A1", "CCC", "STOP_BREACH")["active"]
+    assert reloaded.get("A1", "ZZZ", "STOP_BREACH") is None
@@ -0,0 +1,60 @@
+import asyncio
+
+import pandas as pd
+
+from modules.alert_stream_engine import ReplayPriceFeed, run_alert_stream
+
+
+def _feed(*batches):
+    times = pd.date_range("2025-11-25 09:30", periods=len(batches), freq="min")
+    return ReplayPriceFeed(pd.DataFrame(
+        [(when, ticker, price) for when, batch in zip(times, batches) for ticker, price in batch.items()],
+        columns=["timestamp", "ticker", "price"],
+    ))
+
+
+def _run(book, feed, trailing_pct=None):
+    published = []
+    evaluator = asyncio.run(run_alert_stream(
+        book, feed, trailing_pct=trailing_pct,
+        on_event=lambda events: published.append(
+            set(zip(events["Ticker"], events["Rule"].astype(str), events["Status"].astype(str)))),
+    ))
+    return evaluator, published
+
+
+def test_edges_are_published_once_and_the_seed_is_silent():
+    book = pd.DataFrame({"Account Number": "A1", "Ticker": ["AAA", "BBB"], "Current Price": [100.0, 50.0],
+                         "Stop Price": [90.0, 55.0], "Gain/Loss %": [0.0, 0.0]})
+    feed = _feed({"AAA": 92.0}, {"AAA": 89.0}, {"AAA": 88.0}, {"AAA": 101.0, "BBB": 60.0})
+
+    evaluator, published = _run(book, feed)
+
+    assert published == [
+        {("AAA", "NEAR_STOP", "TRIGGERED")},
+        {("AAA", "STOP_BREACH", "TRIGGERED"), ("AAA", "HEAVY_LOSS", "TRIGGERED")},
+        # 88 changes nothing — no event; BBB was breached at the seed, silently
+        {("AAA", "STOP_BREACH", "RESOLVED"), ("AAA", "NEAR_STOP", "RESOLVED"), ("AAA", "HEAVY_LOSS", "RESOLVED"),
+         ("BBB", "STOP_BREACH", "RESOLVED"), ("BBB", "NEAR_STOP", "RESOLVED")},
+    ]
+    assert evaluator.active_alerts().empty
+    assert evaluator.batches == 4 and evaluator.ticks == 5
+
+
+def test_trailing_stops_ratchet_per_tick():
+    book = pd.DataFrame({"Ticker": ["AAA", "BBB"], "Current Price": [100.0, 70.0],
+                         "High Water Mark": [float("nan"), 80.0], "Gain/Loss %": [0.0, 0.0]})
+    feed = _feed({"AAA": 120.0, "BBB": 75.0}, {"AAA": 115.0}, {"AAA": 107.0})
+
+    evaluator, published = _run(book, feed, trailing_pct=10)
+
+    assert published == [
+        # seeded from its stored high-water mark: stop 72, breached at 70
+        {("BBB", "STOP_BREACH", "RESOLVED"), ("BBB", "NEAR_STOP", "RESOLVED")},
+        {("AAA", "STOP_BREACH", "TRIGGERED"), ("AAA", "NEAR_STOP", "TRIGGERED")},
+    ]
+    assert evaluator.high_water.tolist() == [120.0, 80.0]
+    assert evaluator.stop.tolist() == [108.0, 72.0]  # 115 and 107 never lower AAA's stop
+    marks = evaluator.marks()
+    assert marks["Stop Breached"].tolist() == [True, False]
+    assert marks["Current Price"].tolist() == [107.0, 75.0]
@@ -0,0 +1,29 @@
+import os
+import threading
+
+import pandas as pd
+
+from modules.artifact_pipeline import render_artifacts
+
+
+def test_concurrent_runs_keep_their_own_frames(workdir):
+    spill_dir = str(workdir / "spill")
+    written = {}
+
+    def run(i):
+        frame = pd.DataFrame({"Ticker": [f"T{i}"] * 2000, "Current Price": float(i)})
+        out_dir = workdir / f"run{i}"
+        out_dir.mkdir()
+        written[i] = render_artifacts(frame, outputs=["csv"], out_dir=str(out_dir),
+                                      max_workers=1, spill_dir=spill_dir)["csv"]
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(written) == list(range(8))
+    for i, path in written.items():
+        assert set(pd.read_csv(path)["Ticker"]) == {f"T{i}"}
+    assert os.listdir(spill_dir) == []
@@ -0,0 +1,113 @@
+import shutil
+
+import pandas as pd
+
+from modules.backtest_engine import SUMMARY_COLUMNS, grade_signals, run_backtest
+
+
+def test_grade_signals_empty_frame():
+    summary = grade_signals(pd.DataFrame(), (1, 5))
+
+    assert summary.empty
+    assert list(summary.columns) == SUMMARY_COLUMNS
+
+
+def test_backtest_without_snapshots(workdir):
+    (workdir / "data").mkdir()
+    result = run_backtest(data_path=str(workdir / "data"), max_workers=1, verbose=False)
+
+    assert result["signals"].empty
+    assert result["summary"].empty
+    assert list(result["summary"].columns) == SUMMARY_COLUMNS
+
+
+def test_backtest_single_snapshot_has_no_forward_returns(workdir, positions_export):
+    (workdir / "data").mkdir()
+    shutil.copy(positions_export, workdir / "data")
+    result = run_backtest(data_path=str(workdir / "data"), max_workers=1, verbose=False)
+
+    assert not result["signals"].empty
+    assert result["summary"].empty
+    assert list(result["summary"].columns) == SUMMARY_COLUMNS
+
+
+HEADER = ("Account Number,Account Name,Symbol,Description,Quantity,Last Price,Last Price Change,Current Value,"
+          "Today's Gain/Loss Dollar,Today's Gain/Loss Percent,Total Gain/Loss Dollar,Total Gain/Loss Percent,"
+          "Percent Of Account,Cost Basis Total,Average Cost Basis,Type")
+
+# AAA sits on a +30% gain (trim signal), BBB on a -20% loss (stop signal)
+DAYS = {"Nov-10-2025": (100.0, 50.0), "Nov-11-2025": (110.0, 45.0), "Nov-12-2025": (99.0, 45.0)}
+
+
+def _write_snapshot(folder, day, aaa, bbb):
+    rows = [HEADER]
+    for ticker, price, gain in (("AAA", aaa, "+30.00%"), ("BBB", bbb, "-20.00%")):
+        rows.append(f"X1,IRA,{ticker},{ticker} INC,10,${price:.2f},+$0.00,${price * 10:.2f},"
+                    f"+$0.00,+0.00%,+$0.00,{gain},50.00%,$1.00,$0.10,Cash")
+    (folder / f"Portfolio_Positions_{day}.csv").write_text("\n".join(rows) + "\n")
+
+
+def _summary_row(summary, signal, horizon):
+    row = summary[(summary["signal"] == signal) & (summary["Horizon"] == horizon)]
+    assert len(row) == 1, (signal, horizon)
+    return row.iloc[0]
+
+
+def test_grade_signals_hit_rate_and_returns():
+    signals = pd.DataFrame({
+        "signal_type": ["Tactical Priority"] * 4 + ["Stop Recommendation"] * 3,
+        "signal": ["STRONG BUY"] * 4 + ["Hold"] * 3,
+        "Fwd 1 %": [10.0, -5.0, 20.0, float("nan"), 0.0, -1.0, 3.0],
+    })
+    summary = grade_signals(signals, (1,))
+
+    buy = _summary_row(summary, "STRONG BUY", 1)
+    assert (buy["Observations"], buy["Hit Rate %"], buy["Avg Fwd Return %"], buy["Median Fwd Return %"]) == \
+        (3, 66.67, 8.33, 10.0)
+    hold = _summary_row(summary, "Hold", 1)  # neutral: a hit when the price did not fall
+    assert (hold["Observations"], hold["Hit Rate %"], hold["Avg Fwd Return %"]) == (3, 66.67, 0.67)
+
+
+def test_backtest_grades_known_forward_returns(workdir):
+    data = workdir / "data"
+    data.mkdir()
+    for day, (aaa, bbb) in DAYS.items():
+        _write_snapshot(data, day, aaa, bbb)
+
+    result = run_backtest(data_path=str(data), horizons=(1, 2), max_workers=1, verbose=False)
+
+    assert result["prices"]["AAA"].tolist() == [100.0, 110.0, 99.0]
+    summary = result["summary"]
+    trim = _summary_row(summary, "Trim - Secure Profits", 1)  # AAA: +10%, then -10%
+    assert (trim["Observations"], trim["Hit Rate %"], trim["Avg Fwd Return %"]) == (2, 50.0, 0.0)
+    stop = _summary_row(summary, "Sell - Stop Loss Trigger", 1)  # BBB: -10%, then flat
+    assert (stop["Observations"], stop["Hit Rate %"], stop["Avg Fwd Return %"]) == (2, 50.0, -5.0)
+    trim2 = _summary_row(summary, "Trim - Secure Profits", 2)  # AAA: 100 → 99
+    assert (trim2["Observations"], trim2["Hit Rate %"], trim2["Avg Fwd Return %"]) == (1, 100.0, -1.0)
+
+
+def test_replay_reuses_cached_days(workdir, monkeypatch):
+    from modules import backtest_engine
+
+    data = workdir / "data"
+    data.mkdir()
+    for day, (aaa, bbb) in DAYS.items():
+        _write_snapshot(data, day, aaa, bbb)
+    first = run_backtest(data_path=str(data), horizons=(1,), max_workers=1, verbose=False)
+
+    replayed = []
+    real_replay = backtest_engine.replay_day
+
+    def counting_replay(task):
+        replayed.append(task["date"])
+        return real_replay(task)
+
+    monkeypatch.setattr(backtest_engine, "replay_day", counting_replay)
+    again = run_backtest(data_path=str(data), horizons=(1,), max_workers=1, verbose=False)
+    assert replayed == []
+    pd.testing.assert_frame_equal(again["summary"], first["summary"])
+
+    _write_snapshot(data, "Nov-12-2025", 121.0, 45.0)  # changed day only
+    changed = run_backtest(data_path=str(data), horizons=(1,), max_workers=1, verbose=False)
+    assert replayed == ["2025-11-12"]
+    assert _summary_row(changed["summary"], "Trim - Secure Profits", 1)["Hit Rate %"] == 0.0
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.correlation_engine import MIN_PERIODS, RollingCorrelation
+
+WINDOW = 6
+
+
+def _returns_frame():
+    rng = np.random.default_rng(7)
+    dates = pd.date_range("2025-11-03", periods=16, freq="B")
+    frame = pd.DataFrame(rng.normal(0, 0.02, (16, 5)), index=dates, columns=list("ABCDE"))
+    frame["B"] += frame["A"]  # one strongly correlated pair
+    frame.iloc[:5, frame.columns.get_loc("E")] = np.nan   # E enters the book on day 6
+    frame.iloc[10:, frame.columns.get_loc("A")] = np.nan  # A leaves after day 10
+    frame.iloc[7, frame.columns.get_loc("C")] = np.nan    # one missing mark
+    return frame
+
+
+@pytest.mark.parametrize("recompute_every", [1, 1000])
+def test_correlation_matches_pandas_over_window(recompute_every):
+    frame = _returns_frame()
+    engine = RollingCorrelation(window=WINDOW, recompute_every=recompute_every)
+
+    for i, (when, returns) in enumerate(frame.iterrows()):
+        engine.add_returns(when, returns.dropna())
+        recent = frame.iloc[max(0, i - WINDOW + 1): i + 1]
+        pd.testing.assert_frame_equal(
+            engine.correlation(tickers=frame.columns), recent.corr(min_periods=MIN_PERIODS),
+            check_exact=False, atol=1e-10, check_names=False,
+        )
+        pd.testing.assert_frame_equal(
+            engine.covariance(tickers=frame.columns), recent.cov(min_periods=MIN_PERIODS),
+            check_exact=False, atol=1e-12, check_names=False,
+        )
+
+
+def test_correlation_matches_pandas_rolling_corr():
+    frame = _returns_frame()
+    engine = RollingCorrelation(window=WINDOW, recompute_every=1000)
+    for when, returns in frame.iterrows():
+        engine.add_returns(when, returns.dropna())
+
+    rolling = frame.rolling(WINDOW, min_periods=MIN_PERIODS).corr().loc[frame.index[-1]]
+    got = engine.correlation(tickers=frame.columns)
+    # A left the book more than a window ago, E is still held
+    assert got.loc["A"].isna().all()
+    assert got.loc["E", "D"] == pytest.approx(rolling.loc["E", "D"])
+    offdiag = ~np.eye(len(frame.columns), dtype=bool)
+    np.testing.assert_allclose(got.to_numpy()[offdiag], rolling.to_numpy()[offdiag], atol=1e-10)
+
+
+def test_add_prices_uses_returns_between_snapshots():
+    prices = pd.DataFrame({"A": [10.0, 11.0, 12.1, 11.0, 12.0], "B": [5.0, 5.5, 6.0, 5.9, 6.3]},
+                          index=pd.date_range("2025-11-03", periods=5, freq="B"))
+    engine = RollingCorrelation(window=WINDOW)
+    for when, row in prices.iterrows():
+        engine.add_prices(when, row)
+
+    expected = prices.pct_change().corr(min_periods=MIN_PERIODS)
+    assert engine.correlation().loc["A", "B"] == pytest.approx(expected.loc["A", "B"])
+    assert engine.top_pairs(k=1).iloc[0][["Ticker A", "Ticker B", "Observations"]].tolist() == ["A", "B", 4]
@@ -0,0 +1,88 @@
+import os
+import shutil
+
+import fox_valley_intelligence_engine as console
+from conftest import DATA_DIR
+
+
+def _copy_data(workdir):
+    shutil.copytree(DATA_DIR, workdir / "data", ignore=shutil.ignore_patterns("archive"))
+
+
+def test_score_matches_adds_scores_and_stops(positions):
+    from modules.crossmatch_engine import crossmatch
+    from modules.zacks_screen_registry import discover_screens, iter_screen_loads
+
+    screens = {cat: df for cat, df, error in iter_screen_loads(discover_screens(DATA_DIR)) if error is None}
+    matches, _ = crossmatch(positions, screens)
+    scored = console.score_matches(matches)
+
+    assert len(scored) == len(matches)
+    assert {"Screen Category", "Zacks Rank", "TacticalScore", "Action", "Stop Recommendation"} <= set(scored.columns)
+    assert scored["TacticalScore"].notna().all()
+
+
+def test_console_runs_end_to_end(workdir, capsys, monkeypatch):
+    # --no-cache flips module-level switches; restore them afterwards
+    monkeypatch.setattr("modules.csv_cache_engine._cache_enabled", True)
+    monkeypatch.setattr("modules.report_memo_engine._memo_enabled", True)
+    _copy_data(workdir)
+    console.main(["--no-cache", "--by-account", "--what-if"])
+
+    out = capsys.readouterr().out
+    assert "Engine Execution Complete" in out
+    assert "Household:" in out
+    assert "What-If" in out and "▶" in out
+    assert os.path.exists("tactical_intelligence_report.csv")
+    assert os.path.exists("tactical_intelligence_report.pdf")
+
+
+def test_watch_persists_the_stream_stops(workdir, monkeypatch):
+    import pandas as pd
+    from modules import stop_state_engine
+
+    monkeypatch.setattr(stop_state_engine, "_stores", {})
+    book = pd.DataFrame({"Account Number": ["A1"], "Ticker": ["NVDA"], "Current Price": [200.0],
+                         "Gain/Loss %": [0.0]})
+
+    def watch(prices):
+        path = workdir / "ticks.csv"
+        pd.DataFrame({"timestamp": pd.date_range("2025-11-25 10:00", periods=len(prices), freq="min"),
+                      "ticker": "NVDA", "price": prices}).to_csv(path, index=False)
+        console.watch_alerts(book, str(path), trailing_pct=10)
+        return stop_state_engine.StopStateStore().state.loc[("A1", "NVDA")]
+
+    risen_then_fallen = watch([250.0, 190.0])
+    assert risen_then_fallen["high_water"] == 250.0
+    assert risen_then_fallen["stop_price"] == 225.0
+    assert risen_then_fallen["last_price"] == 190.0
+    assert bool(risen_then_fallen["breached"])
+
+    rerun = watch([180.0])
+    assert rerun["high_water"] == 250.0
+    assert rerun["stop_price"] == 225.0
+    assert bool(rerun["breached"])
+
+
+def test_console_reports_var_from_archived_snapshots(workdir, capsys, monkeypatch):
+    monkeypatch.setattr("modules.history_store_engine._stores", {})
+    shutil.copytree(DATA_DIR, workdir / "data")
+    args = console.parse_args(["--var", "0.99"])
+    report = console.show_var(console.load_portfolio(), args.var)
+
+    out = capsys.readouterr().out
+    assert "Value at Risk — 99% confidence" in out
+    assert report["tickers"] > 0
+    assert report["portfolio"]["Parametric CVaR"] >= report["portfolio"]["Parametric VaR"] > 0
+
+
+def test_streamed_console_keeps_only_screened_rows(workdir, capsys, monkeypatch):
+    monkeypatch.setattr("modules.csv_cache_engine._cache_enabled", True)
+    monkeypatch.setattr("modules.report_memo_engine._memo_enabled", True)
+    _copy_data(workdir)
+    console.main(["--no-cache", "--stream", "5"])
+
+    out = capsys.readouterr().out
+    assert "positions in 1 account(s)" in out
+    assert "screened position(s) kept for scoring" in out
+    assert "Engine Execution Complete" in out
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+import fox_valley_intelligence_engine as console
+from conftest import DATA_DIR
+from modules.incremental_engine import run_incremental
+from modules.scoring_rules_engine import reload_scoring_rules
+from modules.zacks_screen_registry import discover_screens, iter_screen_loads
+
+
+@pytest.fixture
+def screens():
+    return {cat: df for cat, df, error in iter_screen_loads(discover_screens(DATA_DIR)) if error is None}
+
+
+@pytest.fixture
+def default_rules():
+    reload_scoring_rules(path=None)
+    yield
+    reload_scoring_rules(path=None)
+
+
+def _run(positions, screens):
+    return run_incremental(positions, screens, console.score_matches, fingerprint=console.scoring_fingerprint())
+
+
+def test_unchanged_inputs_reuse_previous_result(workdir, positions, screens, default_rules):
+    first, info = _run(positions, screens)
+    assert info["mode"] == "full"
+
+    second, info = _run(positions, screens)
+    assert info == {"mode": "incremental", "affected": set()}
+    assert second.equals(first)
+
+
+def test_rule_change_forces_full_rescore(workdir, positions, screens, default_rules):
+    first, _ = _run(positions, screens)
+
+    (workdir / "config").mkdir()
+    (workdir / "config" / "scoring_rules.json").write_text(json.dumps({"momentum_score": {"constant": 0}}))
+    reload_scoring_rules()
+    second, info = _run(positions, screens)
+
+    assert info["mode"] == "full"
+    assert (second["MomentumScore"] == 0).all()
+    assert (second["TacticalScore"] == first["TacticalScore"] - 10).all()
+
+
+def test_stop_setting_change_forces_full_rescore(workdir, positions, screens, default_rules, monkeypatch):
+    _run(positions, screens)
+
+    monkeypatch.setitem(console.STOP_SETTINGS, "trim_gain_pct", 5.0)
+    result, info = _run(positions, screens)
+
+    assert info["mode"] == "full"
+    expected = (result["Gain/Loss %"] >= 5.0) & (result["Action"] != "Sell")
+    assert expected.any()
+    assert (result.loc[expected, "Stop Recommendation"] == "Trim - Secure Profits").all()
@@ -0,0 +1,29 @@
+import datetime
+
+from reportlab import rl_config
+
+from modules import pdf_export_engine
+from modules.pdf_export_engine import export_report_to_pdf
+
+
+class _Clock:
+    now_value = None
+
+    @classmethod
+    def now(cls):
+        return cls.now_value
+
+
+def test_repeat_briefings_carry_the_current_report_date(workdir, monkeypatch):
+    monkeypatch.setattr(pdf_export_engine, "datetime", _Clock)
+    monkeypatch.setattr(rl_config, "pageCompression", 0)  # readable page streams
+    report = "\n".join(f"Position {i}: hold" for i in range(200))
+
+    _Clock.now_value = datetime.datetime(2025, 11, 25, 9, 30)
+    first = open(export_report_to_pdf(report, "first.pdf"), "rb").read()
+    _Clock.now_value = datetime.datetime(2025, 11, 28, 16, 5)
+    second = open(export_report_to_pdf(report, "second.pdf"), "rb").read()
+
+    assert b"Report Date: November 25, 2025" in first
+    assert b"Report Date: November 28, 2025" in second
+    assert b"Report Date: November 25, 2025" not in second
@@ -0,0 +1,68 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from modules.pdf_table_writer import PdfTableWriter, format_table_values
+from modules.risk_and_reporting_engine import export_to_pdf
+
+
+def test_format_table_values_matches_str_with_blank_missing():
+    df = pd.DataFrame({
+        "Ticker": ["AAA", None, "CCC"],
+        "Shares": [463.0, 12.5, np.nan],
+        "Zacks Rank": pd.array([1, None, 3], dtype="Int64"),
+        "Count": [1, 2, 3],
+    })
+    formatted = format_table_values(df, ["Ticker", "Shares", "Zacks Rank", "Count"])
+
+    assert formatted.to_dict("list") == {
+        "Ticker": ["AAA", "", "CCC"],
+        "Shares": ["463.0", "12.5", ""],
+        "Zacks Rank": ["1", "", "3"],
+        "Count": ["1", "2", "3"],
+    }
+
+
+def test_flowables_cover_every_row_once():
+    df = pd.DataFrame({"Ticker": [f"T{i}" for i in range(250)]})
+    writer = PdfTableWriter(df, available_width=500)
+    chunks = writer.flowables(page_height=700, first_page_height=600)
+
+    first, per_page = writer.rows_per_page(600), writer.rows_per_page(700)
+    assert [(c.start, c.stop) for c in chunks][:2] == [(0, first), (first, first + per_page)]
+    assert chunks[-1].stop == 250
+    assert all(a.stop == b.start for a, b in zip(chunks, chunks[1:]))
+
+
+def test_export_to_pdf_one_page_per_chunk(workdir, monkeypatch):
+    from reportlab import rl_config
+
+    from modules import risk_and_reporting_engine
+
+    chunks = []
+
+    class RecordingWriter(PdfTableWriter):
+        def flowables(self, page_height, first_page_height=None):
+            chunks.extend(super().flowables(page_height, first_page_height))
+            return chunks
+
+    monkeypatch.setattr(risk_and_reporting_engine, "PdfTableWriter", RecordingWriter)
+    monkeypatch.setattr(rl_config, "pageCompression", 0)  # readable page streams
+    rows = 500
+    df = pd.DataFrame({
+        "Ticker": [f"T{i:03d}" for i in range(rows)],
+        "Shares": np.arange(rows, dtype="float64"),
+        "Current Price": np.linspace(1, 100, rows),
+        "Action": ["Hold"] * rows,
+    })
+    export_to_pdf(df, "report.pdf")
+    pdf = open("report.pdf", "rb").read()
+
+    # letter page, 1in margins: 636 pt frame, first chunk shorter (title)
+    per_page = chunks[0].writer.rows_per_page(792 - 144 - 12)
+    first = chunks[0].stop
+    assert first < per_page
+    assert len(chunks) == 1 + -(-(rows - first) // per_page)
+    assert len(re.findall(rb"/Type /Page\b(?!s)", pdf)) == len(chunks)  # no chunk was split
+    assert b"(T000)" in pdf and f"(T{rows - 1:03d})".encode() in pdf
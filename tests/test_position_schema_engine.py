@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from modules.position_schema_engine import parse_numeric
+
+
+def test_parse_numeric_fidelity_cells():
+    cells = pd.Series(["$1,234.56", "(12.5%)", "--", "", None, "+5.18%", "-$142.00"], index=list("abcdefg"))
+    parsed = parse_numeric(cells)
+
+    assert parsed.dtype == "float64"
+    assert list(parsed.index) == list("abcdefg")
+    np.testing.assert_array_equal(parsed.to_numpy(), [1234.56, -12.5, np.nan, np.nan, np.nan, 5.18, -142.0])
+
+
+def test_parse_numeric_embedded_line_break_keeps_rows_aligned():
+    cells = pd.Series(["$10.00", "1\n2", '"7', "n/a", "$3.50", "x\r"])
+    parsed = parse_numeric(cells)
+
+    assert len(parsed) == len(cells)
+    np.testing.assert_array_equal(parsed.to_numpy(), [10.0, np.nan, 7.0, np.nan, 3.5, np.nan])
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from modules.position_schema_engine import read_positions_csv
+from modules.position_stream_engine import ingest_positions_streaming
+
+
+def test_chunked_ingestion_matches_whole_file_read(positions_export):
+    whole = read_positions_csv(positions_export)
+    streamed, aggregator = ingest_positions_streaming(positions_export, chunksize=4, usecols=None)
+
+    assert aggregator.chunks == -(-len(whole) // 4)
+    # Streamed text columns are plain strings rather than per-file categoricals
+    pd.testing.assert_frame_equal(streamed, whole, check_dtype=False, check_categorical=False)
+
+    summary = aggregator.summary()
+    assert summary["total_value"] == pytest.approx(whole["Current Value"].sum())
+    assert summary["total_gain"] == pytest.approx(whole["Total Gain/Loss Dollar"].sum())
+    by_account = aggregator.account_totals().set_index("Account Number")
+    assert by_account["Positions"].to_dict() == whole.groupby("Account Number", observed=True).size().to_dict()
+
+
+def test_row_filter_keeps_requested_rows_but_totals_every_row(positions_export):
+    whole = read_positions_csv(positions_export)
+    keep = set(whole["Ticker"].dropna().astype(str).head(3))
+
+    kept, aggregator = ingest_positions_streaming(positions_export, chunksize=5,
+                                                  row_filter=lambda chunk: chunk["Ticker"].isin(keep))
+
+    assert set(kept["Ticker"]) == keep and len(kept) == whole["Ticker"].isin(keep).sum()
+    assert aggregator.rows == len(whole)
+    assert aggregator.summary()["total_value"] == pytest.approx(whole["Current Value"].sum())
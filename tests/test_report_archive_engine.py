@@ -0,0 +1,33 @@
+import threading
+
+from modules import report_archive_engine
+from modules.report_archive_engine import ReportArchive, archive_report, get_report_archive
+
+
+def test_archive_report_returns_restorable_id(workdir, monkeypatch):
+    monkeypatch.setattr(report_archive_engine, "_archives", {})
+    pdf = b"%PDF-1.4 briefing"
+
+    report_id = archive_report(pdf, tickers=["nvda"])
+    assert isinstance(report_id, int)
+    restored = get_report_archive().restore(report_id, str(workdir / "briefing.pdf"))
+    assert open(restored, "rb").read() == pdf
+    assert get_report_archive().tickers(report_id) == ["NVDA"]
+
+
+def test_shared_archive_works_from_other_threads(workdir):
+    archive = ReportArchive(str(workdir / "reports"))  # created on this thread
+    results = {}
+
+    def worker(i):
+        results[i] = archive.add(f"report {i}".encode(), as_of="2025-11-25", tickers=[f"T{i}"])["id"]
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(results.values())) == 8
+    assert archive.stats()["reports"] == 8
+    assert archive.read(results[3]) == b"report 3"
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.scoring_rules_engine import DEFAULT_RULE_TABLES, ScoringRules, compile_rule, reload_scoring_rules
+from modules.tactical_scoring_engine import calculate_tactical_scores
+
+
+# ---------------------------------------------------------
+# Reference: the row-wise scoring the rule tables replaced
+# ---------------------------------------------------------
+def _reference_scores(df):
+    df = df.copy()
+    df["GainScore"] = df["Gain/Loss %"].apply(lambda x: 40 if x > 25 else 30 if x > 10 else 20 if x > 0 else 10)
+    df["ZacksScore"] = df["Zacks Rank"].apply(lambda x: 35 if x == 1 else 25 if x == 2 else 15 if x == 3 else 0)
+    df["RiskGap %"] = round(((df["Current Price"] - df["Stop Price"]) / df["Current Price"]) * 100, 2)
+    df["RiskScore"] = df["RiskGap %"].apply(lambda x: 25 if x >= 10 else 15 if x >= 6 else 5 if x > 0 else 0)
+    df["MomentumScore"] = 10
+    df["TacticalScore"] = round(df["GainScore"] + df["ZacksScore"] + df["RiskScore"] + df["MomentumScore"], 0)
+    df["Tactical Priority"] = df["TacticalScore"].apply(
+        lambda s: "STRONG BUY" if s >= 80 else "ACCUMULATE/HOLD" if s >= 60
+        else "CAUTION / HOLD" if s >= 40 else "AT RISK / TRIM"
+    )
+    return df
+
+
+def _reference_tactical(row):
+    score = 0
+    score += min(row.get("CompositeScore", 0), 50)
+    score += min(row.get("PriceChange5d", 0), 20)
+    if str(row.get("Zacks Rank", "")).strip() == "1":
+        score += 15
+    volatility = row.get("Volatility30d", 20)
+    score -= min(volatility, 20) * 0.5
+    base = max(0, min(score, 100))
+
+    try:
+        days = int(row.get("PersistenceDays", 0))
+    except (TypeError, ValueError):
+        days = 0
+    final = min(base * 1.2, 100) if days >= 10 else min(base * 1.1, 100) if days >= 5 else base
+    return round(final, 2)
+
+
+def _random_positions(n=2000, seed=7):
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(1, 500, n)
+    df = pd.DataFrame({
+        "Ticker": [f"T{i}" for i in range(n)],
+        "Current Price": price,
+        "Gain/Loss %": rng.choice([-40, -5, 0, 0.01, 10, 10.5, 25, 25.01, 80], n),
+        "Stop Price": price * (1 - rng.choice([0, 0.05, 0.06, 0.1, 0.2, -0.05], n)),
+        "Zacks Rank": rng.choice([1, 2, 3, 4, 5], n).astype(float),
+    })
+    for col in ["Current Price", "Gain/Loss %", "Stop Price", "Zacks Rank"]:
+        df.loc[rng.random(n) < 0.05, col] = np.nan
+    return df
+
+
+@pytest.fixture
+def default_rules():
+    reload_scoring_rules(path=None)
+    yield
+    reload_scoring_rules(path=None)
+
+
+def test_tactical_scores_match_row_wise_reference(default_rules):
+    df = _random_positions()
+    ours = calculate_tactical_scores(df)
+    ref = _reference_scores(df)
+
+    for col in ["GainScore", "ZacksScore", "RiskScore", "MomentumScore", "TacticalScore", "Tactical Priority"]:
+        assert ours[col].tolist() == ref[col].tolist(), col
+
+
+def test_tactical_engine_matches_row_wise_reference(default_rules):
+    pytest.importorskip("streamlit")
+    from modules.tactical_engine import apply_tactical_analysis
+
+    rng = np.random.default_rng(11)
+    n = 1000
+    df = pd.DataFrame({
+        "CompositeScore": rng.uniform(0, 80, n),
+        "PriceChange5d": rng.uniform(-10, 30, n),
+        "Zacks Rank": rng.choice(["1", " 1", "2", 3], n),
+        "Volatility30d": rng.uniform(0, 40, n),
+        "PersistenceDays": rng.choice([0, 4, 5, 9, 10, 30], n),
+    })
+    expected = [_reference_tactical(row) for _, row in df.iterrows()]
+
+    ours = apply_tactical_analysis(df.copy())
+    assert np.allclose(ours["FinalTacticalScore"].to_numpy(dtype=float), expected)
+
+
+@pytest.mark.parametrize("name", [n for n, t in DEFAULT_RULE_TABLES.items() if "bands" in t])
+def test_band_tables_match_np_select(name):
+    table = DEFAULT_RULE_TABLES[name]
+    kernel = compile_rule(table)  # searchsorted path for uniform descending tables
+    mixed = compile_rule({**table, "bands": table["bands"] + [["<", -1e300, table["default"]]]})  # np.select path
+
+    thresholds = [b[1] for b in table["bands"]]
+    values = np.array(sorted({t + d for t in thresholds for d in (-0.5, 0, 0.5)}) + [np.nan, -1e9, 1e9])
+    assert kernel(values).tolist() == mixed(values).tolist()
+
+
+def test_overridden_default_applies_to_missing_values():
+    rules = ScoringRules({**DEFAULT_RULE_TABLES, "gain_score": {**DEFAULT_RULE_TABLES["gain_score"], "default": 0}})
+    assert rules.score("gain_score", np.array([np.nan, -3.0, 30.0])).tolist() == [0, 0, 40]
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.account_batch_engine import run_account_batch
+from modules.stop_state_engine import StopStateStore
+from modules.trailing_stop_manager import apply_trailing_stop, apply_trailing_stops
+
+
+def _snapshot(prices, accounts=None):
+    df = pd.DataFrame({"Ticker": list(prices), "Current Price": list(prices.values())})
+    if accounts is not None:
+        df["Account Number"] = accounts
+    return df
+
+
+@pytest.fixture
+def store(workdir):
+    return StopStateStore(str(workdir / "archive" / "stop_state.pkl"))
+
+
+def test_stop_ratchets_up_and_never_down(store):
+    first = apply_trailing_stop(_snapshot({"NVDA": 100.0}), 5, store=store)
+    assert first["Stop Price"].tolist() == [95.0]
+
+    higher = apply_trailing_stop(_snapshot({"NVDA": 120.0}), 5, store=store)
+    assert higher["Stop Price"].tolist() == [114.0]
+
+    lower = apply_trailing_stop(_snapshot({"NVDA": 110.0}), 5, store=store)
+    assert lower["High Water Mark"].tolist() == [120.0]
+    assert lower["Stop Price"].tolist() == [114.0]
+    assert lower["Stop Breached"].tolist() == [True]
+
+    # Without a store the stop is re-anchored to today's price
+    assert apply_trailing_stop(_snapshot({"NVDA": 110.0}), 5)["Stop Price"].tolist() == [104.5]
+
+
+def test_state_persists_between_runs(store):
+    apply_trailing_stops(_snapshot({"AU": 80.0, "CNQ": 30.0}), 10, ticker_stops={"CNQ": 5}, store=store)
+
+    reloaded = StopStateStore(store.path)
+    out = apply_trailing_stops(_snapshot({"AU": 70.0, "CNQ": 29.0}), 10, ticker_stops={"CNQ": 5}, store=reloaded)
+    assert out["Stop Price"].tolist() == [72.0, 28.5]
+
+
+def test_ticks_update_tracked_rows_in_place(store):
+    store.update_snapshot(_snapshot({"A": 10.0, "B": 20.0, "C": 30.0}, accounts=["1", "1", "2"]), 10)
+    index = store.state.index
+
+    updated = store.update_prices({"b": 25.0, "C": 27.0, "ZZZ": 1.0})
+
+    assert store.state.index is index  # no rebuild for tracked tickers
+    assert sorted(updated.index.get_level_values("ticker")) == ["B", "C"]
+    assert store.state.loc[("1", "B"), "high_water"] == 25.0
+    assert store.state.loc[("1", "B"), "stop_price"] == 22.5
+    assert store.state.loc[("2", "C"), "stop_price"] == 27.0
+    assert bool(store.state.loc[("2", "C"), "breached"])
+    assert store.state.loc[("1", "A"), "last_price"] == 10.0
+
+
+def test_new_positions_are_appended(store):
+    store.update_snapshot(_snapshot({"A": 10.0}), 10)
+    store.update_snapshot(_snapshot({"A": 12.0, "B": 50.0}), 10)
+
+    assert store.state["high_water"].to_dict() == {("ALL", "A"): 12.0, ("ALL", "B"): 50.0}
+    assert store.update_prices({"B": 60.0})["stop_price"].tolist() == [54.0]
+
+
+def test_tick_updates_match_snapshot_replay(store, workdir):
+    rng = np.random.default_rng(2)
+    tickers = [f"T{i}" for i in range(200)]
+    base = _snapshot(dict(zip(tickers, rng.uniform(10, 100, 200))))
+    store.update_snapshot(base, 8)
+    replay = StopStateStore(str(workdir / "replay.pkl"))
+    replay.update_snapshot(base, 8)
+
+    frame = base.copy()
+    for _ in range(20):
+        moved = rng.choice(tickers, 15, replace=False)
+        ticks = dict(zip(moved, rng.uniform(10, 120, 15)))
+        store.update_prices(ticks)
+        frame.loc[frame["Ticker"].isin(moved), "Current Price"] = frame["Ticker"].map(ticks)
+        replay.update_snapshot(frame, 8)
+
+    cols = ["high_water", "stop_price", "last_price", "breached"]
+    pd.testing.assert_frame_equal(store.state.sort_index()[cols], replay.state.sort_index()[cols])
+
+
+def test_account_batch_trails_stored_high_water(store, positions):
+    run_account_batch(positions, default_stop_pct=10, stop_store=store)
+    marked_down = positions.assign(**{"Current Price": positions["Current Price"] * 0.8})
+    batch = run_account_batch(marked_down, default_stop_pct=10, stop_store=store)
+
+    held = positions["Current Price"].notna()
+    expected = (positions.loc[held, "Current Price"] * 0.9).round(2)
+    assert np.allclose(batch["positions"].loc[held, "Stop Price"], expected)
+
+
+def test_merged_marks_only_ratchet_up(store):
+    store.update_snapshot(_snapshot({"A": 100.0, "B": 50.0}), 10)
+    marks = _snapshot({"A": 90.0, "B": 40.0, "ZZZ": 5.0}).assign(**{
+        "High Water Mark": [130.0, 45.0, 5.0], "Stop Price": [117.0, 40.5, 4.5],
+    })
+
+    updated = store.update_marks(marks)
+
+    assert sorted(updated.index.get_level_values("ticker")) == ["A", "B"]
+    assert store.state["high_water"].to_dict() == {("ALL", "A"): 130.0, ("ALL", "B"): 50.0}
+    assert store.state["stop_price"].to_dict() == {("ALL", "A"): 117.0, ("ALL", "B"): 45.0}
+    assert store.state["breached"].to_dict() == {("ALL", "A"): True, ("ALL", "B"): True}
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.tactical_alerts import build_alert_table, generate_tactical_alerts
+
+
+def _reference_alerts(portfolio_df, scored_df=None, zacks_df=None, group_by=None):
+    """The iterrows alert generator build_alert_table replaced."""
+    alerts = []
+    df = portfolio_df.copy()
+    if "Stop Price" not in df.columns:
+        df["Stop Price"] = np.nan
+
+    for _, row in df[df["Current Price"] <= df["Stop Price"]].iterrows():
+        alerts.append(
+            f"🚨 STOP BREACH: {row['Ticker']} is below stop "
+            f"({row['Current Price']:.2f} ≤ {row['Stop Price']:.2f}). Immediate review required."
+        )
+    for _, row in df[df["Gain/Loss %"] <= -10].iterrows():
+        alerts.append(
+            f"⚠ HEAVY LOSS: {row['Ticker']} is down {row['Gain/Loss %']:.2f}%, "
+            f"review risk mitigation or exit strategy."
+        )
+    if group_by:
+        totals = df["Current Value"].groupby(df[group_by], observed=True, dropna=False).transform("sum")
+    else:
+        totals = df["Current Value"].sum()
+    df["CapitalWeight %"] = round((df["Current Value"] / totals) * 100, 2)
+    for _, row in df[df["CapitalWeight %"] > 20].iterrows():
+        scope = f"account {row[group_by]}" if group_by else "total portfolio"
+        alerts.append(
+            f"🛑 CAPITAL CLUSTER: {row['Ticker']} accounts for {row['CapitalWeight %']:.2f}% "
+            f"of {scope} value. Diversification recommended."
+        )
+    df["StopRisk %"] = round(((df["Current Price"] - df["Stop Price"]) / df["Current Price"]) * 100, 2)
+    for _, row in df[df["StopRisk %"] <= 3].iterrows():
+        alerts.append(f"⏳ NEAR STOP: {row['Ticker']} is within {row['StopRisk %']:.2f}% of trailing stop.")
+    if scored_df is not None and not scored_df.empty and zacks_df is not None and not zacks_df.empty:
+        merged = pd.merge(scored_df, zacks_df, left_on="Ticker", right_on="ticker", how="inner")
+        for _, row in merged[(merged["zacks_rank"] == 1) & (merged["TacticalScore"] >= 80)].iterrows():
+            alerts.append(
+                f"🎯 HIGH-PROBABILITY BUY SIGNAL: {row['Ticker']} — "
+                f"Rank 1 with TacticalScore {row['TacticalScore']}."
+            )
+    if not alerts:
+        alerts.append("📈 No critical tactical alerts. Portfolio remains stable.")
+    return alerts
+
+
+def _book(n=400, seed=5):
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(5, 500, n).round(2)
+    df = pd.DataFrame({
+        "Account Number": rng.choice(["A1", "A2", "A3"], n),
+        "Ticker": [f"T{i:03d}" for i in range(n)],
+        "Current Price": price,
+        "Stop Price": (price * rng.uniform(0.9, 1.05, n)).round(2),
+        "Gain/Loss %": rng.uniform(-30, 40, n).round(2),
+        "Current Value": rng.pareto(1.2, n) * 1000,
+    })
+    df.loc[rng.random(n) < 0.1, "Stop Price"] = np.nan
+    # integer scores, as calculate_tactical_scores produces them
+    scored = pd.DataFrame({"Ticker": df["Ticker"], "TacticalScore": rng.choice([40, 80, 95], n)})
+    screened = df["Ticker"].sample(frac=0.3, random_state=1).to_numpy()
+    zacks = pd.DataFrame({"ticker": screened, "zacks_rank": rng.choice([1, 2, 3], len(screened))})
+    return df, scored, zacks
+
+
+@pytest.mark.parametrize("group_by", [None, "Account Number"])
+def test_messages_match_iterrows_reference(group_by):
+    df, scored, zacks = _book()
+    expected = _reference_alerts(df, scored, zacks, group_by=group_by)
+
+    assert generate_tactical_alerts(df, scored, zacks, group_by=group_by) == expected
+    assert len(expected) > 50
+
+
+def test_quiet_book_reports_no_alerts():
+    df = pd.DataFrame({"Ticker": [f"T{i}" for i in range(10)], "Current Price": 100.0,
+                       "Stop Price": 50.0, "Gain/Loss %": 5.0, "Current Value": 1000.0})
+
+    assert generate_tactical_alerts(df) == _reference_alerts(df)
+
+
+def test_rank1_ticker_on_several_screens_alerts_once():
+    df, scored, _ = _book(n=5)
+    scored["TacticalScore"] = 90
+    zacks = pd.DataFrame({"ticker": ["T001", "T001", "T002"], "zacks_rank": [1, 1, 2]})
+    table = build_alert_table(df, scored_df=scored, zacks_df=zacks)
+
+    opportunities = table[table["Rule"] == "RANK1_BUY"]
+    assert opportunities["Ticker"].tolist() == ["T001"]
+
+
+def test_scores_from_the_scoring_engine_render_like_before(positions):
+    from modules.tactical_scoring_engine import calculate_tactical_scores
+
+    scored = calculate_tactical_scores(positions)
+    scored.loc[scored.index[:3], "TacticalScore"] = 85
+    zacks = pd.DataFrame({"ticker": scored["Ticker"], "zacks_rank": 1})
+
+    messages = generate_tactical_alerts(positions, scored, zacks)
+    assert messages == _reference_alerts(positions, scored, zacks)
+    assert any(m.startswith("🎯") for m in messages)
+
+
+def test_fractional_scores_render_like_before():
+    df, scored, zacks = _book(n=60)
+    scored["TacticalScore"] = scored["TacticalScore"] + 0.5
+
+    assert generate_tactical_alerts(df, scored, zacks) == _reference_alerts(df, scored, zacks)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from modules.trailing_stop_manager import apply_custom_trailing_stops, apply_trailing_stops
+
+
+def _reference_custom_stops(df, stop_dict):
+    """The iterrows implementation apply_custom_trailing_stops replaced."""
+    df["Stop Price"] = None
+    df["Protection Gap %"] = None
+    for _, row in df.iterrows():
+        ticker, price = row.get("Ticker", None), row.get("Current Price", None)
+        if pd.isna(ticker) or pd.isna(price):
+            continue
+        pct = stop_dict.get(ticker, 5)
+        stop_price = round(price * (1 - pct / 100), 2)
+        df.loc[df["Ticker"] == ticker, "Stop Price"] = stop_price
+        df.loc[df["Ticker"] == ticker, "Protection Gap %"] = round(((price - stop_price) / price) * 100, 2)
+    return df
+
+
+def _book(n=3000, seed=3):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Ticker": [f"T{i:04d}" for i in range(n)],
+        "Current Price": rng.uniform(1, 900, n).round(2),
+        "Sector": rng.choice(["Tech", "Energy", "Finance"], n),
+        "Account Number": rng.choice(["A1", "A2"], n),
+    })
+    df.loc[rng.random(n) < 0.03, "Current Price"] = np.nan
+    df.loc[rng.random(n) < 0.01, "Ticker"] = None
+    return df
+
+
+def test_custom_stops_match_iterrows_reference():
+    df = _book()
+    stop_dict = {f"T{i:04d}": pct for i, pct in zip(range(0, 3000, 7), [7.5, 4, 6, 12.25] * 200)}
+
+    ours = apply_custom_trailing_stops(df.copy(), stop_dict)
+    ref = _reference_custom_stops(df.copy(), stop_dict)
+
+    for col in ["Stop Price", "Protection Gap %"]:
+        expected = pd.to_numeric(ref[col], errors="coerce").to_numpy(dtype=float)
+        assert ours[col].dtype == np.float64
+        assert np.allclose(ours[col].to_numpy(), expected, equal_nan=True), col
+
+
+def test_override_precedence_ticker_sector_account():
+    df = pd.DataFrame({
+        "Ticker": ["nvda", "XOM", "JPM", "AAPL"],
+        "Current Price": [100.0, 100.0, 100.0, 100.0],
+        "Sector": ["Tech", "Energy", "Finance", "Tech"],
+        "Account Number": ["A1", "A1", "A2", "A3"],
+    })
+    out = apply_trailing_stops(
+        df, default_pct=5,
+        ticker_stops={"NVDA": 7.5}, sector_stops={"Energy": 10}, account_stops={"A2": 20, "A1": 3},
+    )
+    # ticker beats sector beats account beats default
+    assert out["Stop Price"].tolist() == [92.5, 90.0, 80.0, 95.0]
+    assert out["Protection Gap %"].tolist() == [7.5, 10.0, 20.0, 5.0]
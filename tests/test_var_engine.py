@@ -0,0 +1,89 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from modules.var_engine import (
+    TailAccumulator, compute_var_report, historical_var, monte_carlo_var, parametric_var, tail_var_cvar,
+)
+
+
+def _gaussian_returns(T=500, n=4, seed=5):
+    rng = np.random.default_rng(seed)
+    mix = rng.normal(0, 0.01, (n, n))
+    returns = rng.standard_normal((T, n)) @ mix + 0.0005
+    return pd.DataFrame(returns, columns=[f"T{i}" for i in range(n)],
+                        index=pd.date_range("2024-01-01", periods=T))
+
+
+def test_historical_var_is_the_empirical_quantile():
+    returns = _gaussian_returns()
+    weights = np.array([[10_000.0, 0.0], [5_000.0, 2_000.0], [0.0, -3_000.0], [1_000.0, 4_000.0]])
+    var, cvar = historical_var(returns.to_numpy(), weights, 0.95)
+
+    pnl = returns.to_numpy() @ weights
+    k = math.ceil(len(pnl) * 0.05)
+    for j in range(weights.shape[1]):
+        assert np.isclose(var[j], -np.quantile(pnl[:, j], k / len(pnl), method="inverted_cdf"))
+        assert np.isclose(cvar[j], -np.sort(pnl[:, j])[:k].mean())
+
+
+def test_parametric_var_matches_the_closed_form():
+    mu = np.array([0.001, -0.0005])
+    cov = np.array([[0.0004, 0.0001], [0.0001, 0.0009]])
+    w = np.array([[6_000.0], [4_000.0]])
+    var, cvar = parametric_var(mu, cov, w, 0.99, horizon=5)
+
+    z = NormalDist().inv_cdf(0.99)
+    sigma = math.sqrt(float(w[:, 0] @ cov @ w[:, 0])) * math.sqrt(5)
+    mean = float(mu @ w[:, 0]) * 5
+    assert np.isclose(var[0], z * sigma - mean)
+    assert np.isclose(cvar[0], sigma * NormalDist().pdf(z) / 0.01 - mean)
+
+
+def test_monte_carlo_converges_to_parametric_on_gaussian_input():
+    returns = _gaussian_returns().to_numpy()
+    mu, cov = returns.mean(axis=0), np.cov(returns, rowvar=False)
+    weights = np.array([[10_000.0], [5_000.0], [-2_000.0], [3_000.0]])
+
+    mc = monte_carlo_var(mu, cov, weights, 0.95, paths=200_000, seed=3, ticker_tails=False)
+    var, cvar = parametric_var(mu, cov, weights, 0.95)
+    assert np.allclose(mc["books"][0], var, rtol=0.02)
+    assert np.allclose(mc["books"][1], cvar, rtol=0.02)
+
+
+def test_streamed_tail_equals_a_full_sort():
+    rng = np.random.default_rng(9)
+    pnl = rng.standard_normal((10_000, 3))
+    acc = TailAccumulator(k=math.ceil(10_000 * 0.05), columns=3)
+    for batch in np.array_split(pnl, 37):
+        acc.add(batch)
+    streamed = acc.result()
+    full = tail_var_cvar(pnl, 0.95)
+    assert np.allclose(streamed[0], full[0]) and np.allclose(streamed[1], full[1])
+
+    # Same draws in any batch size: the streamed result equals one big batch
+    mu, cov, w = np.zeros(3), np.eye(3) * 1e-4, np.ones((3, 1)) * 1_000
+    small = monte_carlo_var(mu, cov, w, paths=20_000, batch_size=777, seed=1)
+    whole = monte_carlo_var(mu, cov, w, paths=20_000, batch_size=20_000, seed=1)
+    for key in ("books", "long"):
+        assert np.allclose(small[key][0], whole[key][0]) and np.allclose(small[key][1], whole[key][1])
+
+
+def test_report_rolls_positions_up_to_accounts_and_portfolio():
+    returns = _gaussian_returns()
+    book = pd.DataFrame({
+        "Account Number": ["A", "A", "B", "B"],
+        "Ticker": ["T0", "T1", "T2", "NOHIST"],
+        "Current Value": [10_000.0, 5_000.0, 8_000.0, 1_000.0],
+    })
+    report = compute_var_report(book, returns=returns, paths=20_000, seed=2)
+
+    assert report["tickers"] == 3
+    assert report["positions"]["Has History"].tolist() == [True, True, True, False]
+    assert report["positions"].loc[3, "Historical VaR"] == 0
+    pnl = returns[["T0", "T1", "T2"]].to_numpy() @ np.array([10_000.0, 5_000.0, 8_000.0])
+    expected_var, _ = tail_var_cvar(pnl[:, None], 0.95)
+    assert report["portfolio"]["Historical VaR"] == round(float(expected_var[0]), 2)
+    assert report["accounts"]["Current Value"].tolist() == [15_000.0, 9_000.0]
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from modules.risk_and_reporting_engine import apply_stop_logic
+from modules.trailing_stop_manager import apply_trailing_stop
+from modules.what_if_engine import evaluate_stop_grid, evaluate_trailing_grid
+
+
+def _random_book(n=1500, seed=11):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Ticker": [f"T{i}" for i in range(n)],
+        "Current Price": rng.uniform(1, 500, n).round(2),
+        "Current Value": rng.uniform(0, 50_000, n),
+        # grid values themselves are included so the <= / >= edges are exercised
+        "Gain/Loss %": rng.choice([-30, -25, -20, -12.5, -10, -5, 0, 10, 20, 25, 30, 45, 50, 90], n).astype(float),
+        "Action": rng.choice(["Sell", "Buy", "Hold", "STRONG BUY"], n),
+    })
+    df.loc[rng.random(n) < 0.05, "Gain/Loss %"] = np.nan
+    df.loc[rng.random(n) < 0.05, "Current Value"] = np.nan
+    return df
+
+
+def test_stop_grid_matches_apply_stop_logic_per_cell():
+    book = _random_book()
+    stops, trims = [-5.0, -10.0, -12.5, -25.0], [10.0, 25.0, 50.0]
+    result = evaluate_stop_grid(book, stops, trims)
+
+    for s in stops:
+        for t in trims:
+            expected = apply_stop_logic(book, stop_loss_pct=s, trim_gain_pct=t)["Stop Recommendation"]
+            got = result.decisions_at(s, t)["Stop Recommendation"]
+            assert got.tolist() == expected.tolist(), (s, t)
+
+            value = book["Current Value"].fillna(0)
+            assert result.stop_counts.loc[s, t] == (expected == "Sell - Stop Loss Trigger").sum()
+            assert result.trim_counts.loc[s, t] == (expected == "Trim - Secure Profits").sum()
+            assert np.isclose(result.stop_notional.loc[s, t], value[expected == "Sell - Stop Loss Trigger"].sum())
+            assert np.isclose(result.trim_notional.loc[s, t], value[expected == "Trim - Secure Profits"].sum())
+
+
+def test_trailing_grid_matches_apply_trailing_stop():
+    book = _random_book()
+    pcts = [3.0, 5.0, 7.5, 10.0]
+    grid = evaluate_trailing_grid(book, pcts)
+
+    for pct in pcts:
+        expected = apply_trailing_stop(book.copy(), pct)["Stop Price"]
+        assert grid["stop_prices"][pct].tolist() == expected.tolist()
+    # trailing today's price can never breach
+    assert grid["breach_counts"].tolist() == [0] * len(pcts)
+
+    marked = book.assign(**{"High Water Mark": book["Current Price"] * 1.08})
+    breaches = evaluate_trailing_grid(marked, pcts)["breach_counts"]
+    stops = (marked["High Water Mark"].to_numpy()[:, None] * (1 - np.array(pcts) / 100)).round(2)
+    assert breaches.tolist() == (marked["Current Price"].to_numpy()[:, None] <= stops).sum(axis=0).tolist()